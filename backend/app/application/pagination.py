@@ -0,0 +1,102 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+
+def encode_task_cursor(task: Any) -> str:
+    """Encode the keyset position of a task as an opaque cursor.
+
+    Args:
+        task (Any): The last task of a page (ORM object or cached copy).
+
+    Returns:
+        str: A URL-safe cursor pointing just after the task.
+    """
+    due_date = task.due_date
+    if isinstance(due_date, datetime):
+        due_date = due_date.isoformat()
+    raw = json.dumps([due_date, task.id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_task_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_task_cursor.
+
+    Args:
+        cursor (str): The opaque cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+
+    Returns:
+        Tuple[datetime, int]: The (due_date, id) keyset position.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        due_date, task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(due_date), int(task_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def next_task_cursor(tasks: list, limit: int) -> Optional[str]:
+    """Return the cursor of the following page, or None on the last page.
+
+    Args:
+        tasks (list): The tasks of the current page.
+        limit (int): The requested page size.
+
+    Returns:
+        Optional[str]: The next cursor.
+    """
+    if tasks and len(tasks) >= limit:
+        return encode_task_cursor(tasks[-1])
+    return None
+
+
+def encode_search_cursor(
+    sort: str, offset: int, search_after: Optional[list] = None, pit_id: Optional[str] = None
+) -> str:
+    """Encode the position of a search result page as an opaque cursor.
+
+    Args:
+        sort (str): The sort the results are walked in.
+        offset (int): The number of hits already returned.
+        search_after (Optional[list], optional): Sort values of the last hit returned by
+            Elasticsearch. None when the page came from the database fallback. Defaults to None.
+        pit_id (Optional[str], optional): The point in time being searched. Defaults to None.
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    raw = json.dumps(
+        {"s": sort, "o": offset, "a": search_after, "p": pit_id}, separators=(",", ":")
+    ).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str, sort: str) -> Tuple[int, Optional[list], Optional[str]]:
+    """Decode a cursor produced by encode_search_cursor.
+
+    Args:
+        cursor (str): The opaque cursor.
+        sort (str): The sort of the current request, which must match the cursor's.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort.
+
+    Returns:
+        Tuple[int, Optional[list], Optional[str]]: The offset, search_after and PIT id.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset, search_after, pit_id = int(position["o"]), position["a"], position["p"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if position.get("s") != sort:
+        raise ValueError("Cursor was issued for another sort")
+    if search_after is not None and not isinstance(search_after, list):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return offset, search_after, pit_id
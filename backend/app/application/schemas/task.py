@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal
 from datetime import datetime
 
 class TaskBase(BaseModel):
@@ -25,4 +25,22 @@ class Task(TaskBase):
     priority: Literal["low", "normal", "high"]
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class TaskSuggestion(BaseModel):
+    id: int
+    title: str
+
+class TaskSummary(BaseModel):
+    total: int
+    completed: int
+    open: int
+    by_priority: Dict[str, int]
+
+class TaskStats(BaseModel):
+    total: int
+    completed: int
+    open: int
+    by_priority: Dict[str, int]
+    # Open tasks by due date: overdue, today, next_7_days and later
+    due: Dict[str, int]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.application.schemas.task import Task
 
@@ -10,6 +10,10 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+class UserAccessUpdate(BaseModel):
+    is_active: Optional[bool] = None
+    role: Optional[Literal["user", "admin"]] = None
+
 class User(UserBase):
     id: int
     is_active: bool
@@ -0,0 +1,200 @@
+from fastapi import HTTPException
+from typing import Optional, Tuple
+import json
+from app.domain.repositories.task_repository import IAsyncTaskRepository
+from app.application.schemas.task import TaskCreate, TaskUpdate
+from app.domain.models.task import Task
+from app.config import settings
+
+class AsyncTaskService:
+    """Async counterpart of TaskService, with the same checks and errors"""
+
+    def __init__(self, task_repository: IAsyncTaskRepository):
+        self.task_repository = task_repository
+
+    async def create_task(self, task: TaskCreate, owner_id: int) -> Task:
+        """Create a new task.
+
+        Args:
+            task (TaskCreate): The task to create.
+            owner_id (int): The ID of the owner of the task.
+
+        Returns:
+            Task: The created task.
+        """
+        return await self.task_repository.create_task(task, owner_id)
+
+    async def get_task_json(self, task_id: int, owner_id: int) -> str:
+        """Get a task by its ID as its rendered JSON response body.
+
+        Args:
+            task_id (int): The ID of the task to get.
+            owner_id (int): The ID of the owner of the task.
+
+        Raises:
+            HTTPException: If the task is not found.
+
+        Returns:
+            str: The JSON body of the task.
+        """
+        body = await self.task_repository.get_task_json(task_id)
+        if not body or json.loads(body).get("owner_id") != owner_id:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return body
+
+    async def get_tasks_by_ids(self, task_ids: list[int], owner_id: int) -> list[Task]:
+        """Get several tasks by their IDs.
+
+        Args:
+            task_ids (list[int]): The IDs of the tasks to get.
+            owner_id (int): The ID of the owner of the tasks.
+
+        Raises:
+            HTTPException: If more IDs are requested than a page may hold.
+
+        Returns:
+            list[Task]: The tasks owned by owner_id, in the requested order.
+        """
+        if len(task_ids) > settings.TASKS_MAX_PAGE_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.TASKS_MAX_PAGE_SIZE} ids can be requested at once",
+            )
+        tasks = await self.task_repository.get_tasks_by_ids(task_ids, owner_id)
+        return [task for task in tasks if task.owner_id == owner_id]
+
+    async def get_tasks_json(
+        self, owner_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[str, Optional[str], int]:
+        """Get a page of a user's tasks as its rendered JSON response body.
+
+        Args:
+            owner_id (int): The ID of the owner of the tasks to get.
+            skip (int, optional): The number of tasks to skip. Defaults to 0.
+            limit (int, optional): The number of tasks to return. Defaults to 100.
+            cursor (Optional[str], optional): Opaque cursor of the previous page. Defaults to None.
+
+        Raises:
+            HTTPException: If the cursor is malformed.
+
+        Returns:
+            Tuple[str, Optional[str], int]: The JSON body of the page, the cursor of the next
+                one and the number of tasks of the user.
+        """
+        try:
+            return await self.task_repository.get_user_tasks_json(owner_id, skip, limit, cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def update_task(self, task_id: int, task: TaskUpdate, owner_id: int) -> Task:
+        """Update a task.
+
+        Args:
+            task_id (int): The ID of the task to update.
+            task (TaskUpdate): The task to update.
+            owner_id (int): The ID of the owner of the task.
+
+        Raises:
+            HTTPException: If the task is not found.
+
+        Returns:
+            Task: The updated task.
+        """
+        updated_task = await self.task_repository.update_task(task_id, task, owner_id)
+        if not updated_task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return updated_task
+
+    async def delete_task(self, task_id: int, owner_id: int) -> Task:
+        """Delete a task.
+
+        Args:
+            task_id (int): The ID of the task to delete.
+            owner_id (int): The ID of the owner of the task.
+
+        Raises:
+            HTTPException: If the task is not found.
+
+        Returns:
+            Task: The deleted task.
+        """
+        deleted_task = await self.task_repository.delete_task(task_id, owner_id)
+        if not deleted_task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return deleted_task
+
+    async def search_tasks(self, query: str, owner_id: int, sort: str = "due_date") -> list[Task]:
+        """Search tasks based on query and owner_id.
+
+        Args:
+            query (str): The query to search for.
+            owner_id (int): The ID of the owner of the tasks to search for.
+            sort (str, optional): "due_date", "priority" or "relevance". Defaults to "due_date".
+
+        Returns:
+            list[Task]: A list of tasks.
+        """
+        return await self.task_repository.search_tasks(query, owner_id, sort)
+
+    async def search_tasks_page(
+        self,
+        query: str,
+        owner_id: int,
+        sort: str = "due_date",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[list[Task], Optional[str]]:
+        """Search a page of tasks based on query and owner_id.
+
+        Args:
+            query (str): The query to search for.
+            owner_id (int): The ID of the owner of the tasks to search for.
+            sort (str, optional): "due_date", "priority" or "relevance". Defaults to "due_date".
+            limit (Optional[int], optional): The page size. Defaults to SEARCH_PAGE_SIZE.
+            cursor (Optional[str], optional): Opaque cursor of the previous page. Defaults to None.
+
+        Raises:
+            HTTPException: If the cursor is malformed.
+
+        Returns:
+            Tuple[list[Task], Optional[str]]: The tasks and the cursor of the next page.
+        """
+        try:
+            return await self.task_repository.search_tasks_page(query, owner_id, sort, limit, cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def suggest_tasks_json(self, prefix: str, owner_id: int, limit: int = 5) -> str:
+        """Suggest tasks of owner_id whose title starts like prefix, as a JSON body.
+
+        Args:
+            prefix (str): What the user has typed so far.
+            owner_id (int): The ID of the owner of the tasks to suggest.
+            limit (int, optional): The number of suggestions. Defaults to 5.
+
+        Returns:
+            str: The JSON list of {"id", "title"} suggestions.
+        """
+        return await self.task_repository.suggest_tasks_json(prefix, owner_id, limit)
+
+    async def get_task_stats_json(self, owner_id: int) -> str:
+        """Count the tasks of owner_id by completion, priority and due date, as a JSON body.
+
+        Args:
+            owner_id (int): The ID of the owner of the tasks.
+
+        Returns:
+            str: The JSON stats.
+        """
+        return await self.task_repository.get_task_stats_json(owner_id)
+
+    async def get_task_summary_json(self, owner_id: int) -> str:
+        """Get the task counts of owner_id as a JSON body.
+
+        Args:
+            owner_id (int): The ID of the owner of the tasks.
+
+        Returns:
+            str: The JSON summary.
+        """
+        return await self.task_repository.get_task_summary_json(owner_id)
@@ -1,7 +1,18 @@
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from app import security
+from app.config import settings
 from app.domain.repositories.user_repository import IUserRepository
 from app.application.schemas.user import UserCreate
 from app.domain.models.user import User
+from app.infrastructure.services.worker_pool import WorkerPoolFull
+
+def password_hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many logins in progress, try again shortly",
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+    )
 
 class AuthService:
     def __init__(self, user_repository: IUserRepository):
@@ -26,24 +37,44 @@ class AuthService:
         db_user = self.user_repository.get_user_by_username(username=user.username)
         if db_user:
             raise HTTPException(status_code=400, detail="Username already taken")
-            
-        return self.user_repository.create_user(user=user)
 
-    def login_user(self, username: str, password: str) -> User:
+        try:
+            return self.user_repository.create_user(user=user)
+        except WorkerPoolFull:
+            raise password_hashing_busy()
+
+    async def login_user(self, username: str, password: str) -> User:
         """Login a user.
 
+        The password is checked on the password hashing pool. If it matches a
+        hash made with an outdated scheme or cost, the hash is replaced. The
+        repository is synchronous, so its queries run in the threadpool to
+        keep them off the event loop too.
+
         Args:
             username (str): The username of the user to login.
             password (str): The password of the user to login.
 
+        Raises:
+            HTTPException: If the credentials are wrong, or too many logins are
+                already in progress.
+
         Returns:
             User: The logged in user.
         """
-        user = self.user_repository.authenticate_user(username, password)
-        if not user:
+        user = await run_in_threadpool(self.user_repository.get_user_by_username, username)
+        try:
+            verified, new_hash = await security.verify_and_update_password(
+                password, user.hashed_password if user else None
+            )
+        except WorkerPoolFull:
+            raise password_hashing_busy()
+        if not verified:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return user 
\ No newline at end of file
+        if new_hash:
+            await run_in_threadpool(self.user_repository.update_password_hash, user.id, new_hash)
+        return user
@@ -0,0 +1,185 @@
+from fastapi import HTTPException
+from typing import Any, Callable, Dict, Optional, Protocol
+from collections import OrderedDict
+import datetime
+import logging
+import threading
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.domain.repositories.task_repository import ITaskRepository
+
+logger = logging.getLogger(__name__)
+
+class ReindexJob:
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "running"
+        self.indexed = 0
+        self.failed = 0
+        self.total: Optional[int] = None
+        self.error: Optional[str] = None
+        self.index: Optional[str] = None
+        self.started_at = datetime.datetime.utcnow()
+        self.finished_at: Optional[datetime.datetime] = None
+
+    @classmethod
+    def from_dict(cls, status: Dict[str, Any]) -> "ReindexJob":
+        """Rebuild a job from the status to_dict returned"""
+        job = cls()
+        job.id = status["job_id"]
+        job.status = status["status"]
+        job.indexed, job.failed, job.total = status["indexed"], status["failed"], status["total"]
+        job.index, job.error = status["index"], status["error"]
+        job.started_at = datetime.datetime.fromisoformat(status["started_at"])
+        if status["finished_at"]:
+            job.finished_at = datetime.datetime.fromisoformat(status["finished_at"])
+        return job
+
+    def update(self, indexed: int, failed: int, total: int) -> None:
+        self.indexed, self.failed, self.total = indexed, failed, total
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = ((self.finished_at or datetime.datetime.utcnow()) - self.started_at).total_seconds()
+        done = self.indexed + self.failed
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "total": self.total,
+            "progress": done / self.total if self.total else (1.0 if self.status == "completed" else 0.0),
+            "docs_per_second": done / elapsed if elapsed > 0 else 0.0,
+            "index": self.index,
+            "error": self.error,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+class JobLock(Protocol):
+    """Lock that keeps a job from running on more than one worker"""
+
+    def acquire(self) -> bool: ...
+    def extend(self) -> bool: ...
+    def release(self) -> None: ...
+
+class JobStore(Protocol):
+    """Job statuses shared by every worker, so any of them can report on a job"""
+
+    def save(self, job_id: str, status: Dict[str, Any]) -> None: ...
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]: ...
+
+class ReindexService:
+    """Run full search index rebuilds as background jobs.
+
+    A job builds a new index version on its own thread with its own database
+    session, so the request that starts it returns immediately and searches
+    are served from the previous version until the new one is swapped in.
+    Only one job runs at a time per process, and with a job_lock only one
+    across all workers; the most recent jobs are kept for status queries.
+    With a job_store the status is also saved there whenever it changes, so
+    a job started on one worker can be queried on any other.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        repository_factory: Callable[[Session], ITaskRepository],
+        history: int = 20,
+        job_lock: Optional[JobLock] = None,
+        job_store: Optional[JobStore] = None,
+    ):
+        self.session_factory = session_factory
+        self.repository_factory = repository_factory
+        self.history = history
+        self.job_lock = job_lock
+        self.job_store = job_store
+        self._jobs: "OrderedDict[str, ReindexJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _save(self, job: ReindexJob) -> None:
+        if self.job_store is None:
+            return
+        try:
+            self.job_store.save(job.id, job.to_dict())
+        except Exception as e:
+            logger.error(f"Failed to save the status of reindex job {job.id}: {str(e)}")
+
+    def _progress(self, job: ReindexJob) -> Callable[[int, int, int], None]:
+        def update(indexed: int, failed: int, total: int) -> None:
+            job.update(indexed, failed, total)
+            self._save(job)
+            if self.job_lock is not None and not self.job_lock.extend():
+                logger.warning(f"Reindex job {job.id} lost its lock, another worker may start a rebuild")
+        return update
+
+    def _run(self, job: ReindexJob) -> None:
+        db = self.session_factory()
+        try:
+            job.index = self.repository_factory(db).rebuild_search_index(progress=self._progress(job))
+            job.status = "completed"
+        except Exception as e:
+            logger.error(f"Reindex job {job.id} failed: {str(e)}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.datetime.utcnow()
+            self._save(job)
+            db.close()
+            if self.job_lock is not None:
+                try:
+                    self.job_lock.release()
+                except Exception as e:
+                    logger.error(f"Failed to release the lock of reindex job {job.id}: {str(e)}")
+
+    def start_job(self) -> Dict[str, Any]:
+        """Start a reindex job, or return the one already running.
+
+        Raises:
+            HTTPException: If another worker is running a reindex job.
+
+        Returns:
+            Dict[str, Any]: The status of the job.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == "running":
+                    return job.to_dict()
+            if self.job_lock is not None and not self.job_lock.acquire():
+                raise HTTPException(status_code=409, detail="A reindex is already running on another worker")
+            job = ReindexJob()
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+        self._save(job)
+        threading.Thread(target=self._run, args=(job,), name=f"reindex-{job.id}", daemon=True).start()
+        return job.to_dict()
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """Get the status and progress of a reindex job.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Jobs run by this worker are answered from memory, any other from the
+        job store.
+
+        Raises:
+            HTTPException: If the job is not found, or the job store is unavailable.
+
+        Returns:
+            Dict[str, Any]: The status of the job.
+        """
+        job = self._jobs.get(job_id)
+        if job is None and self.job_store is not None:
+            try:
+                status = self.job_store.load(job_id)
+            except Exception as e:
+                logger.error(f"Failed to load the status of reindex job {job_id}: {str(e)}")
+                raise HTTPException(status_code=503, detail="Reindex job status is unavailable")
+            if status is not None:
+                job = ReindexJob.from_dict(status)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Reindex job not found")
+        return job.to_dict()
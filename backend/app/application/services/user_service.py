@@ -0,0 +1,26 @@
+from fastapi import HTTPException
+from app.domain.repositories.user_repository import IUserRepository
+from app.application.schemas.user import UserAccessUpdate
+from app.domain.models.user import User
+
+class UserService:
+    def __init__(self, user_repository: IUserRepository):
+        self.user_repository = user_repository
+
+    def update_user_access(self, user_id: int, access: UserAccessUpdate) -> User:
+        """Activate or deactivate a user, or change its role.
+
+        Args:
+            user_id (int): The ID of the user.
+            access (UserAccessUpdate): The changes to apply.
+
+        Raises:
+            HTTPException: If the user does not exist.
+
+        Returns:
+            User: The updated user.
+        """
+        user = self.user_repository.update_user_access(user_id, access.is_active, access.role)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
@@ -0,0 +1,72 @@
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PRIORITIES = ("low", "normal", "high")
+
+# Due-date buckets of open tasks, in order
+DUE_BUCKETS = ("overdue", "today", "next_7_days", "later")
+
+
+def due_date_ranges(now: datetime) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """Return the (bucket, from, to) due-date ranges of open tasks at now.
+
+    Ranges include their start and exclude their end, like the date_range
+    aggregation of Elasticsearch. "today" runs from now to midnight and
+    "next_7_days" covers the seven days after it.
+
+    Args:
+        now (datetime): The current time, naive UTC like the stored due dates.
+
+    Returns:
+        List[Tuple[str, Optional[datetime], Optional[datetime]]]: One range per bucket of DUE_BUCKETS.
+    """
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), time.min)
+    week_end = tomorrow + timedelta(days=7)
+    return [
+        ("overdue", None, now),
+        ("today", now, tomorrow),
+        ("next_7_days", tomorrow, week_end),
+        ("later", week_end, None),
+    ]
+
+
+def due_date_bucket(due_date: datetime, ranges: List[Tuple[str, Optional[datetime], Optional[datetime]]]) -> str:
+    """Return the bucket of ranges that due_date falls in"""
+    for bucket, start, end in ranges:
+        if (start is None or due_date >= start) and (end is None or due_date < end):
+            return bucket
+    return DUE_BUCKETS[-1]
+
+
+def empty_task_stats() -> Dict[str, Any]:
+    return {
+        "total": 0,
+        "completed": 0,
+        "open": 0,
+        "by_priority": {priority: 0 for priority in PRIORITIES},
+        "due": {bucket: 0 for bucket in DUE_BUCKETS},
+    }
+
+
+def count_task_stats(rows: Iterable[Tuple[bool, str, Optional[str], int]]) -> Dict[str, Any]:
+    """Sum (completed, priority, due bucket, count) groups into task stats.
+
+    The due bucket of completed tasks is ignored: only open tasks are
+    bucketed by due date.
+
+    Args:
+        rows (Iterable[Tuple[bool, str, Optional[str], int]]): The grouped counts.
+
+    Returns:
+        Dict[str, Any]: The stats, shaped like the TaskStats schema.
+    """
+    stats = empty_task_stats()
+    for completed, priority, bucket, count in rows:
+        stats["total"] += count
+        stats["by_priority"][priority] += count
+        if completed:
+            stats["completed"] += count
+        else:
+            stats["open"] += count
+            stats["due"][bucket] += count
+    return stats
@@ -68,6 +68,91 @@ class Settings(BaseSettings):
         return es_url
 
     ELASTICSEARCH_INDEX_PREFIX: str = "todolist_"
+    ELASTICSEARCH_CONNECTIONS_PER_NODE: int = 25
+    ELASTICSEARCH_REQUEST_TIMEOUT: float = 10.0
+    ELASTICSEARCH_SEARCH_TIMEOUT: float = 2.0
+    ELASTICSEARCH_HTTP_COMPRESS: bool = True
+    ELASTICSEARCH_MAX_RETRIES: int = 2
+    ELASTICSEARCH_TASK_SHARDS: int = 1
+    ELASTICSEARCH_TASK_REPLICAS: int = 1
+    ELASTICSEARCH_TASK_REFRESH_INTERVAL: str = "1s"
+    ELASTICSEARCH_TASK_VERSIONS_TO_KEEP: int = 1
+
+    SEARCH_BACKEND: str = "elasticsearch"
+    SEARCH_EMBEDDED_SNAPSHOT_PATH: Optional[str] = None
+    # Workers keep their embedded indexes in step through this channel
+    SEARCH_EMBEDDED_CHANNEL: str = "search:embedded"
+    SEARCH_PAGE_SIZE: int = 100
+    # Counting every hit stops shards from terminating early on the index
+    # sort; set True, or a bound such as 10000, if totals are needed
+    SEARCH_TRACK_TOTAL_HITS: Union[bool, int] = False
+    SEARCH_USE_POINT_IN_TIME: bool = False
+    SEARCH_POINT_IN_TIME_KEEP_ALIVE: str = "1m"
+    SEARCH_FALLBACK_TRIGRAM: bool = False
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL: int = 60
+    SEARCH_CACHE_MAX_BYTES: int = 256 * 1024
+
+    SUGGEST_SIZE: int = 5
+    SUGGEST_MAX_SIZE: int = 10
+    SUGGEST_TIMEOUT: float = 0.3
+    SUGGEST_CACHE_TTL: int = 10
+
+    # Overdue counts drift with time, so stats are only cached briefly
+    TASK_STATS_CACHE_TTL: int = 60
+
+    SEARCH_OUTBOX_DISPATCHER_ENABLED: bool = True
+    SEARCH_OUTBOX_BATCH_SIZE: int = 500
+    SEARCH_OUTBOX_POLL_INTERVAL: float = 1.0
+    SEARCH_OUTBOX_RETRY_BASE_DELAY: float = 1.0
+    SEARCH_OUTBOX_RETRY_MAX_DELAY: float = 300.0
+
+    REINDEX_CHUNK_SIZE: int = 500
+    REINDEX_THREAD_COUNT: int = 4
+    REINDEX_QUEUE_SIZE: int = 4
+    # Held by the worker running a rebuild and renewed after every chunk
+    REINDEX_LOCK_TTL: float = 60.0
+    # How long a job's status can be queried after its last update
+    REINDEX_JOB_TTL: int = 60 * 60 * 24
+
+    TASK_CACHE_TTL: int = 60 * 60 * 6
+    TASK_LIST_CACHE_TTL: int = 60 * 60 * 6
+    TASKS_MAX_PAGE_SIZE: int = 100
+
+    # Authenticated users (id, is_active, role) by username, and verified
+    # access tokens by digest until they expire
+    PRINCIPAL_CACHE_TTL: int = 300
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+
+    # New passwords are hashed with the first scheme; hashes made with another
+    # scheme or another bcrypt cost are replaced on the user's next login
+    PASSWORD_HASH_SCHEMES: List[str] = ["bcrypt"]
+    BCRYPT_ROUNDS: int = 12
+    # Hashing runs on its own thread pool; logins beyond its queue get a 503
+    PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_ENTRIES: int = 10000
+    CACHE_L1_TTL: int = 30
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    CACHE_LOCK_TTL: float = 5.0
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05
+    CACHE_XFETCH_BETA: float = 1.0
+    CACHE_SCAN_COUNT: int = 500
+    CACHE_HOT_KEY_CAPACITY: int = 200
+    CACHE_HOT_KEY_SAMPLE_RATE: float = 0.05
+    # json, zlib, lz4 or columnar; columnar drops the repeated field names of
+    # task lists, which saves little after zlib and costs more to decode
+    CACHE_CODEC: str = "zlib"
+    CACHE_COMPRESSION_THRESHOLD: int = 1024
+    CACHE_ZLIB_LEVEL: int = 6
+
+    ASYNC_TASKS_API: bool = False
+    ASYNC_DB_POOL_SIZE: int = 20
+    ASYNC_DB_MAX_OVERFLOW: int = 30
+    ASYNC_REDIS_MAX_CONNECTIONS: int = 200
 
     def _is_host_reachable(self, host: str) -> bool:
         """Check if a host is reachable"""
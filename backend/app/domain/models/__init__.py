@@ -1,3 +1,4 @@
-
 from .user import User
-from .task import Task 
\ No newline at end of file
+from .task import Task
+from .task_outbox import TaskOutbox
+from .task_counter import TaskCounter
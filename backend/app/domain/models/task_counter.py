@@ -0,0 +1,19 @@
+from sqlalchemy import Column, ForeignKey, Integer
+
+from app.infrastructure.db.session import Base
+
+class TaskCounter(Base):
+    """Running counts of a user's tasks, so totals never need a COUNT(*).
+
+    Task writes adjust the row in the same transaction as the task change.
+    A user without tasks may have no row, which reads as all zeros. The
+    admin repair job recomputes every row from the tasks table.
+    """
+    __tablename__ = "task_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, default=0, nullable=False)
+    completed = Column(Integer, default=0, nullable=False)
+    priority_low = Column(Integer, default=0, nullable=False)
+    priority_normal = Column(Integer, default=0, nullable=False)
+    priority_high = Column(Integer, default=0, nullable=False)
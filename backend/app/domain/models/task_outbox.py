@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, Text
+import datetime
+
+from app.infrastructure.db.session import Base
+
+class TaskOutbox(Base):
+    """Pending search index change, written in the same transaction as the task.
+
+    Rows only name the task; the dispatcher indexes whatever state the task
+    has when the row is drained (or deletes the document if the task is
+    gone), so repeated changes to one task collapse into a single write.
+    owner_id is kept to route the delete of a task that no longer exists.
+    """
+    __tablename__ = "task_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, index=True, nullable=False)
+    owner_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    available_at = Column(DateTime, default=datetime.datetime.utcnow, index=True, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
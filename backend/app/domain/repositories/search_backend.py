@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# A page of search documents, the search_after position of its last hit and
+# the point in time it was read from
+SearchPage = Tuple[List[Dict[str, Any]], Optional[List[Any]], Optional[str]]
+
+class ISearchBackend(ABC):
+    """Full-text index of task documents, partitioned by owner.
+
+    Documents are the dicts built by TaskCacheMixin._search_document. Sorts
+    are "due_date", "priority" or "relevance"; search_after values and point
+    in time ids are opaque to callers and only valid with the backend that
+    returned them.
+    """
+
+    name: str = ""
+
+    # Backends that are not shared between processes (in-process indexes)
+    # are updated directly by the write paths instead of the search outbox
+    indexed_by_outbox: bool = True
+
+    @abstractmethod
+    def search(
+        self,
+        owner_id: int,
+        query: str,
+        sort: str = "due_date",
+        size: int = 100,
+        search_after: Optional[List[Any]] = None,
+        pit_id: Optional[str] = None,
+    ) -> SearchPage:
+        pass
+
+    @abstractmethod
+    async def search_async(
+        self,
+        owner_id: int,
+        query: str,
+        sort: str = "due_date",
+        size: int = 100,
+        search_after: Optional[List[Any]] = None,
+        pit_id: Optional[str] = None,
+    ) -> SearchPage:
+        pass
+
+    @abstractmethod
+    def suggest(self, owner_id: int, prefix: str, size: int = 5) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def suggest_async(self, owner_id: int, prefix: str, size: int = 5) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def task_stats(self, owner_id: int, now: datetime) -> Dict[str, Any]:
+        """Count the owner's tasks by completion, priority and due date, like count_task_stats"""
+        pass
+
+    @abstractmethod
+    async def task_stats_async(self, owner_id: int, now: datetime) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def open_point_in_time(self, owner_id: int) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def open_point_in_time_async(self, owner_id: int) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def close_point_in_time(self, pit_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def close_point_in_time_async(self, pit_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def index_documents(self, documents: Iterable[Dict[str, Any]]) -> None:
+        pass
+
+    @abstractmethod
+    def delete_documents(self, keys: Iterable[Tuple[int, int]]) -> None:
+        """Remove documents by (task_id, owner_id)"""
+        pass
+
+    @abstractmethod
+    def rebuild(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Replace the whole index with documents and return how many were indexed"""
+        pass
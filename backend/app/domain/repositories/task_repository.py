@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
 from app.domain.models.task import Task
 from app.application.schemas.task import TaskCreate, TaskUpdate
 
@@ -8,12 +8,28 @@ class ITaskRepository(ABC):
     def get_task(self, task_id: int) -> Optional[Task]:
         pass
 
+    @abstractmethod
+    def get_task_json(self, task_id: int) -> Optional[str]:
+        pass
+
     @abstractmethod
     def get_tasks(self, skip: int = 0, limit: int = 100) -> List[Task]:
         pass
 
     @abstractmethod
-    def get_user_tasks(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Task]:
+    def get_user_tasks(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[Task]:
+        pass
+
+    @abstractmethod
+    def get_user_tasks_json(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[str, Optional[str], int]:
+        pass
+
+    @abstractmethod
+    def get_tasks_by_ids(self, task_ids: List[int], owner_id: int) -> List[Task]:
         pass
 
     @abstractmethod
@@ -29,9 +45,108 @@ class ITaskRepository(ABC):
         pass
 
     @abstractmethod
-    def search_tasks(self, query: str, user_id: int) -> List[Task]:
+    def search_tasks(self, query: str, user_id: int, sort: str = "due_date") -> List[Task]:
+        pass
+
+    @abstractmethod
+    def search_tasks_page(
+        self,
+        query: str,
+        user_id: int,
+        sort: str = "due_date",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Task], Optional[str]]:
+        pass
+
+    @abstractmethod
+    def suggest_tasks_json(self, prefix: str, user_id: int, limit: int = 5) -> str:
+        pass
+
+    @abstractmethod
+    def get_task_stats_json(self, user_id: int) -> str:
         pass
 
     @abstractmethod
-    def reindex_all_tasks(self) -> int:
-        pass 
\ No newline at end of file
+    def get_task_summary_json(self, user_id: int) -> str:
+        pass
+
+    @abstractmethod
+    def repair_task_counters(self) -> int:
+        pass
+
+    @abstractmethod
+    def reindex_all_tasks(
+        self,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+        index_name: Optional[str] = None,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def rebuild_search_index(self, progress: Optional[Callable[[int, int, int], None]] = None) -> str:
+        pass
+
+class IAsyncTaskRepository(ABC):
+    @abstractmethod
+    async def get_task(self, task_id: int) -> Optional[Task]:
+        pass
+
+    @abstractmethod
+    async def get_task_json(self, task_id: int) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def get_user_tasks(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[Task]:
+        pass
+
+    @abstractmethod
+    async def get_user_tasks_json(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[str, Optional[str], int]:
+        pass
+
+    @abstractmethod
+    async def get_tasks_by_ids(self, task_ids: List[int], owner_id: int) -> List[Task]:
+        pass
+
+    @abstractmethod
+    async def create_task(self, task: TaskCreate, owner_id: int) -> Task:
+        pass
+
+    @abstractmethod
+    async def update_task(self, task_id: int, task: TaskUpdate, owner_id: int) -> Optional[Task]:
+        pass
+
+    @abstractmethod
+    async def delete_task(self, task_id: int, owner_id: int) -> Optional[Task]:
+        pass
+
+    @abstractmethod
+    async def search_tasks(self, query: str, user_id: int, sort: str = "due_date") -> List[Task]:
+        pass
+
+    @abstractmethod
+    async def search_tasks_page(
+        self,
+        query: str,
+        user_id: int,
+        sort: str = "due_date",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Task], Optional[str]]:
+        pass
+
+    @abstractmethod
+    async def suggest_tasks_json(self, prefix: str, user_id: int, limit: int = 5) -> str:
+        pass
+
+    @abstractmethod
+    async def get_task_stats_json(self, user_id: int) -> str:
+        pass
+
+    @abstractmethod
+    async def get_task_summary_json(self, user_id: int) -> str:
+        pass
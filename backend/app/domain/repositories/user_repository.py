@@ -12,10 +12,29 @@ class IUserRepository(ABC):
     def get_user_by_username(self, username: str) -> Optional[User]:
         pass
 
+    @abstractmethod
+    def get_principal(self, username: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    def update_user_access(
+        self, user_id: int, is_active: Optional[bool] = None, role: Optional[str] = None
+    ) -> Optional[User]:
+        pass
+
     @abstractmethod
     def create_user(self, user: UserCreate) -> User:
         pass
 
     @abstractmethod
-    def authenticate_user(self, username: str, password: str) -> Optional[User]:
-        pass 
\ No newline at end of file
+    def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        pass
+
+class IAsyncUserRepository(ABC):
+    @abstractmethod
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def get_principal(self, username: str) -> Optional[User]:
+        pass
@@ -0,0 +1,32 @@
+from typing import Any, Dict
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+
+def get_async_database_uri(uri: str) -> str:
+    """Map a sync database URI onto its asyncio driver (asyncpg / aiosqlite)"""
+    if uri.startswith("postgresql://"):
+        return uri.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if uri.startswith("sqlite://"):
+        return uri.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return uri
+
+def get_async_engine_options(uri: str) -> Dict[str, Any]:
+    """Pool sizing for the engine; aiosqlite uses a NullPool, which takes none"""
+    if make_url(uri).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.ASYNC_DB_POOL_SIZE,
+        "max_overflow": settings.ASYNC_DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+    }
+
+async_database_uri = get_async_database_uri(settings.SQLALCHEMY_DATABASE_URI)
+async_engine = create_async_engine(async_database_uri, **get_async_engine_options(async_database_uri))
+
+# Objects must stay readable after commit: lazy loads are not possible on an AsyncSession
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
@@ -0,0 +1,27 @@
+"""Add owner_id to task_outbox
+
+Revision ID: 5b8d2e6f1a37
+Revises: e3a91f4c7b52
+Create Date: 2026-10-17 14:05:48.227931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8d2e6f1a37'
+down_revision: Union[str, None] = 'e3a91f4c7b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Search documents are routed by owner; deletes need it once the task is gone
+    op.add_column('task_outbox', sa.Column('owner_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('task_outbox', 'owner_id')
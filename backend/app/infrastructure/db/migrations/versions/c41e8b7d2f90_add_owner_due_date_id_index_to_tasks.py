@@ -0,0 +1,32 @@
+"""Add (owner_id, due_date, id) index to tasks
+
+Revision ID: c41e8b7d2f90
+Revises: 72f197c2a319
+Create Date: 2026-10-17 09:12:05.114207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e8b7d2f90'
+down_revision: Union[str, None] = '72f197c2a319'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the per-owner listing ordered by due date and its keyset cursor
+    op.create_index(
+        'ix_tasks_owner_id_due_date_id',
+        'tasks',
+        ['owner_id', 'due_date', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_owner_id_due_date_id', table_name='tasks')
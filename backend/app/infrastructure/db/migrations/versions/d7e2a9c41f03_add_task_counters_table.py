@@ -0,0 +1,47 @@
+"""Add task_counters table
+
+Revision ID: d7e2a9c41f03
+Revises: 9c4f1d7a2e68
+Create Date: 2026-10-17 19:05:12.274906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e2a9c41f03'
+down_revision: Union[str, None] = '9c4f1d7a2e68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('completed', sa.Integer(), nullable=False),
+        sa.Column('priority_low', sa.Integer(), nullable=False),
+        sa.Column('priority_normal', sa.Integer(), nullable=False),
+        sa.Column('priority_high', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    # Backfill from the existing tasks
+    op.execute(
+        "INSERT INTO task_counters "
+        "(user_id, total, completed, priority_low, priority_normal, priority_high) "
+        "SELECT owner_id, COUNT(*), "
+        "SUM(CASE WHEN completed THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN priority = 'low' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN priority = 'normal' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN priority = 'high' THEN 1 ELSE 0 END) "
+        "FROM tasks GROUP BY owner_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_counters')
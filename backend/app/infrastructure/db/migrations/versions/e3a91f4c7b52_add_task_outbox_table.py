@@ -0,0 +1,41 @@
+"""Add task_outbox table
+
+Revision ID: e3a91f4c7b52
+Revises: c41e8b7d2f90
+Create Date: 2026-10-17 11:40:31.562014
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a91f4c7b52'
+down_revision: Union[str, None] = 'c41e8b7d2f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_outbox_id'), 'task_outbox', ['id'], unique=False)
+    op.create_index(op.f('ix_task_outbox_task_id'), 'task_outbox', ['task_id'], unique=False)
+    op.create_index(op.f('ix_task_outbox_available_at'), 'task_outbox', ['available_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_task_outbox_available_at'), table_name='task_outbox')
+    op.drop_index(op.f('ix_task_outbox_task_id'), table_name='task_outbox')
+    op.drop_index(op.f('ix_task_outbox_id'), table_name='task_outbox')
+    op.drop_table('task_outbox')
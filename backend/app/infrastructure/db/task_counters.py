@@ -0,0 +1,48 @@
+from typing import Any, Dict
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.domain.models.task import Task, PriorityEnum
+from app.domain.models.task_counter import TaskCounter
+
+COUNTER_COLUMNS = ("total", "completed", "priority_low", "priority_normal", "priority_high")
+
+
+def task_counter_upsert(dialect_name: str, owner_id: int, changes: Dict[str, int]) -> Any:
+    """Statement adding changes to owner_id's counters, creating the row if needed.
+
+    PostgreSQL and SQLite use a single INSERT ... ON CONFLICT DO UPDATE, so
+    concurrent first writes of a user cannot race to create the row. Other
+    dialects only update an existing row; missing rows are created by the
+    repair job.
+
+    Args:
+        dialect_name (str): The name of the dialect of the session's bind.
+        owner_id (int): The ID of the owner of the tasks.
+        changes (Dict[str, int]): The delta of each changed counter column.
+
+    Returns:
+        Any: The statement to execute in the task's transaction.
+    """
+    increments = {name: getattr(TaskCounter, name) + delta for name, delta in changes.items()}
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(dialect_name)
+    if dialect is None:
+        return update(TaskCounter).where(TaskCounter.user_id == owner_id).values(increments)
+    values = {name: changes.get(name, 0) for name in COUNTER_COLUMNS}
+    return dialect.insert(TaskCounter).values(user_id=owner_id, **values).on_conflict_do_update(
+        index_elements=[TaskCounter.user_id], set_=increments
+    )
+
+
+def task_counter_totals():
+    """SELECT of every owner's counters recomputed from the tasks table, in COUNTER_COLUMNS order"""
+    def count_if(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    return select(
+        Task.owner_id,
+        func.count(Task.id),
+        count_if(Task.completed.is_(True)),
+        *(count_if(Task.priority == priority) for priority in PriorityEnum),
+    ).group_by(Task.owner_id)
@@ -0,0 +1,47 @@
+import re
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import func, literal_column, or_, text
+
+from app.config import settings
+from app.domain.models.task import Task
+
+# Words of a query, as the full-text tokenizers of both dialects split them
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(terms: list) -> str:
+    """Quote each term so user input is never parsed as FTS5 syntax; all terms must match as prefixes"""
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+def task_text_match(dialect_name: str, query: str) -> Tuple[Any, Optional[Any]]:
+    """Full-text condition of the database search fallback for the given dialect.
+
+    PostgreSQL matches the GIN-indexed search_vector column (and the title
+    trigram index when SEARCH_FALLBACK_TRIGRAM is on); SQLite matches the
+    tasks_fts FTS5 table. Other dialects, and queries without any word,
+    fall back to a substring match.
+
+    Args:
+        dialect_name (str): The name of the dialect of the session's bind.
+        query (str): The user's search query.
+
+    Returns:
+        Tuple[Any, Optional[Any]]: The WHERE condition and, when the dialect
+            can score matches, a relevance expression to order by descending.
+    """
+    terms = _TERM_PATTERN.findall(query)
+    if terms and dialect_name == "postgresql":
+        ts_query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        search_vector = literal_column("tasks.search_vector")
+        condition = search_vector.op("@@")(ts_query)
+        if settings.SEARCH_FALLBACK_TRIGRAM:
+            condition = or_(condition, Task.title.op("%")(query))
+        return condition, func.ts_rank_cd(search_vector, ts_query)
+    if terms and dialect_name == "sqlite":
+        matches = text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH :fts_query").bindparams(
+            fts_query=_fts5_query(terms)
+        )
+        return Task.id.in_(matches), None
+    return Task.title.ilike(f"%{query}%") | Task.description.ilike(f"%{query}%"), None
@@ -0,0 +1,546 @@
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Awaitable, Callable, Optional, Tuple
+import asyncio
+import json
+import time
+import logging
+from datetime import datetime
+
+from app.domain.models.task import Task
+from app.domain.models.task_counter import TaskCounter
+from app.application.schemas.task import TaskCreate, TaskUpdate
+from app.infrastructure.services.search_backend import get_search_backend
+from app.infrastructure.services.redis_async import (
+    get_cache, set_cache, get_many_cache, set_many_cache, delete_cache, get_cache_version,
+    bump_cache_versions, publish_cache_invalidation, acquire_lock, release_lock, invalidate_tag
+)
+from app.infrastructure.services.redis import cache_metrics
+from app.infrastructure.services.stampede import AsyncSingleFlight, pack_cache_entry, unpack_cache_entry
+from app.infrastructure.repositories.task_repository import TaskCacheMixin
+from app.config import settings
+from app.application.pagination import decode_task_cursor, decode_search_cursor
+from app.domain.repositories.task_repository import IAsyncTaskRepository
+
+logger = logging.getLogger(__name__)
+
+# Shared by all repository instances of this process so that concurrent
+# requests for the same cache key run a single database query
+_single_flight = AsyncSingleFlight()
+
+class AsyncTaskRepository(TaskCacheMixin, IAsyncTaskRepository):
+    """Task repository for the async request path.
+
+    Mirrors TaskRepository on an AsyncSession and redis.asyncio. Queries,
+    cache keys and payloads come from TaskCacheMixin, so both paths serve
+    the same cache entries side by side and this class only awaits I/O.
+    Search goes through the shared AsyncElasticsearch client and index
+    updates through the search outbox.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _invalidate_task_lists(self, owner_id: int, task_id: int) -> None:
+        """Bump the list cache generations touched by a write to owner_id's tasks.
+
+        See TaskRepository._invalidate_task_lists.
+
+        Args:
+            owner_id (int): The ID of the owner whose tasks changed.
+            task_id (int): The ID of the task that was written.
+        """
+        version_keys = self._task_list_version_keys(owner_id)
+        await bump_cache_versions(*version_keys)
+        for tag in self._task_list_tags(owner_id):
+            await invalidate_tag(tag)
+        await publish_cache_invalidation(*version_keys, self._get_cache_key("task", task_id=task_id))
+
+    async def _adjust_task_counters(self, owner_id: int, *deltas: dict) -> None:
+        """Apply counter deltas to owner_id's counters in the current transaction"""
+        statement = self._task_counter_upsert(self.db.bind.dialect.name, owner_id, *deltas)
+        if statement is not None:
+            await self.db.execute(statement)
+
+    async def _apply_search_update(self, task_id: int, owner_id: int, task: Optional[Task] = None) -> None:
+        """Apply a committed task change to an in-process search backend.
+
+        See TaskCacheMixin._apply_search_update; its broadcast is a blocking
+        Redis call, so it runs in the threadpool.
+
+        Args:
+            task_id (int): The ID of the task that changed.
+            owner_id (int): The ID of the owner of the task.
+            task (Optional[Task], optional): The task as committed, None if it was deleted.
+                Defaults to None.
+        """
+        if not get_search_backend().indexed_by_outbox:
+            await run_in_threadpool(super()._apply_search_update, task_id, owner_id, task)
+
+    async def _write_through_task(self, task: Task) -> None:
+        """Refresh the single-task cache entry with the task's new state.
+
+        Args:
+            task (Task): The task that was just written.
+        """
+        for cache_key, entry in self._task_cache_entries([task]).items():
+            await set_cache(cache_key, entry, settings.TASK_CACHE_TTL)
+
+    async def _read_through(
+        self,
+        cache_key: str,
+        load: Callable[[], Awaitable[Optional[str]]],
+        ttl: int,
+        tags: tuple = (),
+    ) -> Optional[str]:
+        """Read a cached payload, recomputing it with stampede protection.
+
+        See TaskRepository._read_through.
+
+        Args:
+            cache_key (str): The cache key.
+            load (Callable[[], Awaitable[Optional[str]]]): Computes the payload, None if there is nothing to cache.
+            ttl (int): The cache TTL in seconds.
+            tags (tuple, optional): Tags to record the key under. Defaults to ().
+
+        Returns:
+            Optional[str]: The payload.
+        """
+        payload, stale = self._fresh_cache_payload(await get_cache(cache_key))
+        if payload is not None:
+            return payload
+
+        return await _single_flight.do(
+            cache_key, lambda: self._recompute(cache_key, load, ttl, stale, tags)
+        )
+
+    async def _recompute(
+        self,
+        cache_key: str,
+        load: Callable[[], Awaitable[Optional[str]]],
+        ttl: int,
+        stale: Optional[str],
+        tags: tuple = (),
+    ) -> Optional[str]:
+        """Recompute a cache entry while holding its Redis lock.
+
+        Args:
+            cache_key (str): The cache key.
+            load (Callable[[], Awaitable[Optional[str]]]): Computes the payload.
+            ttl (int): The cache TTL in seconds.
+            stale (Optional[str]): The payload being refreshed early, if any.
+            tags (tuple, optional): Tags to record the key under. Defaults to ().
+
+        Returns:
+            Optional[str]: The payload.
+        """
+        lock_key = f"lock:{cache_key}"
+        token = await acquire_lock(lock_key, settings.CACHE_LOCK_TTL)
+        if token is None:
+            # Another process is recomputing: serve what we have or wait for it
+            if stale is not None:
+                return stale
+            deadline = time.monotonic() + settings.CACHE_LOCK_TTL
+            while time.monotonic() < deadline:
+                await asyncio.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+                cached_data = await get_cache(cache_key)
+                if cached_data:
+                    return unpack_cache_entry(cached_data)[0]
+            logger.warning(f"Timed out waiting for {cache_key} to be recomputed")
+
+        try:
+            started = time.monotonic()
+            payload = await load()
+            delta = time.monotonic() - started
+            cache_metrics.record_load(cache_key, delta)
+            if payload is not None:
+                await set_cache(cache_key, pack_cache_entry(payload, delta, ttl), ttl, tags=tags)
+            return payload
+        finally:
+            if token is not None:
+                await release_lock(lock_key, token)
+
+    async def _get_owned_task(self, task_id: int, owner_id: int) -> Optional[Task]:
+        """Load a task from the database if it belongs to owner_id.
+
+        Args:
+            task_id (int): The ID of the task.
+            owner_id (int): The ID of the owner of the task.
+
+        Returns:
+            Optional[Task]: The task.
+        """
+        return (await self.db.scalars(self._owned_task_query(task_id, owner_id))).first()
+
+    async def create_task(self, task: TaskCreate, owner_id: int) -> Task:
+        """Create a new task.
+
+        Args:
+            task (TaskCreate): The task to create.
+            owner_id (int): The ID of the owner of the task.
+
+        Returns:
+            Task: The created task.
+        """
+        task_data = task.model_dump()
+        db_task = Task(**task_data, owner_id=owner_id)
+        self.db.add(db_task)
+        await self.db.flush()
+        self._enqueue_search_update(db_task.id, owner_id)
+        await self._adjust_task_counters(owner_id, self._task_counter_deltas(db_task))
+        await self.db.commit()
+        await self.db.refresh(db_task)
+        await self._apply_search_update(db_task.id, owner_id, db_task)
+
+        await self._write_through_task(db_task)
+        await self._invalidate_task_lists(owner_id, db_task.id)
+
+        return db_task
+
+    async def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a task by its ID.
+
+        Args:
+            task_id (int): The ID of the task to get.
+
+        Returns:
+            Optional[Task]: The task.
+        """
+        payload = await self.get_task_json(task_id)
+        return Task(**json.loads(payload)) if payload else None
+
+    async def get_task_json(self, task_id: int) -> Optional[str]:
+        """Get a task by its ID as its rendered JSON response body.
+
+        Args:
+            task_id (int): The ID of the task to get.
+
+        Returns:
+            Optional[str]: The JSON body of the task, None if it does not exist.
+        """
+        cache_key = self._get_cache_key("task", task_id=task_id)
+
+        async def load() -> Optional[str]:
+            task = await self.db.get(Task, task_id)
+            return self._render_task(task) if task else None
+
+        return await self._read_through(cache_key, load, settings.TASK_CACHE_TTL)
+
+    async def get_tasks_by_ids(self, task_ids: list[int], owner_id: int) -> list[Task]:
+        """Get several of an owner's tasks by their IDs.
+
+        See TaskRepository.get_tasks_by_ids.
+
+        Args:
+            task_ids (list[int]): The IDs of the tasks to get.
+            owner_id (int): The ID of the owner of the tasks.
+
+        Returns:
+            list[Task]: The found tasks, in the order of task_ids.
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        cache_keys = [self._get_cache_key("task", task_id=task_id) for task_id in task_ids]
+
+        found = self._cached_tasks(task_ids, await get_many_cache(cache_keys))
+
+        missing = [task_id for task_id in task_ids if task_id not in found]
+        if missing:
+            started = time.monotonic()
+            tasks = (await self.db.scalars(self._owned_tasks_query(missing, owner_id))).all()
+            cache_metrics.record_load(cache_keys[0], time.monotonic() - started)
+            backfill = self._task_cache_entries(tasks, found)
+            if backfill:
+                await set_many_cache(backfill, settings.TASK_CACHE_TTL)
+
+        return self._owned_tasks(task_ids, found, owner_id)
+
+    async def update_task(self, task_id: int, task: TaskUpdate, owner_id: int) -> Optional[Task]:
+        """Update a task.
+
+        Args:
+            task_id (int): The ID of the task to update.
+            task (TaskUpdate): The task to update.
+            owner_id (int): The ID of the owner of the task.
+
+        Returns:
+            Optional[Task]: The updated task.
+        """
+        db_task = await self._get_owned_task(task_id, owner_id)
+
+        if db_task:
+            previous = self._task_counter_deltas(db_task, -1)
+            self._update_task_fields(db_task, task)
+            self._enqueue_search_update(task_id, owner_id)
+            await self._adjust_task_counters(owner_id, previous, self._task_counter_deltas(db_task))
+            await self.db.commit()
+            await self.db.refresh(db_task)
+            await self._apply_search_update(task_id, owner_id, db_task)
+
+            await self._write_through_task(db_task)
+            await self._invalidate_task_lists(owner_id, task_id)
+
+            return db_task
+        return None
+
+    async def delete_task(self, task_id: int, owner_id: int) -> Optional[Task]:
+        """Delete a task.
+
+        Args:
+            task_id (int): The ID of the task to delete.
+            owner_id (int): The ID of the owner of the task.
+
+        Returns:
+            Optional[Task]: The deleted task.
+        """
+        db_task = await self._get_owned_task(task_id, owner_id)
+
+        if db_task:
+            await self.db.delete(db_task)
+            self._enqueue_search_update(task_id, owner_id)
+            await self._adjust_task_counters(owner_id, self._task_counter_deltas(db_task, -1))
+            await self.db.commit()
+            await self._apply_search_update(task_id, owner_id)
+
+            await delete_cache(self._get_cache_key("task", task_id=task_id))
+            await self._invalidate_task_lists(owner_id, task_id)
+
+            return db_task
+        return None
+
+    async def get_user_tasks(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> list[Task]:
+        """Get all tasks for a user with pagination.
+
+        Args:
+            user_id (int): The ID of the user to get tasks for.
+            skip (int, optional): The number of tasks to skip. Defaults to 0.
+            limit (int, optional): The number of tasks to return. Defaults to 100.
+            cursor (Optional[str], optional): Opaque cursor of the previous page. Defaults to None.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        Returns:
+            list[Task]: A list of tasks.
+        """
+        body, _, _ = await self.get_user_tasks_json(user_id, skip, limit, cursor)
+        return [Task(**data) for data in json.loads(body)]
+
+    async def get_user_tasks_json(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[str, Optional[str], int]:
+        """Get a page of a user's tasks as its rendered JSON response body.
+
+        See TaskRepository.get_user_tasks_json.
+
+        Args:
+            user_id (int): The ID of the user to get tasks for.
+            skip (int, optional): The number of tasks to skip. Defaults to 0.
+            limit (int, optional): The number of tasks to return. Defaults to 100.
+            cursor (Optional[str], optional): Opaque cursor of the previous page. Defaults to None.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        Returns:
+            Tuple[str, Optional[str], int]: The JSON body of the page, the cursor of the next
+                one and the number of tasks of the user.
+        """
+        limit = min(limit, settings.TASKS_MAX_PAGE_SIZE)
+        after = decode_task_cursor(cursor) if cursor else None
+
+        version = await get_cache_version(self._get_cache_key("user_tasks_version", user_id=user_id))
+        cache_key = self._get_cache_key(
+            "user_tasks", user_id=user_id, version=version, skip=skip, limit=limit, cursor=cursor
+        )
+
+        async def load() -> str:
+            tasks = (await self.db.scalars(self._user_tasks_query(user_id, skip, limit, after))).all()
+            return self._render_task_page(tasks, limit, await self.db.get(TaskCounter, user_id))
+
+        payload = await self._read_through(
+            cache_key,
+            load,
+            settings.TASK_LIST_CACHE_TTL,
+            tags=(self._get_cache_key("user_tasks_tag", user_id=user_id),),
+        )
+        return self._read_task_page(payload)
+
+    async def get_task_summary_json(self, user_id: int) -> str:
+        """Get the user's task counts as a JSON body, without counting tasks.
+
+        See TaskRepository.get_task_summary_json.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            str: The JSON summary, shaped like the TaskSummary schema.
+        """
+        version = await get_cache_version(self._get_cache_key("user_tasks_version", user_id=user_id))
+        cache_key = self._get_cache_key("user_summary", user_id=user_id, version=version)
+
+        async def load() -> str:
+            return self._render_task_summary(await self.db.get(TaskCounter, user_id))
+
+        return await self._read_through(
+            cache_key, load, settings.TASK_LIST_CACHE_TTL,
+            tags=(self._get_cache_key("user_tasks_tag", user_id=user_id),)
+        )
+
+    async def search_tasks(self, query: str, user_id: int, sort: str = "due_date") -> list[Task]:
+        """Search tasks using Elasticsearch based on query and user_id.
+
+        Args:
+            query (str): The query to search for.
+            user_id (int): The ID of the user to search for.
+            sort (str, optional): "due_date", "priority" or "relevance". Defaults to "due_date".
+
+        Returns:
+            list[Task]: The first page of matching tasks.
+        """
+        return (await self.search_tasks_page(query, user_id, sort))[0]
+
+    async def search_tasks_page(
+        self,
+        query: str,
+        user_id: int,
+        sort: str = "due_date",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[list[Task], Optional[str]]:
+        """Search a page of tasks using Elasticsearch based on query and user_id.
+
+        Args:
+            query (str): The query to search for.
+            user_id (int): The ID of the user to search for.
+            sort (str, optional): "due_date", "priority" or "relevance". Defaults to "due_date".
+            limit (Optional[int], optional): The page size. Defaults to SEARCH_PAGE_SIZE.
+            cursor (Optional[str], optional): Opaque cursor of the previous page. Defaults to None.
+
+        Pages are cached per user, see TaskRepository.search_tasks_page.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another sort.
+
+        Returns:
+            Tuple[list[Task], Optional[str]]: The tasks and the cursor of the next page.
+        """
+        limit = min(limit or settings.SEARCH_PAGE_SIZE, settings.TASKS_MAX_PAGE_SIZE)
+        if cursor:
+            decode_search_cursor(cursor, sort)
+        if not settings.SEARCH_CACHE_ENABLED:
+            return await self._search_tasks_page(query, user_id, sort, limit, cursor)
+
+        version = await get_cache_version(self._get_cache_key("user_search_version", user_id=user_id))
+        cache_key = self._search_page_cache_key(user_id, version, query, sort, limit, cursor)
+        uncached = {}
+
+        async def load() -> Optional[str]:
+            page = await self._search_tasks_page(query, user_id, sort, limit, cursor)
+            return self._cacheable_search_page(self._pack_search_page(*page), uncached)
+
+        payload = await self._read_through(
+            cache_key, load, settings.SEARCH_CACHE_TTL,
+            tags=(self._get_cache_key("user_search_tag", user_id=user_id),)
+        ) or uncached.get("payload")
+        if payload is None:
+            return await self._search_tasks_page(query, user_id, sort, limit, cursor)
+        return self._unpack_search_page(payload)
+
+    async def _search_tasks_page(
+        self, query: str, user_id: int, sort: str, limit: int, cursor: Optional[str]
+    ) -> Tuple[list[Task], Optional[str]]:
+        """Search a page of tasks in the search backend, or in the database if it is unavailable"""
+        backend = get_search_backend()
+        offset, search_after, pit_id = decode_search_cursor(cursor, sort) if cursor else (0, None, None)
+        if cursor is None or search_after is not None:
+            try:
+                if cursor is None and settings.SEARCH_USE_POINT_IN_TIME:
+                    pit_id = await backend.open_point_in_time_async(user_id)
+                hits, search_after, pit_id = await backend.search_async(
+                    user_id, query, sort=sort, size=limit, search_after=search_after, pit_id=pit_id
+                )
+                page, finished_pit_id = self._search_hits_page(
+                    sort, offset, limit, cursor, hits, search_after, pit_id
+                )
+                if finished_pit_id:
+                    await backend.close_point_in_time_async(finished_pit_id)
+                if page is not None:
+                    return page
+            except Exception as e:
+                logger.error(f"Search backend failed: {str(e)}")
+
+        logger.info(f"Falling back to database search for query: '{query}'")
+        tasks = list((await self.db.scalars(self._search_fallback_query(
+            self.db.bind.dialect.name, query, user_id, sort, offset, limit
+        ))).all())
+        return tasks, self._next_search_cursor(sort, offset, len(tasks), limit)
+
+    async def suggest_tasks_json(self, prefix: str, user_id: int, limit: int = 5) -> str:
+        """Suggest the user's tasks whose title starts like prefix, as a JSON body.
+
+        See TaskRepository.suggest_tasks_json.
+
+        Args:
+            prefix (str): What the user has typed so far.
+            user_id (int): The ID of the user to suggest tasks for.
+            limit (int, optional): The number of suggestions. Defaults to 5.
+
+        Returns:
+            str: The JSON list of {"id", "title"} suggestions.
+        """
+        limit = min(limit, settings.SUGGEST_MAX_SIZE)
+        version = await get_cache_version(self._get_cache_key("user_search_version", user_id=user_id))
+        cache_key = self._suggest_cache_key(user_id, version, prefix, limit)
+        cached_data = await get_cache(cache_key)
+        if cached_data:
+            return unpack_cache_entry(cached_data)[0]
+
+        try:
+            suggestions = await get_search_backend().suggest_async(user_id, prefix, size=limit)
+        except Exception as e:
+            logger.error(f"Search backend suggest failed: {str(e)}")
+            result = await self.db.execute(self._suggest_fallback_query(
+                self.db.bind.dialect.name, prefix, user_id, limit
+            ))
+            suggestions = [{"id": row.id, "title": row.title} for row in result]
+
+        payload = self._render_suggestions(suggestions)
+        await set_cache(
+            cache_key,
+            pack_cache_entry(payload, 0, settings.SUGGEST_CACHE_TTL),
+            settings.SUGGEST_CACHE_TTL,
+            tags=(self._get_cache_key("user_search_tag", user_id=user_id),)
+        )
+        return payload
+
+    async def get_task_stats_json(self, user_id: int) -> str:
+        """Count the user's tasks by completion, priority and due date, as a JSON body.
+
+        See TaskRepository.get_task_stats_json.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            str: The JSON stats, shaped like the TaskStats schema.
+        """
+        version = await get_cache_version(self._get_cache_key("user_search_version", user_id=user_id))
+        cache_key = self._get_cache_key("user_stats", user_id=user_id, version=version)
+
+        async def load() -> str:
+            now = datetime.utcnow()
+            try:
+                stats = await get_search_backend().task_stats_async(user_id, now)
+            except Exception as e:
+                logger.error(f"Search backend stats failed: {str(e)}")
+                result = await self.db.execute(self._task_stats_query(user_id, now))
+                stats = self._count_task_stats_rows(result)
+            return self._render_task_stats(stats)
+
+        return await self._read_through(
+            cache_key, load, settings.TASK_STATS_CACHE_TTL,
+            tags=(self._get_cache_key("user_search_tag", user_id=user_id),)
+        )
@@ -0,0 +1,57 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import logging
+
+from app.domain.models.user import User
+from app.domain.repositories.user_repository import IAsyncUserRepository
+from app.infrastructure.repositories.user_repository import UserCacheMixin
+from app.infrastructure.services.redis_async import get_cache, set_cache, get_cache_version
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class AsyncUserRepository(UserCacheMixin, IAsyncUserRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_by_username(self, username: str) -> User | None:
+        """Get a user by their username.
+
+        Args:
+            username (str): The username of the user to get.
+
+        Returns:
+            User | None: The user.
+        """
+        result = await self.db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
+
+    async def get_principal(self, username: str) -> Optional[User]:
+        """Get the user a request authenticates as, from the principal cache when possible.
+
+        See UserRepository.get_principal.
+
+        Args:
+            username (str): The subject of the access token.
+
+        Returns:
+            Optional[User]: The user, None if it does not exist.
+        """
+        cache_key = None
+        try:
+            version = await get_cache_version(self._principal_version_key(username))
+            cache_key = self._principal_cache_key(username, version)
+            cached_data = await get_cache(cache_key)
+            if cached_data:
+                return self._principal_from_payload(cached_data)
+        except Exception as e:
+            logger.error(f"Failed to read principal {username} from cache: {str(e)}")
+
+        user = await self.get_user_by_username(username)
+        if user is not None and cache_key is not None:
+            try:
+                await set_cache(cache_key, self._serialize_principal(user), settings.PRINCIPAL_CACHE_TTL)
+            except Exception as e:
+                logger.error(f"Failed to cache principal {username}: {str(e)}")
+        return user
@@ -1,22 +1,73 @@
+from sqlalchemy import case, delete, func, insert, select, text, tuple_
 from sqlalchemy.orm import Session
+from typing import Callable, Dict, Optional, Tuple
+import hashlib
 import json
+import time
 from datetime import datetime
 import logging
 
 from app.domain.models.task import Task, PriorityEnum
-from app.application.schemas.task import TaskCreate, TaskUpdate
+from app.domain.models.task_outbox import TaskOutbox
+from app.domain.models.task_counter import TaskCounter
+from app.application.schemas.task import TaskCreate, TaskUpdate, Task as TaskSchema
 from app.infrastructure.services.elastic import (
-    TASK_INDEX, index_document, search_documents, delete_document
+    TASK_INDEX, TASK_ROUTING_FIELD, bulk_index_documents, begin_task_index_build, finish_task_index_build,
+    abort_task_index_build
+)
+from app.infrastructure.services.search_backend import get_search_backend, publish_search_update
+from app.infrastructure.services.redis import (
+    get_cache, set_cache, get_many_cache, set_many_cache, delete_cache, get_cache_version,
+    bump_cache_versions, publish_cache_invalidation, acquire_lock, release_lock, invalidate_tag,
+    cache_metrics
+)
+from app.infrastructure.services.stampede import (
+    SingleFlight, pack_cache_entry, unpack_cache_entry, should_refresh_early
+)
+from app.infrastructure.db.task_search import task_text_match
+from app.infrastructure.db.task_counters import COUNTER_COLUMNS, task_counter_totals, task_counter_upsert
+from app.application.task_stats import count_task_stats, due_date_ranges
+from app.config import settings
+from app.application.pagination import (
+    decode_task_cursor, next_task_cursor, encode_search_cursor, decode_search_cursor
 )
-from app.infrastructure.services.redis import get_cache, set_cache, delete_cache
 from app.domain.repositories.task_repository import ITaskRepository
 
 logger = logging.getLogger(__name__)
 
-class TaskRepository(ITaskRepository):
-    def __init__(self, db: Session):
-        self.db = db
-        
+# Shared by all repository instances of this process so that concurrent
+# requests for the same cache key run a single database query
+_single_flight = SingleFlight()
+
+# Sortable rank of each priority, highest first when sorted descending
+PRIORITY_RANKS = {PriorityEnum.low: 0, PriorityEnum.normal: 1, PriorityEnum.high: 2}
+
+def task_search_order(sort: str, rank=None) -> tuple:
+    """ORDER BY clauses of the database search fallback, matching TASK_SEARCH_SORTS.
+
+    Args:
+        sort (str): One of "due_date", "priority" or "relevance".
+        rank (optional): Relevance expression of the full-text match, if the
+            database can score it. Relevance falls back to due date without it.
+
+    Returns:
+        tuple: The clauses to pass to order_by.
+    """
+    if sort == "relevance" and rank is not None:
+        return (rank.desc(), Task.id)
+    if sort == "priority":
+        rank = case(*((Task.priority == enum_value, rank) for enum_value, rank in PRIORITY_RANKS.items()))
+        return (rank.desc(), Task.due_date, Task.id)
+    return (Task.due_date, Task.id)
+
+class TaskCacheMixin:
+    """Serialization, cache key, query and outbox helpers shared by the sync and async task repositories.
+
+    Everything that does not wait on the database, Redis or the search
+    backend lives here, so the two repositories only differ in how they
+    run their I/O.
+    """
+
     def _serialize_task(self, task: Task) -> dict:
         """Serialize Task object to a dictionary for cache/ES storage.
 
@@ -36,7 +87,62 @@ class TaskRepository(ITaskRepository):
         if "priority" in task_dict and isinstance(task_dict["priority"], PriorityEnum):
             task_dict["priority"] = task_dict["priority"].value
         return task_dict
-    
+
+    def _search_document(self, task: Task) -> dict:
+        """Serialize a task for the search index, with its sortable priority rank.
+
+        Args:
+            task (Task): The task to serialize.
+
+        Returns:
+            dict: The search document.
+        """
+        document = self._serialize_task(task)
+        document["priority_rank"] = PRIORITY_RANKS.get(task.priority, PRIORITY_RANKS[PriorityEnum.normal])
+        return document
+
+    def _render_task(self, task: Task) -> str:
+        """Render a task exactly as the API responds with it.
+
+        Cached task payloads hold this rendering so that cache hits can be
+        returned as the response body without rehydrating ORM objects or
+        re-validating them through the response model.
+
+        Args:
+            task (Task): The task to render.
+
+        Returns:
+            str: The JSON body of the task.
+        """
+        return TaskSchema.model_validate(self._serialize_task(task)).model_dump_json()
+
+    def _render_task_list(self, tasks: list[Task]) -> str:
+        """Render a list of tasks exactly as the API responds with it.
+
+        Args:
+            tasks (list[Task]): The tasks to render.
+
+        Returns:
+            str: The JSON body of the list.
+        """
+        return "[" + ",".join(self._render_task(task) for task in tasks) + "]"
+
+    def _render_task_page(self, tasks: list[Task], limit: int, counter: Optional[TaskCounter]) -> str:
+        """Render a page of a user's tasks as it is cached.
+
+        The first line holds the cursor of the next page and the user's task
+        count, so the list endpoint gets its X-Total-Count from the same
+        cache entry as the body; the rest is the JSON body.
+        """
+        total = counter.total if counter else 0
+        return f"{next_task_cursor(tasks, limit) or ''} {total}\n{self._render_task_list(tasks)}"
+
+    def _read_task_page(self, payload: str) -> Tuple[str, Optional[str], int]:
+        """Split a cached page into its body, next cursor and task count"""
+        header, _, body = payload.partition("\n")
+        next_cursor, _, total = header.partition(" ")
+        return body, next_cursor or None, int(total)
+
     def _get_cache_key(self, key_type: str, **kwargs) -> str:
         """Generate consistent cache keys.
 
@@ -50,23 +156,475 @@ class TaskRepository(ITaskRepository):
         if key_type == "task":
             return f"task:{kwargs['task_id']}"
         elif key_type == "all_tasks":
-            return f"tasks:all:{kwargs['skip']}:{kwargs['limit']}"
+            return f"tasks:all:v{kwargs['version']}:{kwargs['skip']}:{kwargs['limit']}"
         elif key_type == "user_tasks":
-            return f"tasks:user:{kwargs['user_id']}:{kwargs['skip']}:{kwargs['limit']}"
+            position = f"c{kwargs['cursor']}" if kwargs.get("cursor") else kwargs["skip"]
+            return f"tasks:user:{kwargs['user_id']}:v{kwargs['version']}:page:{position}:{kwargs['limit']}"
+        elif key_type == "all_tasks_version":
+            return "tasks:all:version"
+        elif key_type == "user_tasks_version":
+            return f"tasks:user:{kwargs['user_id']}:version"
+        elif key_type == "all_tasks_tag":
+            return "tasks:all"
+        elif key_type == "user_tasks_tag":
+            return f"tasks:user:{kwargs['user_id']}"
+        elif key_type == "user_search":
+            return f"tasks:user:{kwargs['user_id']}:search:v{kwargs['version']}:{kwargs['digest']}"
+        elif key_type == "user_suggest":
+            return f"tasks:user:{kwargs['user_id']}:suggest:v{kwargs['version']}:{kwargs['digest']}"
+        elif key_type == "user_summary":
+            return f"tasks:user:{kwargs['user_id']}:summary:v{kwargs['version']}"
+        elif key_type == "user_stats":
+            return f"tasks:user:{kwargs['user_id']}:stats:v{kwargs['version']}"
+        elif key_type == "user_search_version":
+            return f"tasks:user:{kwargs['user_id']}:search:version"
+        elif key_type == "user_search_tag":
+            return f"tasks:user:{kwargs['user_id']}:search"
         return f"tasks:{key_type}"
-    
-    def _index_task_to_elasticsearch(self, task: Task) -> None:
-        """Index a task to Elasticsearch with error handling.
+
+    def _search_cache_digest(self, query: str, sort: str, limit: int, cursor: Optional[str]) -> str:
+        """Hash a search request, normalizing the query's case and whitespace.
+
+        Args:
+            query (str): The query to search for.
+            sort (str): The sort of the results.
+            limit (int): The page size.
+            cursor (Optional[str]): The cursor of the page.
+
+        Returns:
+            str: The digest to put in the cache key.
+        """
+        normalized = " ".join(query.lower().split())
+        raw = json.dumps([normalized, sort, limit, cursor], separators=(",", ":"))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _pack_search_page(self, tasks: list[Task], next_cursor: Optional[str]) -> str:
+        """Serialize a page of search results with its next cursor for the cache"""
+        return f"{next_cursor or ''}\n{json.dumps([self._serialize_task(task) for task in tasks])}"
+
+    def _unpack_search_page(self, payload: str) -> Tuple[list[Task], Optional[str]]:
+        """Inverse of _pack_search_page"""
+        next_cursor, _, documents = payload.partition("\n")
+        return [self._document_to_task(document) for document in json.loads(documents)], next_cursor or None
+
+    def _render_suggestions(self, suggestions: list) -> str:
+        """Render typeahead suggestions, keeping only their id and title"""
+        return json.dumps(
+            [{"id": suggestion["id"], "title": suggestion["title"]} for suggestion in suggestions],
+            separators=(",", ":")
+        )
+
+    def _task_stats_query(self, user_id: int, now: datetime):
+        """Database fallback of task stats: one GROUP BY row per (completed, priority, due bucket)"""
+        ranges = due_date_ranges(now)
+        bucket = case(
+            *((Task.due_date < end, name) for name, _, end in ranges if end is not None),
+            else_=ranges[-1][0]
+        )
+        return select(
+            Task.completed, Task.priority, bucket, func.count(Task.id)
+        ).where(Task.owner_id == user_id).group_by(Task.completed, Task.priority, bucket)
+
+    def _render_task_stats(self, stats: dict) -> str:
+        return json.dumps(stats, separators=(",", ":"))
+
+    def _count_task_stats_rows(self, rows) -> dict:
+        """Sum the rows of _task_stats_query into task stats"""
+        return count_task_stats(
+            (completed, priority.value, bucket, count) for completed, priority, bucket, count in rows
+        )
+
+    def _task_counter_deltas(self, task: Task, sign: int = 1) -> dict:
+        """Counter changes of adding (sign 1) or removing (sign -1) task from its owner's counts"""
+        priority = task.priority.value if isinstance(task.priority, PriorityEnum) else task.priority
+        return {
+            "total": sign,
+            "completed": sign if task.completed else 0,
+            f"priority_{priority or PriorityEnum.normal.value}": sign,
+        }
+
+    def _task_counter_upsert(self, dialect_name: str, owner_id: int, *deltas: dict):
+        """Statement applying the sum of deltas to owner_id's counters, None if nothing changes"""
+        changes = {}
+        for delta in deltas:
+            for name, value in delta.items():
+                changes[name] = changes.get(name, 0) + value
+        changes = {name: value for name, value in changes.items() if value}
+        if not changes:
+            return None
+        return task_counter_upsert(dialect_name, owner_id, changes)
+
+    def _render_task_summary(self, counter: Optional[TaskCounter]) -> str:
+        """Render a user's counters as the summary response body"""
+        counts = {name: getattr(counter, name) if counter else 0 for name in COUNTER_COLUMNS}
+        return json.dumps({
+            "total": counts["total"],
+            "completed": counts["completed"],
+            "open": counts["total"] - counts["completed"],
+            "by_priority": {priority.value: counts[f"priority_{priority.value}"] for priority in PriorityEnum},
+        }, separators=(",", ":"))
+
+    def _task_list_version_keys(self, owner_id: int) -> tuple:
+        """Cache generations of the lists and searches that a write to owner_id's tasks changes"""
+        return (
+            self._get_cache_key("user_tasks_version", user_id=owner_id),
+            self._get_cache_key("user_search_version", user_id=owner_id),
+            self._get_cache_key("all_tasks_version"),
+        )
+
+    def _task_list_tags(self, owner_id: int) -> tuple:
+        """Tags of the cached pages left behind by bumping _task_list_version_keys"""
+        return (
+            self._get_cache_key("user_tasks_tag", user_id=owner_id),
+            self._get_cache_key("user_search_tag", user_id=owner_id),
+            self._get_cache_key("all_tasks_tag"),
+        )
+
+    def _search_page_cache_key(
+        self, user_id: int, version: int, query: str, sort: str, limit: int, cursor: Optional[str]
+    ) -> str:
+        return self._get_cache_key(
+            "user_search", user_id=user_id, version=version,
+            digest=self._search_cache_digest(query, sort, limit, cursor)
+        )
+
+    def _suggest_cache_key(self, user_id: int, version: int, prefix: str, limit: int) -> str:
+        return self._get_cache_key(
+            "user_suggest", user_id=user_id, version=version,
+            digest=self._search_cache_digest(prefix, "suggest", limit, None)
+        )
+
+    def _fresh_cache_payload(self, cached_data: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Decide what to do with a read-through cache lookup.
+
+        Args:
+            cached_data (Optional[str]): The cached entry, None on a miss.
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: The payload to serve as is on a
+                fresh hit, and the payload to refresh early on a hit that won
+                the XFetch draw; both None on a miss.
+        """
+        if not cached_data:
+            return None, None
+        payload, delta, expiry = unpack_cache_entry(cached_data)
+        if should_refresh_early(delta, expiry, settings.CACHE_XFETCH_BETA):
+            return None, payload
+        return payload, None
+
+    def _task_cache_entries(self, tasks: list[Task], found: Optional[dict] = None) -> Dict[str, str]:
+        """Single-task cache entries of tasks by cache key.
+
+        Args:
+            tasks (list[Task]): The tasks to cache.
+            found (Optional[dict], optional): Filled with the parsed response body
+                of each task by task ID. Defaults to None.
+
+        Returns:
+            Dict[str, str]: The packed entries.
+        """
+        entries = {}
+        for task in tasks:
+            payload = self._render_task(task)
+            entries[self._get_cache_key("task", task_id=task.id)] = pack_cache_entry(
+                payload, 0, settings.TASK_CACHE_TTL
+            )
+            if found is not None:
+                found[task.id] = json.loads(payload)
+        return entries
+
+    def _cached_tasks(self, task_ids: list[int], cached_values: list) -> dict:
+        """Parse the single-task entries read for task_ids, by task ID, skipping misses"""
+        return {
+            task_id: json.loads(unpack_cache_entry(cached_data)[0])
+            for task_id, cached_data in zip(task_ids, cached_values) if cached_data
+        }
+
+    def _owned_tasks(self, task_ids: list[int], found: dict, owner_id: int) -> list[Task]:
+        """The found tasks of owner_id, in the order of task_ids"""
+        return [
+            Task(**found[task_id]) for task_id in task_ids
+            if task_id in found and found[task_id]["owner_id"] == owner_id
+        ]
+
+    def _owned_task_query(self, task_id: int, owner_id: int):
+        return select(Task).where(Task.id == task_id, Task.owner_id == owner_id)
+
+    def _owned_tasks_query(self, task_ids: list[int], owner_id: int):
+        return select(Task).where(Task.id.in_(task_ids), Task.owner_id == owner_id)
+
+    def _user_tasks_query(self, user_id: int, skip: int, limit: int, after: Optional[tuple]):
+        """A page of the user's tasks by (due_date, id), after a keyset position or skipping skip tasks.
+
+        The keyset predicate is served by the (owner_id, due_date, id) index,
+        so deep pages cost the same as the first one.
+        """
+        statement = select(Task).where(Task.owner_id == user_id)
+        if after:
+            statement = statement.where(tuple_(Task.due_date, Task.id) > after)
+        else:
+            statement = statement.offset(skip)
+        return statement.order_by(Task.due_date, Task.id).limit(limit)
+
+    def _search_fallback_query(
+        self, dialect_name: str, query: str, user_id: int, sort: str, offset: int, limit: int
+    ):
+        """Database search of the user's tasks, served by the full-text index of the database"""
+        condition, rank = task_text_match(dialect_name, query)
+        return select(Task).where(
+            Task.owner_id == user_id, condition
+        ).order_by(*task_search_order(sort, rank)).offset(offset).limit(limit)
+
+    def _suggest_fallback_query(self, dialect_name: str, prefix: str, user_id: int, limit: int):
+        """Database fallback of typeahead: (id, title) rows matching prefix"""
+        condition, _ = task_text_match(dialect_name, prefix)
+        return select(Task.id, Task.title).where(
+            Task.owner_id == user_id, condition
+        ).order_by(Task.due_date, Task.id).limit(limit)
+
+    def _search_hits_page(
+        self,
+        sort: str,
+        offset: int,
+        limit: int,
+        cursor: Optional[str],
+        hits: list,
+        search_after: Optional[list],
+        pit_id: Optional[str],
+    ) -> Tuple[Optional[Tuple[list[Task], Optional[str]]], Optional[str]]:
+        """Turn a page of search backend hits into tasks and the cursor of the next page.
+
+        Returns:
+            Tuple: The page, None if the database should be searched instead
+                because a first page has no hits, and the point in time to
+                close because the walk is over, if any.
+        """
+        if not hits and not cursor:
+            return None, pit_id
+        next_cursor = self._next_search_cursor(sort, offset, len(hits), limit, search_after, pit_id)
+        page = [self._document_to_task(hit) for hit in hits], next_cursor
+        return page, pit_id if next_cursor is None else None
+
+    def _cacheable_search_page(self, payload: str, uncached: dict) -> Optional[str]:
+        """Return payload, or None after keeping it in uncached if it is too large to cache"""
+        if len(payload) > settings.SEARCH_CACHE_MAX_BYTES:
+            uncached["payload"] = payload
+            return None
+        return payload
+
+    def _update_task_fields(self, db_task: Task, task: TaskUpdate) -> None:
+        for key, value in task.model_dump(exclude_unset=True).items():
+            setattr(db_task, key, value)
+
+    def _invalidate_search_results(self, *owner_ids: int) -> None:
+        """Drop the cached search results of owner_ids.
+
+        Used by the search outbox dispatcher once changes reach the index, so
+        searches cached between a write and its indexing are not served for
+        the rest of their TTL.
+
+        Args:
+            *owner_ids (int): The IDs of the owners whose search index changed.
+        """
+        version_keys = [self._get_cache_key("user_search_version", user_id=owner_id) for owner_id in owner_ids]
+        if not version_keys:
+            return
+        bump_cache_versions(*version_keys)
+        for owner_id in owner_ids:
+            invalidate_tag(self._get_cache_key("user_search_tag", user_id=owner_id))
+        publish_cache_invalidation(*version_keys)
+
+    def _enqueue_search_update(self, task_id: int, owner_id: int) -> None:
+        """Record that task_id must be (re)indexed or removed from search.
+
+        The row is added to the current session so it commits atomically
+        with the task change; the search outbox dispatcher applies it.
+        In-process search backends are not fed by the outbox and are
+        updated by _apply_search_update after the commit instead.
+
+        Args:
+            task_id (int): The ID of the task that changed.
+            owner_id (int): The ID of the owner of the task.
+        """
+        if get_search_backend().indexed_by_outbox:
+            self.db.add(TaskOutbox(task_id=task_id, owner_id=owner_id))
+
+    def _apply_search_update(self, task_id: int, owner_id: int, task: Optional[Task] = None) -> None:
+        """Apply a committed task change to an in-process search backend.
+
+        The change is applied here right away, so the writer sees it, and
+        broadcast to every worker's index, this one's included.
 
         Args:
-            task (Task): The task to index.
+            task_id (int): The ID of the task that changed.
+            owner_id (int): The ID of the owner of the task.
+            task (Optional[Task], optional): The task as committed, None if it was deleted.
+                Defaults to None.
         """
+        backend = get_search_backend()
+        if backend.indexed_by_outbox:
+            return
         try:
-            task_dict = self._serialize_task(task)
-            index_document(TASK_INDEX, str(task.id), task_dict)
+            if task is None:
+                backend.delete_documents([(task_id, owner_id)])
+                publish_search_update([], [(task_id, owner_id)])
+            else:
+                document = self._search_document(task)
+                backend.index_documents([document])
+                publish_search_update([document], [])
         except Exception as e:
-            logger.error(f"Failed to index task {task.id} in Elasticsearch: {str(e)}")
+            logger.error(f"Failed to update search index for task {task_id}: {str(e)}")
+
+    def _next_search_cursor(
+        self,
+        sort: str,
+        offset: int,
+        count: int,
+        limit: int,
+        search_after: Optional[list] = None,
+        pit_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Return the cursor of the search page after one of count hits, or None on the last page.
+
+        The cursor also records how many hits were returned so far, so a walk
+        can continue from the database if Elasticsearch becomes unavailable.
+        """
+        if count < limit:
+            return None
+        return encode_search_cursor(sort, offset + count, search_after, pit_id)
+
+    def _document_to_task(self, document: dict) -> Task:
+        """Build a transient Task from a search document.
+
+        Args:
+            document (dict): The indexed task document.
+
+        Returns:
+            Task: The task.
+        """
+        document = dict(document)
+        document.pop("priority_rank", None)
+        if "created_at" in document and isinstance(document["created_at"], str):
+            document["created_at"] = datetime.fromisoformat(document["created_at"])
+        if "due_date" in document and isinstance(document["due_date"], str):
+            document["due_date"] = datetime.fromisoformat(document["due_date"])
+        if "priority" in document and not isinstance(document["priority"], PriorityEnum):
+            for enum_value in PriorityEnum:
+                if enum_value.value == document["priority"]:
+                    document["priority"] = enum_value
+                    break
+        return Task(**document)
+
+class TaskRepository(TaskCacheMixin, ITaskRepository):
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _invalidate_task_lists(self, owner_id: int, task_id: int) -> None:
+        """Bump the list cache generations touched by a write to owner_id's tasks.
+
+        List and search keys embed the generation, so bumping it makes every
+        cached page of the owner (and of the global listing) unreachable at once; the
+        orphaned pages are unlinked through their tags to reclaim memory right
+        away. The counters and the task key are then evicted from every
+        worker's in-process tier.
+
+        Args:
+            owner_id (int): The ID of the owner whose tasks changed.
+            task_id (int): The ID of the task that was written.
+        """
+        version_keys = self._task_list_version_keys(owner_id)
+        bump_cache_versions(*version_keys)
+        for tag in self._task_list_tags(owner_id):
+            invalidate_tag(tag)
+        publish_cache_invalidation(*version_keys, self._get_cache_key("task", task_id=task_id))
+
+    def _adjust_task_counters(self, owner_id: int, *deltas: dict) -> None:
+        """Apply counter deltas to owner_id's counters in the current transaction"""
+        statement = self._task_counter_upsert(self.db.get_bind().dialect.name, owner_id, *deltas)
+        if statement is not None:
+            self.db.execute(statement)
+
+    def _write_through_task(self, task: Task) -> None:
+        """Refresh the single-task cache entry with the task's new state.
+
+        Args:
+            task (Task): The task that was just written.
+        """
+        for cache_key, entry in self._task_cache_entries([task]).items():
+            set_cache(cache_key, entry, settings.TASK_CACHE_TTL)
+
+    def _read_through(
+        self, cache_key: str, load: Callable[[], Optional[str]], ttl: int, tags: tuple = ()
+    ) -> Optional[str]:
+        """Read a cached payload, recomputing it with stampede protection.
+
+        A fresh hit is returned directly. Hits close to expiry are refreshed
+        early by whichever caller wins the XFetch draw, while the rest keep
+        serving the cached payload. On a miss, concurrent callers in this
+        process are coalesced and callers across processes are serialized by
+        a short Redis lock, so only one of them queries the database.
+
+        Args:
+            cache_key (str): The cache key.
+            load (Callable[[], Optional[str]]): Computes the payload, None if there is nothing to cache.
+            ttl (int): The cache TTL in seconds.
+            tags (tuple, optional): Tags to record the key under. Defaults to ().
+
+        Returns:
+            Optional[str]: The payload.
+        """
+        payload, stale = self._fresh_cache_payload(get_cache(cache_key))
+        if payload is not None:
+            return payload
+
+        return _single_flight.do(cache_key, lambda: self._recompute(cache_key, load, ttl, stale, tags))
+
+    def _recompute(
+        self,
+        cache_key: str,
+        load: Callable[[], Optional[str]],
+        ttl: int,
+        stale: Optional[str],
+        tags: tuple = (),
+    ) -> Optional[str]:
+        """Recompute a cache entry while holding its Redis lock.
+
+        Args:
+            cache_key (str): The cache key.
+            load (Callable[[], Optional[str]]): Computes the payload.
+            ttl (int): The cache TTL in seconds.
+            stale (Optional[str]): The payload being refreshed early, if any.
+            tags (tuple, optional): Tags to record the key under. Defaults to ().
 
+        Returns:
+            Optional[str]: The payload.
+        """
+        lock_key = f"lock:{cache_key}"
+        token = acquire_lock(lock_key, settings.CACHE_LOCK_TTL)
+        if token is None:
+            # Another process is recomputing: serve what we have or wait for it
+            if stale is not None:
+                return stale
+            deadline = time.monotonic() + settings.CACHE_LOCK_TTL
+            while time.monotonic() < deadline:
+                time.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+                cached_data = get_cache(cache_key)
+                if cached_data:
+                    return unpack_cache_entry(cached_data)[0]
+            logger.warning(f"Timed out waiting for {cache_key} to be recomputed")
+
+        try:
+            started = time.monotonic()
+            payload = load()
+            delta = time.monotonic() - started
+            cache_metrics.record_load(cache_key, delta)
+            if payload is not None:
+                set_cache(cache_key, pack_cache_entry(payload, delta, ttl), ttl, tags=tags)
+            return payload
+        finally:
+            if token is not None:
+                release_lock(lock_key, token)
+    
     def get_tasks(self, skip: int = 0, limit: int = 100) -> list[Task]:
         """Get all tasks from the database with pagination.
 
@@ -77,21 +635,18 @@ class TaskRepository(ITaskRepository):
         Returns:
             list[Task]: A list of tasks.
         """
-        cache_key = self._get_cache_key("all_tasks", skip=skip, limit=limit)
-        cached_data = get_cache(cache_key)
+        limit = min(limit, settings.TASKS_MAX_PAGE_SIZE)
+        version = get_cache_version(self._get_cache_key("all_tasks_version"))
+        cache_key = self._get_cache_key("all_tasks", version=version, skip=skip, limit=limit)
 
-        if cached_data:
-            tasks_data = json.loads(cached_data)
-            return [Task(**data) for data in tasks_data]
+        def load() -> str:
+            tasks = self.db.query(Task).order_by(Task.due_date, Task.id).offset(skip).limit(limit).all()
+            return self._render_task_list(tasks)
 
-        tasks = self.db.query(Task).order_by(Task.due_date).offset(skip).limit(limit).all()
-
-        tasks_data = []
-        for task in tasks:
-            tasks_data.append(self._serialize_task(task))
-
-        set_cache(cache_key, json.dumps(tasks_data), 300)
-        return tasks
+        payload = self._read_through(
+            cache_key, load, settings.TASK_LIST_CACHE_TTL, tags=(self._get_cache_key("all_tasks_tag"),)
+        )
+        return [Task(**data) for data in json.loads(payload)]
 
     def create_task(self, task: TaskCreate, owner_id: int) -> Task:
         """Create a new task.
@@ -106,11 +661,15 @@ class TaskRepository(ITaskRepository):
         task_data = task.model_dump()
         db_task = Task(**task_data, owner_id=owner_id)
         self.db.add(db_task)
+        self.db.flush()
+        self._enqueue_search_update(db_task.id, owner_id)
+        self._adjust_task_counters(owner_id, self._task_counter_deltas(db_task))
         self.db.commit()
         self.db.refresh(db_task)
+        self._apply_search_update(db_task.id, owner_id, db_task)
 
-        # Index in Elasticsearch
-        self._index_task_to_elasticsearch(db_task)
+        self._write_through_task(db_task)
+        self._invalidate_task_lists(owner_id, db_task.id)
 
         return db_task
 
@@ -123,16 +682,55 @@ class TaskRepository(ITaskRepository):
         Returns:
             Task: The task.
         """
+        payload = self.get_task_json(task_id)
+        return Task(**json.loads(payload)) if payload else None
+
+    def get_task_json(self, task_id: int) -> Optional[str]:
+        """Get a task by its ID as its rendered JSON response body.
+
+        Args:
+            task_id (int): The ID of the task to get.
+
+        Returns:
+            Optional[str]: The JSON body of the task, None if it does not exist.
+        """
         cache_key = self._get_cache_key("task", task_id=task_id)
-        cached_data = get_cache(cache_key)
-        if cached_data:
-            return Task(**json.loads(cached_data))
 
-        task = self.db.query(Task).filter(Task.id == task_id).first()
-        if task:
-            task_dict = self._serialize_task(task)
-            set_cache(cache_key, json.dumps(task_dict), 300)
-        return task
+        def load() -> Optional[str]:
+            task = self.db.query(Task).filter(Task.id == task_id).first()
+            return self._render_task(task) if task else None
+
+        return self._read_through(cache_key, load, settings.TASK_CACHE_TTL)
+
+    def get_tasks_by_ids(self, task_ids: list[int], owner_id: int) -> list[Task]:
+        """Get several of an owner's tasks by their IDs.
+
+        Cached tasks are fetched with a single MGET, the misses are loaded
+        with a single IN query and written back to the cache in one pipeline.
+        Tasks that do not exist or belong to someone else are left out.
+
+        Args:
+            task_ids (list[int]): The IDs of the tasks to get.
+            owner_id (int): The ID of the owner of the tasks.
+
+        Returns:
+            list[Task]: The found tasks, in the order of task_ids.
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        cache_keys = [self._get_cache_key("task", task_id=task_id) for task_id in task_ids]
+
+        found = self._cached_tasks(task_ids, get_many_cache(cache_keys))
+
+        missing = [task_id for task_id in task_ids if task_id not in found]
+        if missing:
+            started = time.monotonic()
+            tasks = self.db.scalars(self._owned_tasks_query(missing, owner_id)).all()
+            cache_metrics.record_load(cache_keys[0], time.monotonic() - started)
+            backfill = self._task_cache_entries(tasks, found)
+            if backfill:
+                set_many_cache(backfill, settings.TASK_CACHE_TTL)
+
+        return self._owned_tasks(task_ids, found, owner_id)
 
     def update_task(self, task_id: int, task: TaskUpdate, owner_id: int) -> Task:
         """Update a task.
@@ -145,21 +743,19 @@ class TaskRepository(ITaskRepository):
         Returns:
             Task: The updated task.
         """
-        db_task = self.db.query(Task).filter(
-            Task.id == task_id, Task.owner_id == owner_id
-        ).first()
+        db_task = self.db.scalars(self._owned_task_query(task_id, owner_id)).first()
 
         if db_task:
-            task_data = task.model_dump(exclude_unset=True)
-            for key, value in task_data.items():
-                setattr(db_task, key, value)
+            previous = self._task_counter_deltas(db_task, -1)
+            self._update_task_fields(db_task, task)
+            self._enqueue_search_update(task_id, owner_id)
+            self._adjust_task_counters(owner_id, previous, self._task_counter_deltas(db_task))
             self.db.commit()
             self.db.refresh(db_task)
-            
-            self._index_task_to_elasticsearch(db_task)
+            self._apply_search_update(task_id, owner_id, db_task)
 
-            cache_key = self._get_cache_key("task", task_id=task_id)
-            delete_cache(cache_key)
+            self._write_through_task(db_task)
+            self._invalidate_task_lists(owner_id, task_id)
             
             return db_task
         return None
@@ -174,116 +770,403 @@ class TaskRepository(ITaskRepository):
         Returns:
             Task: The deleted task.
         """
-        db_task = self.db.query(Task).filter(
-            Task.id == task_id, Task.owner_id == owner_id
-        ).first()
+        db_task = self.db.scalars(self._owned_task_query(task_id, owner_id)).first()
 
         if db_task:
             self.db.delete(db_task)
+            self._enqueue_search_update(task_id, owner_id)
+            self._adjust_task_counters(owner_id, self._task_counter_deltas(db_task, -1))
             self.db.commit()
-            
-            try:
-                delete_document(TASK_INDEX, str(task_id))
-            except Exception as e:
-                logger.error(f"Failed to delete task from Elasticsearch: {str(e)}")
-                
+            self._apply_search_update(task_id, owner_id)
+
             cache_key = self._get_cache_key("task", task_id=task_id)
             delete_cache(cache_key)
+            self._invalidate_task_lists(owner_id, task_id)
             
             return db_task
         return None
 
-    def get_user_tasks(self, user_id: int, skip: int = 0, limit: int = 100) -> list[Task]:
+    def get_user_tasks(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> list[Task]:
         """Get all tasks for a user with pagination.
 
         Args:
             user_id (int): The ID of the user to get tasks for.
             skip (int, optional): The number of tasks to skip. Defaults to 0.
             limit (int, optional): The number of tasks to return. Defaults to 100.
+            cursor (Optional[str], optional): Opaque cursor of the previous page. Defaults to None.
+
+        Raises:
+            ValueError: If the cursor is malformed.
 
         Returns:
             list[Task]: A list of tasks.
         """
-        cache_key = self._get_cache_key("user_tasks", user_id=user_id, skip=skip, limit=limit)
-        cached_data = get_cache(cache_key)
+        body, _, _ = self.get_user_tasks_json(user_id, skip, limit, cursor)
+        return [Task(**data) for data in json.loads(body)]
 
-        if cached_data:
-            tasks_data = json.loads(cached_data)
-            return [Task(**data) for data in tasks_data]
+    def get_user_tasks_json(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[str, Optional[str], int]:
+        """Get a page of a user's tasks as its rendered JSON response body.
 
-        tasks = self.db.query(Task).filter(Task.owner_id == user_id).order_by(Task.due_date).offset(skip).limit(limit).all()
+        Tasks are ordered by (due_date, id). When a cursor is given the page
+        starts right after it using a keyset predicate served by the
+        (owner_id, due_date, id) index, so deep pages cost the same as the
+        first one; skip is only honoured when no cursor is given. The user's
+        task count is read from its counters when the page is loaded and
+        cached with it.
 
-        tasks_data = []
-        for task in tasks:
-            tasks_data.append(self._serialize_task(task))
+        Args:
+            user_id (int): The ID of the user to get tasks for.
+            skip (int, optional): The number of tasks to skip. Defaults to 0.
+            limit (int, optional): The number of tasks to return. Defaults to 100.
+            cursor (Optional[str], optional): Opaque cursor of the previous page. Defaults to None.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        Returns:
+            Tuple[str, Optional[str], int]: The JSON body of the page, the cursor of the next
+                one and the number of tasks of the user.
+        """
+        limit = min(limit, settings.TASKS_MAX_PAGE_SIZE)
+        after = decode_task_cursor(cursor) if cursor else None
+
+        version = get_cache_version(self._get_cache_key("user_tasks_version", user_id=user_id))
+        cache_key = self._get_cache_key(
+            "user_tasks", user_id=user_id, version=version, skip=skip, limit=limit, cursor=cursor
+        )
+
+        def load() -> str:
+            tasks = self.db.scalars(self._user_tasks_query(user_id, skip, limit, after)).all()
+            return self._render_task_page(tasks, limit, self.db.get(TaskCounter, user_id))
+
+        payload = self._read_through(
+            cache_key,
+            load,
+            settings.TASK_LIST_CACHE_TTL,
+            tags=(self._get_cache_key("user_tasks_tag", user_id=user_id),),
+        )
+        return self._read_task_page(payload)
+
+    def get_task_summary_json(self, user_id: int) -> str:
+        """Get the user's task counts as a JSON body, without counting tasks.
+
+        The counts are read from the user's TaskCounter row, kept up to date
+        by every task write, and cached like the user's task lists.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            str: The JSON summary, shaped like the TaskSummary schema.
+        """
+        version = get_cache_version(self._get_cache_key("user_tasks_version", user_id=user_id))
+        cache_key = self._get_cache_key("user_summary", user_id=user_id, version=version)
+
+        def load() -> str:
+            return self._render_task_summary(self.db.get(TaskCounter, user_id))
+
+        return self._read_through(
+            cache_key, load, settings.TASK_LIST_CACHE_TTL,
+            tags=(self._get_cache_key("user_tasks_tag", user_id=user_id),)
+        )
+
+    def repair_task_counters(self) -> int:
+        """Recompute every user's task counters from the tasks table.
+
+        All rows are replaced in one transaction by a single GROUP BY over the
+        tasks. On PostgreSQL the counters table is locked against writes
+        meanwhile, so task writes running concurrently are neither lost nor
+        counted twice; reads keep working.
+
+        Returns:
+            int: The number of users with counters.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text("LOCK TABLE task_counters IN EXCLUSIVE MODE"))
+        previous = set(self.db.scalars(select(TaskCounter.user_id)))
+        self.db.execute(delete(TaskCounter))
+        self.db.execute(insert(TaskCounter).from_select(("user_id",) + COUNTER_COLUMNS, task_counter_totals()))
+        self.db.commit()
+        repaired = set(self.db.scalars(select(TaskCounter.user_id)))
 
-        set_cache(cache_key, json.dumps(tasks_data), 300)
-        return tasks
+        version_keys = [
+            self._get_cache_key("user_tasks_version", user_id=user_id) for user_id in previous | repaired
+        ]
+        if version_keys:
+            bump_cache_versions(*version_keys)
+            publish_cache_invalidation(*version_keys)
+        return len(repaired)
 
-    def search_tasks(self, query: str, user_id: int) -> list[Task]:
+    def search_tasks(self, query: str, user_id: int, sort: str = "due_date") -> list[Task]:
         """Search tasks using Elasticsearch based on query and user_id.
 
         Args:
             query (str): The query to search for.
             user_id (int): The ID of the user to search for.
+            sort (str, optional): "due_date", "priority" or "relevance". Defaults to "due_date".
 
         Returns:
-            list[Task]: A list of tasks.
+            list[Task]: The first page of matching tasks.
         """
-        try:
-            # Try to search with Elasticsearch first
-            search_results = search_documents(
-                TASK_INDEX,
-                query,
-                fields=["title^3", "description"],  # Title is more important
-                size=100
-            )
-            
-            filtered_results = [result for result in search_results if result.get("owner_id") == user_id]
-            
-            if filtered_results:
-                tasks = []
-                for result in filtered_results:
-                    if "created_at" in result and isinstance(result["created_at"], str):
-                        result["created_at"] = datetime.fromisoformat(result["created_at"])
-                    if "due_date" in result and isinstance(result["due_date"], str):
-                        result["due_date"] = datetime.fromisoformat(result["due_date"])
-
-                    if "priority" in result and not isinstance(result["priority"], PriorityEnum):
-                        for enum_value in PriorityEnum:
-                            if enum_value.value == result["priority"]:
-                                result["priority"] = enum_value
-                                break
-                                
-                    task = Task(**result)
-                    tasks.append(task)
-
-                tasks.sort(key=lambda t: t.due_date if t.due_date else datetime.max)
-                return tasks
-        except Exception as e:
-            logger.error(f"Elasticsearch search failed: {str(e)}")
+        return self.search_tasks_page(query, user_id, sort)[0]
+
+    def search_tasks_page(
+        self,
+        query: str,
+        user_id: int,
+        sort: str = "due_date",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[list[Task], Optional[str]]:
+        """Search a page of tasks using Elasticsearch based on query and user_id.
+
+        Results are ordered by Elasticsearch. The default due date order
+        follows the index sort, so shards stop after the first hits. Later
+        pages resume with search_after from the cursor, so every page costs
+        the same as the first; with SEARCH_USE_POINT_IN_TIME they are also
+        read from the snapshot the first page was served from.
+
+        Args:
+            query (str): The query to search for.
+            user_id (int): The ID of the user to search for.
+            sort (str, optional): "due_date", "priority" or "relevance". Defaults to "due_date".
+            limit (Optional[int], optional): The page size. Defaults to SEARCH_PAGE_SIZE.
+            cursor (Optional[str], optional): Opaque cursor of the previous page. Defaults to None.
+
+        Pages are cached per user for SEARCH_CACHE_TTL, so repeated searches
+        skip Elasticsearch. The cache generation is bumped by the user's
+        writes and again when the outbox has applied them to the index.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another sort.
+
+        Returns:
+            Tuple[list[Task], Optional[str]]: The tasks and the cursor of the next page.
+        """
+        limit = min(limit or settings.SEARCH_PAGE_SIZE, settings.TASKS_MAX_PAGE_SIZE)
+        if cursor:
+            decode_search_cursor(cursor, sort)
+        if not settings.SEARCH_CACHE_ENABLED:
+            return self._search_tasks_page(query, user_id, sort, limit, cursor)
+
+        version = get_cache_version(self._get_cache_key("user_search_version", user_id=user_id))
+        cache_key = self._search_page_cache_key(user_id, version, query, sort, limit, cursor)
+        uncached = {}
+
+        def load() -> Optional[str]:
+            page = self._search_tasks_page(query, user_id, sort, limit, cursor)
+            return self._cacheable_search_page(self._pack_search_page(*page), uncached)
+
+        payload = self._read_through(
+            cache_key, load, settings.SEARCH_CACHE_TTL,
+            tags=(self._get_cache_key("user_search_tag", user_id=user_id),)
+        ) or uncached.get("payload")
+        if payload is None:
+            # Coalesced into another caller's page that was too large to cache
+            return self._search_tasks_page(query, user_id, sort, limit, cursor)
+        return self._unpack_search_page(payload)
+
+    def _search_tasks_page(
+        self, query: str, user_id: int, sort: str, limit: int, cursor: Optional[str]
+    ) -> Tuple[list[Task], Optional[str]]:
+        """Search a page of tasks in the search backend, or in the database if it is unavailable"""
+        backend = get_search_backend()
+        offset, search_after, pit_id = decode_search_cursor(cursor, sort) if cursor else (0, None, None)
+        # Pages of a database fallback walk stay on the database
+        if cursor is None or search_after is not None:
+            try:
+                if cursor is None and settings.SEARCH_USE_POINT_IN_TIME:
+                    pit_id = backend.open_point_in_time(user_id)
+                # Only the user's tasks are searched
+                hits, search_after, pit_id = backend.search(
+                    user_id, query, sort=sort, size=limit, search_after=search_after, pit_id=pit_id
+                )
+                page, finished_pit_id = self._search_hits_page(
+                    sort, offset, limit, cursor, hits, search_after, pit_id
+                )
+                if finished_pit_id:
+                    backend.close_point_in_time(finished_pit_id)
+                if page is not None:
+                    return page
+            except Exception as e:
+                logger.error(f"Search backend failed: {str(e)}")
             
         logger.info(f"Falling back to database search for query: '{query}'")
-        return self.db.query(Task).filter(
-            Task.owner_id == user_id,
-            Task.title.ilike(f"%{query}%") | Task.description.ilike(f"%{query}%")
-        ).order_by(Task.due_date).all()
+        tasks = self.db.scalars(self._search_fallback_query(
+            self.db.get_bind().dialect.name, query, user_id, sort, offset, limit
+        )).all()
+        return tasks, self._next_search_cursor(sort, offset, len(tasks), limit)
         
-    def reindex_all_tasks(self) -> int:
+    def suggest_tasks_json(self, prefix: str, user_id: int, limit: int = 5) -> str:
+        """Suggest the user's tasks whose title starts like prefix, as a JSON body.
+
+        Meant for per-keystroke typeahead: it queries the search_as_you_type
+        subfield of the title within SUGGEST_TIMEOUT and without retries, and
+        caches each answer for SUGGEST_CACHE_TTL. Like search results, the
+        cache is invalidated by the user's writes. When Elasticsearch fails,
+        titles are matched through the full-text index of the database.
+
+        Args:
+            prefix (str): What the user has typed so far.
+            user_id (int): The ID of the user to suggest tasks for.
+            limit (int, optional): The number of suggestions. Defaults to 5.
+
+        Returns:
+            str: The JSON list of {"id", "title"} suggestions.
+        """
+        limit = min(limit, settings.SUGGEST_MAX_SIZE)
+        version = get_cache_version(self._get_cache_key("user_search_version", user_id=user_id))
+        cache_key = self._suggest_cache_key(user_id, version, prefix, limit)
+        cached_data = get_cache(cache_key)
+        if cached_data:
+            return unpack_cache_entry(cached_data)[0]
+
+        try:
+            suggestions = get_search_backend().suggest(user_id, prefix, size=limit)
+        except Exception as e:
+            logger.error(f"Search backend suggest failed: {str(e)}")
+            rows = self.db.execute(self._suggest_fallback_query(
+                self.db.get_bind().dialect.name, prefix, user_id, limit
+            ))
+            suggestions = [{"id": row.id, "title": row.title} for row in rows]
+
+        payload = self._render_suggestions(suggestions)
+        set_cache(
+            cache_key,
+            pack_cache_entry(payload, 0, settings.SUGGEST_CACHE_TTL),
+            settings.SUGGEST_CACHE_TTL,
+            tags=(self._get_cache_key("user_search_tag", user_id=user_id),)
+        )
+        return payload
+
+    def get_task_stats_json(self, user_id: int) -> str:
+        """Count the user's tasks by completion, priority and due date, as a JSON body.
+
+        The counts come from a single aggregation request to the search
+        backend, or from a GROUP BY query when it is unavailable. They are
+        cached under the user's search version, which is bumped by writes
+        and once the search index catches up with them.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            str: The JSON stats, shaped like the TaskStats schema.
+        """
+        version = get_cache_version(self._get_cache_key("user_search_version", user_id=user_id))
+        cache_key = self._get_cache_key("user_stats", user_id=user_id, version=version)
+
+        def load() -> str:
+            now = datetime.utcnow()
+            try:
+                stats = get_search_backend().task_stats(user_id, now)
+            except Exception as e:
+                logger.error(f"Search backend stats failed: {str(e)}")
+                stats = self._count_task_stats_rows(self.db.execute(self._task_stats_query(user_id, now)))
+            return self._render_task_stats(stats)
+
+        return self._read_through(
+            cache_key, load, settings.TASK_STATS_CACHE_TTL,
+            tags=(self._get_cache_key("user_search_tag", user_id=user_id),)
+        )
+
+    def reindex_all_tasks(
+        self,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+        index_name: Optional[str] = None,
+    ) -> int:
         """Reindex all tasks in Elasticsearch.
 
+        Tasks are streamed from a server-side cursor in chunks of
+        REINDEX_CHUNK_SIZE and fed to the bulk API as they are read, so
+        memory stays constant whatever the size of the table.
+
+        Args:
+            progress (Optional[Callable[[int, int, int], None]], optional): Called with
+                (indexed, failed, total) after every chunk. Defaults to None.
+            index_name (Optional[str], optional): Backfill this index instead of the served one,
+                without overwriting documents written since. Defaults to None.
+
         Returns:
             int: The number of tasks reindexed.
         """
-        tasks = self.db.query(Task).all()
+        chunk_size = settings.REINDEX_CHUNK_SIZE
+        total = self.db.query(func.count(Task.id)).scalar() if progress else 0
+        tasks = self.db.query(Task).order_by(Task.id).yield_per(chunk_size)
+        backend = get_search_backend()
+        if not backend.indexed_by_outbox:
+            # In-process indexes are replaced as a whole
+            count = backend.rebuild(self._search_document(task) for task in tasks)
+            if progress:
+                progress(count, 0, total)
+            return count
+        results = bulk_index_documents(
+            index_name or TASK_INDEX,
+            ((str(task.id), self._search_document(task)) for task in tasks),
+            chunk_size=chunk_size,
+            thread_count=settings.REINDEX_THREAD_COUNT,
+            queue_size=settings.REINDEX_QUEUE_SIZE,
+            op_type="create" if index_name else "index",
+            routing_field=TASK_ROUTING_FIELD,
+        )
+
         count = 0
-        
-        for task in tasks:
-            try:
-                task_dict = self._serialize_task(task)
-                index_document(TASK_INDEX, str(task.id), task_dict)
+        failed = 0
+        for ok, item in results:
+            if ok:
                 count += 1
-            except Exception as e:
-                logger.error(f"Failed to index task {task.id}: {str(e)}")
-                
-        return count 
\ No newline at end of file
+            else:
+                failed += 1
+                logger.error(f"Failed to index task: {item}")
+            if progress and (count + failed) % chunk_size == 0:
+                progress(count, failed, total)
+        if progress:
+            progress(count, failed, total)
+
+        return count
+
+    def rebuild_search_index(self, progress: Optional[Callable[[int, int, int], None]] = None) -> str:
+        """Rebuild the search index into a new version and swap it in.
+
+        Searches keep hitting the current version while the new one is
+        backfilled; live changes are written to both by the search outbox.
+        The new version only starts serving once it is complete. In-process
+        backends are rebuilt by their own rebuild method.
+
+        Args:
+            progress (Optional[Callable[[int, int, int], None]], optional): Called with
+                (indexed, failed, total) after every chunk. Defaults to None.
+
+        Raises:
+            RuntimeError: If some tasks could not be indexed; the current version keeps serving.
+
+        Returns:
+            str: The name of the index now serving searches.
+        """
+        backend = get_search_backend()
+        if not backend.indexed_by_outbox:
+            self.reindex_all_tasks(progress=progress)
+            return backend.name
+
+        index_name = begin_task_index_build()
+        try:
+            failed = 0
+
+            def track(indexed: int, failures: int, total: int) -> None:
+                nonlocal failed
+                failed = failures
+                if progress:
+                    progress(indexed, failures, total)
+
+            self.reindex_all_tasks(progress=track, index_name=index_name)
+            if failed:
+                raise RuntimeError(f"{failed} task(s) could not be indexed into {index_name}")
+            finish_task_index_build(index_name)
+        except Exception:
+            abort_task_index_build(index_name)
+            raise
+        return index_name
@@ -1,10 +1,45 @@
 from sqlalchemy.orm import Session
-from app.security import get_password_hash, verify_password
+from typing import Optional
+import json
+import logging
+
+from app.security import get_password_hash
 from app.domain.models.user import User
 from app.application.schemas.user import UserCreate
 from app.domain.repositories.user_repository import IUserRepository
+from app.infrastructure.services.redis import get_cache, set_cache, get_cache_version, bump_cache_versions
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class UserCacheMixin:
+    """Principal cache helpers shared by the sync and async user repositories.
+
+    A principal is what request authentication needs to know about a user:
+    its id, whether it is active and its role. It is cached by username in
+    Redis and in every worker's L1 tier, under a generation that is bumped
+    whenever the user's activity or role changes. The generation is read
+    before the user is loaded, so a load that raced with a change can only
+    fill a key that is no longer read.
+    """
+
+    def _principal_version_key(self, username: str) -> str:
+        return f"user:principal:{username}:version"
+
+    def _principal_cache_key(self, username: str, version: int) -> str:
+        return f"user:principal:{username}:v{version}"
+
+    def _serialize_principal(self, user: User) -> str:
+        return json.dumps(
+            {"id": user.id, "username": user.username, "is_active": user.is_active, "role": user.role},
+            separators=(",", ":")
+        )
+
+    def _principal_from_payload(self, payload: str) -> User:
+        """Build a transient User holding only the principal's fields"""
+        return User(**json.loads(payload))
 
-class UserRepository(IUserRepository):
+class UserRepository(UserCacheMixin, IUserRepository):
     def __init__(self, db: Session):
         self.db = db
 
@@ -30,6 +65,66 @@ class UserRepository(IUserRepository):
         """
         return self.db.query(User).filter(User.username == username).first()
 
+    def get_principal(self, username: str) -> Optional[User]:
+        """Get the user a request authenticates as, from the principal cache when possible.
+
+        Only the id, username, is_active and role of a cached principal are
+        set. The cache is bypassed if Redis is unavailable.
+
+        Args:
+            username (str): The subject of the access token.
+
+        Returns:
+            Optional[User]: The user, None if it does not exist.
+        """
+        cache_key = None
+        try:
+            version = get_cache_version(self._principal_version_key(username))
+            cache_key = self._principal_cache_key(username, version)
+            cached_data = get_cache(cache_key)
+            if cached_data:
+                return self._principal_from_payload(cached_data)
+        except Exception as e:
+            logger.error(f"Failed to read principal {username} from cache: {str(e)}")
+
+        user = self.get_user_by_username(username)
+        if user is not None and cache_key is not None:
+            try:
+                set_cache(cache_key, self._serialize_principal(user), settings.PRINCIPAL_CACHE_TTL)
+            except Exception as e:
+                logger.error(f"Failed to cache principal {username}: {str(e)}")
+        return user
+
+    def update_user_access(
+        self, user_id: int, is_active: Optional[bool] = None, role: Optional[str] = None
+    ) -> Optional[User]:
+        """Activate or deactivate a user, or change its role.
+
+        The generation of the user's cached principal is bumped after the
+        commit, so the change applies to the user's next request on every
+        worker, even if a request loaded the user before the commit.
+
+        Args:
+            user_id (int): The ID of the user.
+            is_active (Optional[bool], optional): Whether the user may log in. Defaults to None (unchanged).
+            role (Optional[str], optional): The role of the user. Defaults to None (unchanged).
+
+        Returns:
+            Optional[User]: The updated user, None if it does not exist.
+        """
+        user = self.db.get(User, user_id)
+        if user is None:
+            return None
+        if is_active is not None:
+            user.is_active = is_active
+        if role is not None:
+            user.role = role
+        self.db.commit()
+        self.db.refresh(user)
+
+        bump_cache_versions(self._principal_version_key(user.username))
+        return user
+
     def create_user(self, user: UserCreate) -> User:
         """Create a new user.
 
@@ -50,17 +145,14 @@ class UserRepository(IUserRepository):
         self.db.refresh(db_user)
         return db_user
 
-    def authenticate_user(self, username: str, password: str) -> User | None:
-        """Authenticate a user.
+    def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        """Replace the stored hash of a user's password, e.g. after rehashing it on login.
 
         Args:
-            username (str): The username of the user to authenticate.
-            password (str): The password of the user to authenticate.
-
-        Returns:
-            User | None: The authenticated user.
+            user_id (int): The ID of the user.
+            hashed_password (str): The new hash.
         """
-        user = self.get_user_by_username(username)
-        if not user or not verify_password(password, user.hashed_password):
-            return None
-        return user
\ No newline at end of file
+        self.db.query(User).filter(User.id == user_id).update(
+            {User.hashed_password: hashed_password}, synchronize_session="fetch"
+        )
+        self.db.commit()
@@ -0,0 +1,112 @@
+import json
+import logging
+import zlib
+from typing import Optional, Union
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # lz4 is optional
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# Compressed payloads start with MARKER followed by a one byte codec tag.
+# Text payloads never start with a NUL byte, so entries written before the
+# codec existed (or below the compression threshold) are stored and read
+# back as plain UTF-8.
+MARKER = b"\x00"
+ZLIB_TAG = b"z"
+LZ4_TAG = b"4"
+COLUMNAR_TAG = b"c"
+
+CODECS = ("json", "zlib", "lz4", "columnar")
+
+
+def to_columns(payload: str) -> Optional[str]:
+    """Store a JSON list of objects with the same fields as field names and rows of values.
+
+    A first line that is not JSON, like the cursor line of a cached task
+    page, is kept as is. Only payloads that from_columns renders back to the
+    exact same text are converted, since cached bodies are served verbatim.
+
+    Returns:
+        Optional[str]: The columnar JSON, None if payload has no such list.
+    """
+    header = None
+    body = payload
+    if not payload.startswith("["):
+        header, _, body = payload.partition("\n")
+    if not body.startswith("[{"):
+        return None
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        return None
+    columns = list(rows[0])
+    if any(not isinstance(row, dict) or list(row) != columns for row in rows):
+        return None
+    columnar = json.dumps(
+        {"header": header, "columns": columns, "rows": [list(row.values()) for row in rows]},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return columnar if from_columns(columnar) == payload else None
+
+
+def from_columns(columnar: str) -> str:
+    data = json.loads(columnar)
+    columns = data["columns"]
+    body = json.dumps(
+        [dict(zip(columns, values)) for values in data["rows"]], separators=(",", ":"), ensure_ascii=False
+    )
+    return body if data["header"] is None else f"{data['header']}\n{body}"
+
+
+class CacheCodec:
+    """Versioned encoding of cache payloads.
+
+    Payloads at or above threshold bytes are compressed with the configured
+    codec; everything else is stored as plain text. The columnar codec also
+    stores task lists without repeating their field names before compressing
+    them with zlib. Decoding dispatches on the stored tag, so entries written
+    with any codec stay readable while the setting is changed during a
+    rollout.
+    """
+
+    def __init__(self, codec: str = "zlib", threshold: int = 1024, zlib_level: int = 6):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown cache codec {codec!r}, expected one of {CODECS}")
+        if codec == "lz4" and lz4_frame is None:
+            logger.warning("lz4 is not installed, falling back to zlib cache compression")
+            codec = "zlib"
+        self.codec = codec
+        self.threshold = threshold
+        self.zlib_level = zlib_level
+
+    def encode(self, payload: str) -> bytes:
+        data = payload.encode()
+        if self.codec == "json" or len(data) < self.threshold:
+            return data
+        if self.codec == "lz4":
+            return MARKER + LZ4_TAG + lz4_frame.compress(data)
+        if self.codec == "columnar":
+            columnar = to_columns(payload)
+            if columnar is not None:
+                return MARKER + COLUMNAR_TAG + zlib.compress(columnar.encode(), self.zlib_level)
+        return MARKER + ZLIB_TAG + zlib.compress(data, self.zlib_level)
+
+    def decode(self, raw: Union[bytes, str]) -> str:
+        if isinstance(raw, str):
+            return raw
+        if not raw.startswith(MARKER):
+            return raw.decode()
+        tag, data = raw[1:2], raw[2:]
+        if tag == ZLIB_TAG:
+            return zlib.decompress(data).decode()
+        if tag == COLUMNAR_TAG:
+            return from_columns(zlib.decompress(data).decode())
+        if tag == LZ4_TAG:
+            if lz4_frame is None:
+                raise ValueError("Cache entry is lz4 compressed but lz4 is not installed")
+            return lz4_frame.decompress(data).decode()
+        raise ValueError(f"Unknown cache codec tag {tag!r}")
@@ -0,0 +1,168 @@
+import bisect
+import random
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Union
+
+# Upper bounds (in milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+def key_type(key: str) -> str:
+    """Collapse a cache key into its type by dropping the variable segments.
+
+    e.g. "task:12" -> "task", "tasks:user:3:v2:0:100" -> "tasks:user",
+    "tasks:user:3:version" -> "tasks:user:version".
+    """
+    parts = key.split(":")
+    prefix = []
+    for part in parts:
+        if not part.replace("_", "").isalpha():
+            break
+        prefix.append(part)
+    if len(prefix) < len(parts) and parts[-1] == "version":
+        prefix.append("version")
+    return ":".join(prefix) or "other"
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class _KeyTypeStats:
+    def __init__(self):
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.invalidations = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.get_latency = LatencyHistogram()
+        self.set_latency = LatencyHistogram()
+        self.load_latency = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+            "sets": self.sets,
+            "invalidations": self.invalidations,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "avg_payload_bytes": self.bytes_written / self.sets if self.sets else 0.0,
+            "get_latency": self.get_latency.to_dict(),
+            "set_latency": self.set_latency.to_dict(),
+            "load_latency": self.load_latency.to_dict(),
+        }
+
+
+class HotKeyTracker:
+    """Sampled Space-Saving top-K tracker.
+
+    Only a sample of accesses is counted to keep the overhead negligible on
+    the request path; counts are therefore estimates scaled by the sample
+    rate. At most capacity keys are tracked: when full, the least counted
+    key is replaced and the newcomer inherits its count (an upper bound).
+    """
+
+    def __init__(self, capacity: int = 200, sample_rate: float = 0.05):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str) -> None:
+        if self.capacity <= 0 or random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            if key in self._counts:
+                self._counts[key] += 1
+            elif len(self._counts) < self.capacity:
+                self._counts[key] = 1
+            else:
+                coldest = min(self._counts, key=self._counts.get)
+                self._counts[key] = self._counts.pop(coldest) + 1
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {"key": key, "type": key_type(key), "estimated_accesses": round(count / self.sample_rate)}
+            for key, count in ranked
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+class CacheMetrics:
+    """Per key type cache counters, payload sizes and latency histograms"""
+
+    def __init__(self, hot_keys: HotKeyTracker):
+        self.hot_keys = hot_keys
+        self._stats: Dict[str, _KeyTypeStats] = defaultdict(_KeyTypeStats)
+        self._lock = threading.Lock()
+
+    def record_get(
+        self, key: str, tier: Optional[str], value: Optional[Union[str, bytes]], seconds: float
+    ) -> None:
+        """Record a lookup served by tier ("l1", "l2") or a miss (None)"""
+        self.hot_keys.record(key)
+        with self._lock:
+            stats = self._stats[key_type(key)]
+            if tier == "l1":
+                stats.l1_hits += 1
+            elif tier == "l2":
+                stats.l2_hits += 1
+            else:
+                stats.misses += 1
+            if value is not None:
+                stats.bytes_read += len(value)
+            stats.get_latency.observe(seconds)
+
+    def record_set(self, key: str, value: Union[str, bytes], seconds: float) -> None:
+        with self._lock:
+            stats = self._stats[key_type(key)]
+            stats.sets += 1
+            stats.bytes_written += len(value)
+            stats.set_latency.observe(seconds)
+
+    def record_invalidation(self, key: str, count: int = 1) -> None:
+        with self._lock:
+            self._stats[key_type(key)].invalidations += count
+
+    def record_load(self, key: str, seconds: float) -> None:
+        """Record the time spent recomputing a value after a miss"""
+        with self._lock:
+            self._stats[key_type(key)].load_latency.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+        self.hot_keys.reset()
@@ -1,101 +1,464 @@
-from elasticsearch import Elasticsearch, NotFoundError
+from elasticsearch import Elasticsearch, BadRequestError, NotFoundError, helpers
 from contextlib import contextmanager
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple, Union
 import json
+import logging
 
 from app.config import settings
 
+def get_client_options() -> Dict[str, Any]:
+    """Transport options shared by the sync and async clients.
+
+    Connections are kept alive and pooled per node; requests time out
+    instead of holding a worker indefinitely, and bodies are gzip
+    compressed.
+    """
+    return {
+        "connections_per_node": settings.ELASTICSEARCH_CONNECTIONS_PER_NODE,
+        "request_timeout": settings.ELASTICSEARCH_REQUEST_TIMEOUT,
+        "http_compress": settings.ELASTICSEARCH_HTTP_COMPRESS,
+        "max_retries": settings.ELASTICSEARCH_MAX_RETRIES,
+        "retry_on_timeout": True,
+    }
+
 def get_elasticsearch_client():
     """Get Elasticsearch client with the current settings URL"""
-    return Elasticsearch(settings.ELASTICSEARCH_URL)
+    return Elasticsearch(settings.ELASTICSEARCH_URL, **get_client_options())
 
 # Get initial client
 es_client = get_elasticsearch_client()
 
-# Define index name constant
-TASK_INDEX = "tasks"
+logger = logging.getLogger(__name__)
 
-def create_index(index_name: str, mappings: Dict[str, Any]) -> bool:
+# Tasks live in versioned indices ({prefix}tasks_v{N}). Reads and writes go
+# through the TASK_INDEX alias, which points at exactly one of them; while a
+# new version is being built it is also behind TASK_BUILD_ALIAS so that live
+# changes are written to both.
+TASK_INDEX = f"{settings.ELASTICSEARCH_INDEX_PREFIX}tasks"
+TASK_BUILD_ALIAS = f"{TASK_INDEX}_building"
+TASK_INDEX_VERSION_PREFIX = f"{TASK_INDEX}_v"
 
-    if not es_client.indices.exists(index=index_name):
-        es_client.indices.create(
-            index=index_name,
-            mappings=mappings
-        )
-        return True
-    return False
+# Bump when TASK_MAPPINGS changes so that a rebuild is flagged at startup
+TASK_MAPPING_VERSION = 4
 
-def delete_index(index_name: str) -> bool:
+def bulk_index_documents(
+    index_name: str,
+    documents: Iterable[Tuple[str, Dict[str, Any]]],
+    chunk_size: int = 500,
+    thread_count: int = 1,
+    queue_size: int = 4,
+    op_type: str = "index",
+    routing_field: Optional[str] = None,
+) -> Iterator[Tuple[bool, Dict[str, Any]]]:
+    """Index (id, document) pairs with the _bulk API, lazily.
 
-    if es_client.indices.exists(index=index_name):
-        es_client.indices.delete(index=index_name)
-        return True
-    return False
+    documents is consumed as the results are iterated, so only about
+    (queue_size + thread_count) chunks are held in memory at once. With
+    more than one thread the chunks are sent concurrently through
+    parallel_bulk, otherwise sequentially through streaming_bulk.
+    Yields one (ok, item) result per document.
 
-def index_document(index_name: str, document_id: str, document: Dict[str, Any]) -> Dict[str, Any]:
+    With op_type "create", documents that already exist are left untouched
+    (a 409 conflict), which lets a backfill run under live writes. Each
+    document is routed by its routing_field value when one is given.
+    """
+    def to_action(document_id: str, document: Dict[str, Any]) -> Dict[str, Any]:
+        action = {"_op_type": op_type, "_index": index_name, "_id": document_id, "_source": document}
+        if routing_field:
+            action["_routing"] = str(document[routing_field])
+        return action
 
-    return es_client.index(
-        index=index_name,
-        id=document_id,
-        document=document
-    )
+    actions = (to_action(document_id, document) for document_id, document in documents)
+    if thread_count > 1:
+        results = helpers.parallel_bulk(
+            es_client, actions, thread_count=thread_count, chunk_size=chunk_size,
+            queue_size=queue_size, raise_on_error=False, raise_on_exception=False,
+        )
+    else:
+        results = helpers.streaming_bulk(
+            es_client, actions, chunk_size=chunk_size, max_retries=settings.ELASTICSEARCH_MAX_RETRIES,
+            raise_on_error=False, raise_on_exception=False,
+        )
+    if op_type != "create":
+        return results
+    return ((ok or item.get("create", {}).get("status") == 409, item) for ok, item in results)
 
-def get_document(index_name: str, document_id: str) -> Optional[Dict[str, Any]]:
+def bulk_delete_documents(index_names: Iterable[str], keys: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Delete (id, routing) pairs from every index with the _bulk API.
 
-    try:
-        result = es_client.get(index=index_name, id=document_id)
-        if result and result.get("found"):
-            return result["_source"]
-    except:
-        return None
-    return None
+    Returns the items that failed. A document that is already gone (a 404)
+    counts as deleted, so a delete can be retried safely.
+    """
+    keys = list(keys)
+    actions = [
+        {"_op_type": "delete", "_index": index_name, "_id": document_id, "_routing": routing}
+        for index_name in index_names
+        for document_id, routing in keys
+    ]
+    if not actions:
+        return []
+    _, errors = helpers.bulk(es_client, actions, raise_on_error=False, raise_on_exception=False)
+    return [error for error in errors if error.get("delete", {}).get("status") != 404]
 
-def delete_document(index_name: str, document_id: str) -> bool:
+def delete_document(index_name: str, document_id: str, routing: Optional[str] = None) -> bool:
 
     try:
-        result = es_client.delete(index=index_name, id=document_id)
+        result = es_client.delete(index=index_name, id=document_id, routing=routing)
         return result.get("result") == "deleted"
-    except:
+    except NotFoundError:
         return False
 
-def search_documents(index_name: str, query: str, fields: List[str] = None, size: int = 100) -> List[Dict[str, Any]]:
+def build_search_query(
+    query: str,
+    fields: List[str] = None,
+    size: int = 100,
+    filters: Optional[Dict[str, Any]] = None,
+    sort: Optional[List[Dict[str, Any]]] = None,
+    search_after: Optional[List[Any]] = None,
+    pit: Optional[Dict[str, str]] = None,
+    track_total_hits: Union[bool, int] = False,
+) -> Dict[str, Any]:
+    """Full-text query, restricted by exact-match filters.
 
+    Filters run in filter context: they do not take part in scoring and
+    their results are cached by Elasticsearch across queries. Without a
+    sort hits come back by relevance. By default total hits are not
+    counted, which lets shards stop collecting early when sort follows the
+    index sort; track_total_hits counts them all (True) or up to a bound.
+    Later pages pass the sort values of the previous page's last hit as
+    search_after, optionally against a point-in-time snapshot.
+    """
     search_fields = fields or ["*"]
-    query_body = {
+    body = {
+        "query": {
+            "bool": {
+                "must": {
+                    "multi_match": {
+                        "query": query,
+                        "fields": search_fields,
+                        "type": "best_fields",
+                        "fuzziness": "AUTO"
+                    }
+                },
+                "filter": [{"term": {field: value}} for field, value in (filters or {}).items()]
+            }
+        },
+        "size": size,
+        "track_total_hits": track_total_hits
+    }
+    if sort:
+        body["sort"] = sort
+    if search_after:
+        body["search_after"] = search_after
+    if pit:
+        body["pit"] = pit
+    return body
+
+def read_search_page(result: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[List[Any]], Optional[str]]:
+    """Split a search response into its documents, the sort values of its last hit and its PIT id"""
+    hits = result.get("hits", {}).get("hits", [])
+    search_after = hits[-1].get("sort") if hits else None
+    return [hit["_source"] for hit in hits], search_after, result.get("pit_id")
+
+def search_documents_page(
+    index_name: str,
+    query: str,
+    fields: List[str] = None,
+    size: int = 100,
+    filters: Optional[Dict[str, Any]] = None,
+    routing: Optional[str] = None,
+    sort: Optional[List[Dict[str, Any]]] = None,
+    search_after: Optional[List[Any]] = None,
+    pit_id: Optional[str] = None,
+    keep_alive: Optional[str] = None,
+    track_total_hits: Union[bool, int] = False,
+) -> Tuple[List[Dict[str, Any]], Optional[List[Any]], Optional[str]]:
+    """Search one page of documents.
+
+    Args:
+        index_name (str): The index or alias to search. Ignored when pit_id is given.
+        query (str): The full-text query.
+        fields (List[str], optional): The fields to match. Defaults to all fields.
+        size (int, optional): The page size. Defaults to 100.
+        filters (Optional[Dict[str, Any]], optional): Exact-match filters. Defaults to None.
+        routing (Optional[str], optional): Shard routing. Ignored when pit_id is given,
+            the point in time was opened with it. Defaults to None.
+        sort (Optional[List[Dict[str, Any]]], optional): The sort, ending with a unique
+            tiebreaker when paging. Defaults to relevance.
+        search_after (Optional[List[Any]], optional): Sort values of the previous page's
+            last hit. Defaults to None.
+        pit_id (Optional[str], optional): Point in time to search. Defaults to None.
+        keep_alive (Optional[str], optional): How long to keep the point in time open.
+            Defaults to None.
+        track_total_hits (Union[bool, int], optional): Count every hit, or up to this
+            many. Defaults to False.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[List[Any]], Optional[str]]: The documents,
+            the search_after of the next page and the current point in time id.
+    """
+    pit = {"id": pit_id, "keep_alive": keep_alive} if pit_id else None
+    body = build_search_query(query, fields, size, filters, sort, search_after, pit, track_total_hits)
+    client = es_client.options(request_timeout=settings.ELASTICSEARCH_SEARCH_TIMEOUT)
+    if pit:
+        result = client.search(body=body)
+    else:
+        result = client.search(index=index_name, body=body, routing=routing)
+    return read_search_page(result)
+
+def build_aggregation_query(
+    aggregations: Dict[str, Any], filters: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Aggregations over the documents matching exact-match filters, without fetching any hit"""
+    return {
         "query": {
-            "multi_match": {
-                "query": query,
-                "fields": search_fields,
-                "type": "best_fields",
-                "fuzziness": "AUTO"
+            "bool": {
+                "filter": [{"term": {field: value}} for field, value in (filters or {}).items()]
             }
         },
-        "size": size
+        "aggs": aggregations,
+        "size": 0,
+        "track_total_hits": False
     }
 
-    result = es_client.search(
+def aggregate_documents(
+    index_name: str,
+    aggregations: Dict[str, Any],
+    filters: Optional[Dict[str, Any]] = None,
+    routing: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run aggregations in a single search request.
+
+    Args:
+        index_name (str): The index or alias to aggregate.
+        aggregations (Dict[str, Any]): The aggregations, by name.
+        filters (Optional[Dict[str, Any]], optional): Exact-match filters. Defaults to None.
+        routing (Optional[str], optional): Shard routing. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: The aggregation results, by name.
+    """
+    result = es_client.options(request_timeout=settings.ELASTICSEARCH_SEARCH_TIMEOUT).search(
         index=index_name,
-        body=query_body
+        body=build_aggregation_query(aggregations, filters),
+        routing=routing
     )
+    return result.get("aggregations", {})
 
-    hits = result.get("hits", {}).get("hits", [])
-    return [hit["_source"] for hit in hits]
+def build_suggest_query(
+    prefix: str, field: str, size: int = 5, filters: Optional[Dict[str, Any]] = None, timeout: Optional[str] = None
+) -> Dict[str, Any]:
+    """Typeahead query on a search_as_you_type field.
+
+    The last word of prefix matches as a prefix of the indexed n-grams and
+    the previous ones as whole words; only the id and title are fetched.
+    """
+    body = {
+        "query": {
+            "bool": {
+                "must": {
+                    "multi_match": {
+                        "query": prefix,
+                        "type": "bool_prefix",
+                        "fields": [field, f"{field}._2gram", f"{field}._3gram"]
+                    }
+                },
+                "filter": [{"term": {name: value}} for name, value in (filters or {}).items()]
+            }
+        },
+        "_source": ["id", "title"],
+        "size": size,
+        "track_total_hits": False
+    }
+    if timeout:
+        body["timeout"] = timeout
+    return body
+
+def suggest_documents(
+    index_name: str,
+    prefix: str,
+    field: str,
+    size: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+    routing: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Run a typeahead query within the SUGGEST_TIMEOUT budget, without retries"""
+    timeout = settings.SUGGEST_TIMEOUT
+    result = es_client.options(request_timeout=timeout, max_retries=0).search(
+        index=index_name,
+        body=build_suggest_query(prefix, field, size, filters, f"{int(timeout * 1000)}ms"),
+        routing=routing
+    )
+    return [hit["_source"] for hit in result.get("hits", {}).get("hits", [])]
+
+def open_point_in_time(index_name: str, keep_alive: str, routing: Optional[str] = None) -> str:
+    """Open a point-in-time snapshot of an index and return its id"""
+    return es_client.open_point_in_time(index=index_name, keep_alive=keep_alive, routing=routing)["id"]
+
+def close_point_in_time(pit_id: str) -> None:
+    try:
+        es_client.close_point_in_time(id=pit_id)
+    except NotFoundError:
+        pass
+
+# Documents are routed by owner_id so that a user's search hits one shard;
+# indexing or deleting without routing is rejected
+TASK_ROUTING_FIELD = "owner_id"
 
 TASK_MAPPINGS = {
+    "_meta": {"mapping_version": TASK_MAPPING_VERSION},
+    "_routing": {"required": True},
     "properties": {
         "id": {"type": "integer"},
-        "title": {"type": "text", "analyzer": "standard"},
+        "title": {
+            "type": "text",
+            "analyzer": "standard",
+            "fields": {
+                "keyword": {"type": "keyword", "ignore_above": 256},
+                # Edge n-grams and shingles for typeahead
+                "suggest": {"type": "search_as_you_type"}
+            }
+        },
         "description": {"type": "text", "analyzer": "standard"},
         "completed": {"type": "boolean"},
         "created_at": {"type": "date"},
         "due_date": {"type": "date"},
         "priority": {"type": "keyword"},
-        "owner_id": {"type": "integer"}
+        "priority_rank": {"type": "byte"},
+        "owner_id": {"type": "keyword"}
     }
 }
 
-def setup_elasticsearch():
-    # Check if index exists before creating
-    if not es_client.indices.exists(index=TASK_INDEX):
-        create_index(TASK_INDEX, TASK_MAPPINGS)
-    return True 
\ No newline at end of file
+# Segments are stored sorted like a user's task listing, so a search sorted
+# the same way (owner_id is fixed by the filter) can stop after size hits
+TASK_INDEX_SORT = {
+    "sort.field": ["owner_id", "due_date"],
+    "sort.order": ["asc", "asc"],
+}
+
+# Server-side orderings of task search results. Each ends with the task id
+# so that search_after positions are unique and pages never overlap.
+TASK_SEARCH_SORTS = {
+    "due_date": [{"owner_id": "asc"}, {"due_date": "asc"}, {"id": "asc"}],
+    "priority": [{"priority_rank": "desc"}, {"due_date": "asc"}, {"id": "asc"}],
+    "relevance": [{"_score": "desc"}, {"id": "asc"}],
+}
+
+TASK_SUGGEST_FIELD = "title.suggest"
+
+def get_alias_indices(alias: str) -> List[str]:
+    """Names of the indices behind alias (empty if the alias does not exist)"""
+    try:
+        return sorted(es_client.indices.get_alias(name=alias))
+    except NotFoundError:
+        return []
+
+def get_task_index_versions() -> Dict[int, str]:
+    """Existing versioned task indices, by version"""
+    versions = {}
+    for index_name in es_client.indices.get(index=f"{TASK_INDEX_VERSION_PREFIX}*"):
+        suffix = index_name[len(TASK_INDEX_VERSION_PREFIX):]
+        if suffix.isdigit():
+            versions[int(suffix)] = index_name
+    return versions
+
+def get_task_write_indices() -> List[str]:
+    """Indices that live task changes must be written to: the served one plus any being built"""
+    return sorted(set(get_alias_indices(TASK_INDEX)) | set(get_alias_indices(TASK_BUILD_ALIAS)))
+
+def _create_task_index(index_name: str, index_settings: Dict[str, Any]) -> None:
+    es_client.indices.create(
+        index=index_name, mappings=TASK_MAPPINGS, settings={**index_settings, **TASK_INDEX_SORT}
+    )
+
+def begin_task_index_build() -> str:
+    """Create the next task index version and start dual-writing to it.
+
+    The index is created without replicas and with refresh disabled, which
+    makes the bulk backfill much cheaper; finish_task_index_build restores
+    both.
+
+    Returns:
+        str: The name of the new index.
+    """
+    versions = get_task_index_versions()
+    index_name = f"{TASK_INDEX_VERSION_PREFIX}{max(versions, default=0) + 1}"
+    _create_task_index(index_name, {
+        "number_of_shards": settings.ELASTICSEARCH_TASK_SHARDS,
+        "number_of_replicas": 0,
+        "refresh_interval": "-1",
+    })
+    try:
+        actions = [{"remove": {"index": old, "alias": TASK_BUILD_ALIAS}} for old in get_alias_indices(TASK_BUILD_ALIAS)]
+        actions.append({"add": {"index": index_name, "alias": TASK_BUILD_ALIAS}})
+        es_client.indices.update_aliases(actions=actions)
+    except Exception:
+        # The index is ours but would never be filled: do not leave it behind
+        abort_task_index_build(index_name)
+        raise
+    return index_name
+
+def finish_task_index_build(index_name: str) -> None:
+    """Serve reads from a fully built index and drop the versions it replaces.
+
+    The alias is moved in a single update_aliases call, so searches never
+    see a missing or half-filled index. The newest previous versions are
+    kept (ELASTICSEARCH_TASK_VERSIONS_TO_KEEP) for a quick rollback.
+
+    Args:
+        index_name (str): The index returned by begin_task_index_build.
+    """
+    es_client.indices.put_settings(index=index_name, settings={
+        "number_of_replicas": settings.ELASTICSEARCH_TASK_REPLICAS,
+        "refresh_interval": settings.ELASTICSEARCH_TASK_REFRESH_INTERVAL,
+    })
+    es_client.indices.refresh(index=index_name)
+
+    actions = [{"remove": {"index": old, "alias": TASK_INDEX}} for old in get_alias_indices(TASK_INDEX)]
+    actions.append({"remove": {"index": index_name, "alias": TASK_BUILD_ALIAS}})
+    actions.append({"add": {"index": index_name, "alias": TASK_INDEX}})
+    es_client.indices.update_aliases(actions=actions)
+
+    old_versions = sorted(
+        (version, name) for version, name in get_task_index_versions().items() if name != index_name
+    )
+    keep = settings.ELASTICSEARCH_TASK_VERSIONS_TO_KEEP
+    for _, old in old_versions[:max(len(old_versions) - keep, 0)]:
+        logger.info(f"Deleting old task index {old}")
+        es_client.indices.delete(index=old)
+
+def abort_task_index_build(index_name: str) -> None:
+    """Stop dual-writing to a failed build and delete it"""
+    es_client.indices.delete(index=index_name, ignore_unavailable=True)
+
+def setup_elasticsearch() -> bool:
+    """Make sure the task alias points at an index.
+
+    Returns:
+        bool: True if the task index needs a reindex: a new, empty one was
+            created, or the served one has an outdated mapping and no
+            rebuild is in progress. Searches keep using the outdated index
+            until the rebuilt one is swapped in.
+    """
+    served = get_alias_indices(TASK_INDEX)
+    if served:
+        meta = es_client.indices.get_mapping(index=served[0])[served[0]]["mappings"].get("_meta", {})
+        if meta.get("mapping_version", 0) < TASK_MAPPING_VERSION and not get_alias_indices(TASK_BUILD_ALIAS):
+            logger.warning(f"Task index {served[0]} has an outdated mapping, rebuilding it")
+            return True
+        return False
+
+    index_name = f"{TASK_INDEX_VERSION_PREFIX}{max(get_task_index_versions(), default=0) + 1}"
+    try:
+        _create_task_index(index_name, {
+            "number_of_shards": settings.ELASTICSEARCH_TASK_SHARDS,
+            "number_of_replicas": settings.ELASTICSEARCH_TASK_REPLICAS,
+            "refresh_interval": settings.ELASTICSEARCH_TASK_REFRESH_INTERVAL,
+        })
+        es_client.indices.update_aliases(actions=[{"add": {"index": index_name, "alias": TASK_INDEX}}])
+    except BadRequestError as e:
+        # Another worker created it first
+        if e.error != "resource_already_exists_exception":
+            raise
+        return False
+    return True
@@ -0,0 +1,97 @@
+from elasticsearch import AsyncElasticsearch, NotFoundError
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+from app.config import settings
+from app.infrastructure.services.elastic import (
+    build_search_query, build_suggest_query, build_aggregation_query, get_client_options, read_search_page
+)
+
+# Async counterparts of app.infrastructure.services.elastic for the async
+# request path. A single client (and therefore a single connection pool) is
+# shared by every request of the process; it is created on first use because
+# AsyncElasticsearch must be built inside a running event loop.
+_async_es_client: Optional[AsyncElasticsearch] = None
+
+def get_async_elasticsearch_client() -> AsyncElasticsearch:
+    """Get the shared AsyncElasticsearch client, creating it on first use"""
+    global _async_es_client
+    if _async_es_client is None:
+        _async_es_client = AsyncElasticsearch(settings.ELASTICSEARCH_URL, **get_client_options())
+    return _async_es_client
+
+async def search_documents_page(
+    index_name: str,
+    query: str,
+    fields: List[str] = None,
+    size: int = 100,
+    filters: Optional[Dict[str, Any]] = None,
+    routing: Optional[str] = None,
+    sort: Optional[List[Dict[str, Any]]] = None,
+    search_after: Optional[List[Any]] = None,
+    pit_id: Optional[str] = None,
+    keep_alive: Optional[str] = None,
+    track_total_hits: Union[bool, int] = False,
+) -> Tuple[List[Dict[str, Any]], Optional[List[Any]], Optional[str]]:
+    """Search one page of documents, see elastic.search_documents_page"""
+    pit = {"id": pit_id, "keep_alive": keep_alive} if pit_id else None
+    body = build_search_query(query, fields, size, filters, sort, search_after, pit, track_total_hits)
+    client = get_async_elasticsearch_client().options(
+        request_timeout=settings.ELASTICSEARCH_SEARCH_TIMEOUT
+    )
+    if pit:
+        result = await client.search(body=body)
+    else:
+        result = await client.search(index=index_name, body=body, routing=routing)
+    return read_search_page(result)
+
+async def suggest_documents(
+    index_name: str,
+    prefix: str,
+    field: str,
+    size: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+    routing: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Run a typeahead query within the SUGGEST_TIMEOUT budget, without retries"""
+    timeout = settings.SUGGEST_TIMEOUT
+    client = get_async_elasticsearch_client().options(request_timeout=timeout, max_retries=0)
+    result = await client.search(
+        index=index_name,
+        body=build_suggest_query(prefix, field, size, filters, f"{int(timeout * 1000)}ms"),
+        routing=routing
+    )
+    return [hit["_source"] for hit in result.get("hits", {}).get("hits", [])]
+
+async def aggregate_documents(
+    index_name: str,
+    aggregations: Dict[str, Any],
+    filters: Optional[Dict[str, Any]] = None,
+    routing: Optional[str] = None,
+) -> Dict[str, Any]:
+
+    result = await get_async_elasticsearch_client().options(
+        request_timeout=settings.ELASTICSEARCH_SEARCH_TIMEOUT
+    ).search(
+        index=index_name,
+        body=build_aggregation_query(aggregations, filters),
+        routing=routing
+    )
+    return result.get("aggregations", {})
+
+async def open_point_in_time(index_name: str, keep_alive: str, routing: Optional[str] = None) -> str:
+    result = await get_async_elasticsearch_client().open_point_in_time(
+        index=index_name, keep_alive=keep_alive, routing=routing
+    )
+    return result["id"]
+
+async def close_point_in_time(pit_id: str) -> None:
+    try:
+        await get_async_elasticsearch_client().close_point_in_time(id=pit_id)
+    except NotFoundError:
+        pass
+
+async def close_async_elasticsearch() -> None:
+    global _async_es_client
+    if _async_es_client is not None:
+        await _async_es_client.close()
+        _async_es_client = None
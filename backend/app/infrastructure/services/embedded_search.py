@@ -0,0 +1,413 @@
+import bisect
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.application.task_stats import count_task_stats, due_date_bucket, due_date_ranges
+from app.domain.repositories.search_backend import ISearchBackend, SearchPage
+
+logger = logging.getLogger(__name__)
+
+# Same tokens as the standard analyzer of the task index, lowercased
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Searched fields and their boosts, as in the Elasticsearch multi_match
+FIELD_BOOSTS = {"title": 3.0, "description": 1.0}
+
+# BM25 parameters, Lucene's defaults
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Matches through an edit or a prefix count for less than exact ones
+FUZZY_WEIGHT = 0.5
+PREFIX_WEIGHT = 0.8
+
+# First line of a snapshot; the rest is one JSON document per line
+SNAPSHOT_MAGIC = b"TASKIDX2\n"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def max_edits(term: str) -> int:
+    """Edit distance allowed for a term, like Elasticsearch's fuzziness AUTO"""
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def within_edits(a: str, b: str, limit: int) -> bool:
+    """Whether the Levenshtein distance between a and b is at most limit"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+def bigrams(term: str) -> set:
+    """Distinct character bigrams of term, padded so that its ends count too"""
+    padded = f"^{term}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class _OwnerIndex:
+    """Inverted index of one owner's tasks"""
+
+    __slots__ = ("documents", "postings", "lengths", "total_lengths", "_vocabulary", "_bigrams")
+
+    def __init__(self):
+        self.documents: Dict[int, Dict[str, Any]] = {}
+        # field -> term -> {task id: term frequency}
+        self.postings: Dict[str, Dict[str, Dict[int, int]]] = {field: {} for field in FIELD_BOOSTS}
+        self.lengths: Dict[str, Dict[int, int]] = {field: {} for field in FIELD_BOOSTS}
+        self.total_lengths: Dict[str, int] = {field: 0 for field in FIELD_BOOSTS}
+        self._vocabulary: Optional[List[str]] = None
+        # bigram -> indexed terms containing it, built with the vocabulary
+        self._bigrams: Optional[Dict[str, List[str]]] = None
+
+    def add(self, document: Dict[str, Any]) -> None:
+        task_id = document["id"]
+        self.remove(task_id)
+        self.documents[task_id] = document
+        for field in FIELD_BOOSTS:
+            tokens = tokenize(document.get(field))
+            self.lengths[field][task_id] = len(tokens)
+            self.total_lengths[field] += len(tokens)
+            for token in tokens:
+                postings = self.postings[field].setdefault(token, {})
+                postings[task_id] = postings.get(task_id, 0) + 1
+        self._vocabulary = None
+
+    def remove(self, task_id: int) -> None:
+        document = self.documents.pop(task_id, None)
+        if document is None:
+            return
+        for field in FIELD_BOOSTS:
+            self.total_lengths[field] -= self.lengths[field].pop(task_id, 0)
+            for token in set(tokenize(document.get(field))):
+                postings = self.postings[field].get(token)
+                if postings is not None:
+                    postings.pop(task_id, None)
+                    if not postings:
+                        del self.postings[field][token]
+        self._vocabulary = None
+
+    def vocabulary(self) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(set().union(*(self.postings[field] for field in FIELD_BOOSTS)))
+            self._bigrams = None
+        return self._vocabulary
+
+    def fuzzy_candidates(self, term: str, edits: int) -> Iterable[str]:
+        """Indexed terms that may be within edits of term.
+
+        Every edit changes at most two of a term's padded bigrams, so a match
+        shares all but 2 * edits of the term's distinct bigrams with it; only
+        terms of a close length sharing that many are returned. Terms too
+        repetitive for the bound to hold are compared with the whole
+        vocabulary.
+        """
+        vocabulary = self.vocabulary()
+        grams = bigrams(term)
+        required = len(grams) - 2 * edits
+        if required <= 0:
+            return vocabulary
+        if self._bigrams is None:
+            index: Dict[str, List[str]] = {}
+            for candidate in vocabulary:
+                for gram in bigrams(candidate):
+                    index.setdefault(gram, []).append(candidate)
+            self._bigrams = index
+        shared = Counter(
+            candidate for gram in grams for candidate in self._bigrams.get(gram, ())
+            if abs(len(candidate) - len(term)) <= edits
+        )
+        return [candidate for candidate, count in shared.items() if count >= required]
+
+    def expand(self, term: str, prefix: bool = False, fuzzy: bool = True) -> List[Tuple[str, float]]:
+        """Indexed terms matching term, with the weight of each match"""
+        vocabulary = self.vocabulary()
+        matches = {term: 1.0} if self._contains(vocabulary, term) else {}
+        if prefix:
+            start = bisect.bisect_left(vocabulary, term)
+            for candidate in vocabulary[start:]:
+                if not candidate.startswith(term):
+                    break
+                matches.setdefault(candidate, PREFIX_WEIGHT)
+        edits = max_edits(term) if fuzzy else 0
+        if edits:
+            for candidate in self.fuzzy_candidates(term, edits):
+                if candidate not in matches and within_edits(term, candidate, edits):
+                    matches[candidate] = FUZZY_WEIGHT
+        return list(matches.items())
+
+    @staticmethod
+    def _contains(vocabulary: List[str], term: str) -> bool:
+        position = bisect.bisect_left(vocabulary, term)
+        return position < len(vocabulary) and vocabulary[position] == term
+
+    def score(
+        self, terms: List[str], fields: Iterable[str] = FIELD_BOOSTS, prefix_last: bool = False
+    ) -> Dict[int, float]:
+        """BM25 score of every matching task, the best of its fields (best_fields)"""
+        count = len(self.documents)
+        expansions = [
+            self.expand(term, prefix=prefix_last and position == len(terms) - 1, fuzzy=not prefix_last)
+            for position, term in enumerate(terms)
+        ]
+        best: Dict[int, float] = {}
+        for field in fields:
+            postings = self.postings[field]
+            average_length = self.total_lengths[field] / count if count else 0.0
+            field_scores: Dict[int, float] = {}
+            for matches in expansions:
+                # A document matching several expansions of a term counts its best one
+                term_scores: Dict[int, float] = {}
+                for candidate, weight in matches:
+                    documents = postings.get(candidate)
+                    if not documents:
+                        continue
+                    idf = math.log(1 + (count - len(documents) + 0.5) / (len(documents) + 0.5))
+                    for task_id, frequency in documents.items():
+                        norm = 1 - BM25_B + BM25_B * self.lengths[field][task_id] / (average_length or 1.0)
+                        value = weight * idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                        if value > term_scores.get(task_id, 0.0):
+                            term_scores[task_id] = value
+                for task_id, value in term_scores.items():
+                    field_scores[task_id] = field_scores.get(task_id, 0.0) + value
+            boost = FIELD_BOOSTS[field]
+            for task_id, value in field_scores.items():
+                if boost * value > best.get(task_id, 0.0):
+                    best[task_id] = boost * value
+        return best
+
+
+def _sort_key(sort: str, document: Dict[str, Any], score: float) -> List[Any]:
+    """Ascending sort values of a hit, also used as its search_after position"""
+    due_date = document.get("due_date") or ""
+    if sort == "priority":
+        return [-document.get("priority_rank", 1), due_date, document["id"]]
+    if sort == "relevance":
+        return [-score, document["id"]]
+    return [due_date, document["id"]]
+
+
+class EmbeddedSearchBackend(ISearchBackend):
+    """In-process search over per-owner inverted indexes.
+
+    Meant for small deployments and tests. The index lives in this
+    process' memory, so it is updated by the write paths directly instead of
+    the search outbox; with several workers, each one applies every worker's
+    changes as they are broadcast over Redis (see publish_search_update). Scoring is
+    BM25 over the title (boosted) and description, with fuzzy matching like
+    fuzziness AUTO; typeahead matches the last word as a prefix.
+
+    The index is filled by a reindex job on startup, or restored from a
+    snapshot (save_snapshot / load_snapshot). Snapshots hold the documents
+    as JSON lines, never code, and are indexed again when loaded. A
+    snapshot is only accurate if no other process wrote tasks since it was
+    saved.
+    """
+
+    name = "embedded"
+    indexed_by_outbox = False
+
+    def __init__(self):
+        self._owners: Dict[int, _OwnerIndex] = {}
+        self._lock = threading.RLock()
+        # Changes made while a rebuild runs, replayed onto the rebuilt index
+        self._pending: Optional[List[Tuple[str, Any]]] = None
+
+    def _apply(self, owners: Dict[int, _OwnerIndex], operation: str, value: Any) -> None:
+        if operation == "index":
+            owners.setdefault(int(value["owner_id"]), _OwnerIndex()).add(value)
+        else:
+            task_id, owner_id = value
+            index = owners.get(int(owner_id))
+            if index is not None:
+                index.remove(int(task_id))
+
+    def _search(
+        self,
+        owner_id: int,
+        terms: List[str],
+        sort: str,
+        size: int,
+        search_after: Optional[List[Any]],
+        fields: Iterable[str] = FIELD_BOOSTS,
+        prefix_last: bool = False,
+    ) -> List[Tuple[List[Any], Dict[str, Any]]]:
+        with self._lock:
+            index = self._owners.get(owner_id)
+            if index is None or not terms:
+                return []
+            scores = index.score(terms, fields, prefix_last)
+            hits = [
+                (_sort_key(sort, index.documents[task_id], score), index.documents[task_id])
+                for task_id, score in scores.items()
+            ]
+        if search_after is not None:
+            hits = [hit for hit in hits if hit[0] > list(search_after)]
+        return heapq.nsmallest(size, hits, key=lambda hit: hit[0])
+
+    def search(
+        self,
+        owner_id: int,
+        query: str,
+        sort: str = "due_date",
+        size: int = 100,
+        search_after: Optional[List[Any]] = None,
+        pit_id: Optional[str] = None,
+    ) -> SearchPage:
+        hits = self._search(owner_id, tokenize(query), sort, size, search_after)
+        return [dict(document) for _, document in hits], (hits[-1][0] if hits else None), None
+
+    async def search_async(
+        self,
+        owner_id: int,
+        query: str,
+        sort: str = "due_date",
+        size: int = 100,
+        search_after: Optional[List[Any]] = None,
+        pit_id: Optional[str] = None,
+    ) -> SearchPage:
+        return self.search(owner_id, query, sort, size, search_after, pit_id)
+
+    def suggest(self, owner_id: int, prefix: str, size: int = 5) -> List[Dict[str, Any]]:
+        hits = self._search(owner_id, tokenize(prefix), "relevance", size, None, ("title",), prefix_last=True)
+        return [{"id": document["id"], "title": document["title"]} for _, document in hits]
+
+    async def suggest_async(self, owner_id: int, prefix: str, size: int = 5) -> List[Dict[str, Any]]:
+        return self.suggest(owner_id, prefix, size)
+
+    def task_stats(self, owner_id: int, now: datetime) -> Dict[str, Any]:
+        ranges = due_date_ranges(now)
+        groups = Counter()
+        with self._lock:
+            index = self._owners.get(owner_id)
+            documents = list(index.documents.values()) if index is not None else []
+        for document in documents:
+            due_date = document.get("due_date")
+            bucket = None
+            if not document.get("completed") and due_date:
+                bucket = due_date_bucket(datetime.fromisoformat(due_date), ranges)
+            groups[(bool(document.get("completed")), document["priority"], bucket)] += 1
+        return count_task_stats(key + (count,) for key, count in groups.items())
+
+    async def task_stats_async(self, owner_id: int, now: datetime) -> Dict[str, Any]:
+        return self.task_stats(owner_id, now)
+
+    def open_point_in_time(self, owner_id: int) -> Optional[str]:
+        # Pages are read from the live index
+        return None
+
+    async def open_point_in_time_async(self, owner_id: int) -> Optional[str]:
+        return None
+
+    def close_point_in_time(self, pit_id: str) -> None:
+        pass
+
+    async def close_point_in_time_async(self, pit_id: str) -> None:
+        pass
+
+    def index_documents(self, documents: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for document in documents:
+                self._apply(self._owners, "index", document)
+                if self._pending is not None:
+                    self._pending.append(("index", document))
+
+    def delete_documents(self, keys: Iterable[Tuple[int, int]]) -> None:
+        with self._lock:
+            for key in keys:
+                self._apply(self._owners, "delete", key)
+                if self._pending is not None:
+                    self._pending.append(("delete", key))
+
+    def rebuild(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Build a new index from documents and swap it in.
+
+        Searches are served from the current index meanwhile; writes made
+        during the rebuild are applied to both.
+        """
+        with self._lock:
+            self._pending = []
+        owners: Dict[int, _OwnerIndex] = {}
+        count = 0
+        try:
+            for document in documents:
+                self._apply(owners, "index", document)
+                count += 1
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for operation, value in self._pending:
+                self._apply(owners, operation, value)
+            self._owners = owners
+            self._pending = None
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "owners": len(self._owners),
+                "documents": sum(len(index.documents) for index in self._owners.values()),
+            }
+
+    def save_snapshot(self, path: str) -> None:
+        """Write the indexed documents to path atomically"""
+        with self._lock:
+            documents = [document for index in self._owners.values() for document in index.documents.values()]
+        # Workers share the path, so each one writes its own temporary file
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as snapshot:
+            snapshot.write(SNAPSHOT_MAGIC)
+            for document in documents:
+                snapshot.write(json.dumps(document, separators=(",", ":")).encode() + b"\n")
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary_path, path)
+
+    def load_snapshot(self, path: str) -> bool:
+        """Replace the index with the snapshot at path.
+
+        Returns:
+            bool: False if there is no usable snapshot.
+        """
+        if not os.path.exists(path):
+            return False
+        owners: Dict[int, _OwnerIndex] = {}
+        try:
+            with open(path, "rb") as snapshot:
+                if snapshot.readline() != SNAPSHOT_MAGIC:
+                    logger.warning(f"Ignoring search snapshot {path}: unknown format")
+                    return False
+                for line in snapshot:
+                    self._apply(owners, "index", json.loads(line))
+        except Exception as e:
+            logger.error(f"Failed to load search snapshot {path}: {str(e)}")
+            return False
+        with self._lock:
+            self._owners = owners
+        return True
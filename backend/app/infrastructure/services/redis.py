@@ -1,30 +1,351 @@
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
 import redis
 from app.config import settings
+from app.infrastructure.services.local_cache import LocalCache
+from app.infrastructure.services.cache_metrics import CacheMetrics, HotKeyTracker
+from app.infrastructure.services.cache_codec import CacheCodec
+
+logger = logging.getLogger(__name__)
 
-def get_redis_client():
+def get_redis_client(decode_responses: bool = True):
     """Get Redis client with the current settings URL"""
     return redis.Redis.from_url(
-        settings.REDIS_URL, 
-        decode_responses=True
+        settings.REDIS_URL,
+        decode_responses=decode_responses
     )
 
 # Get initial client
 redis_client = get_redis_client()
 
+# Cached payloads may be compressed, so they go through a client that
+# returns raw bytes and are decoded by the codec
+payload_client = get_redis_client(decode_responses=False)
+codec = CacheCodec(
+    codec=settings.CACHE_CODEC,
+    threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+    zlib_level=settings.CACHE_ZLIB_LEVEL,
+)
+
+# In-process L1 tier in front of Redis, kept coherent across workers through
+# invalidation messages on CACHE_INVALIDATION_CHANNEL
+local_cache = LocalCache(
+    max_entries=settings.CACHE_L1_MAX_ENTRIES if settings.CACHE_L1_ENABLED else 0,
+    default_ttl=settings.CACHE_L1_TTL,
+)
+
+# Identifies this process so it can skip its own invalidation messages
+_instance_id = uuid.uuid4().hex
+_invalidation_thread = None
+
+cache_metrics = CacheMetrics(
+    HotKeyTracker(
+        capacity=settings.CACHE_HOT_KEY_CAPACITY,
+        sample_rate=settings.CACHE_HOT_KEY_SAMPLE_RATE,
+    )
+)
+
+def decode_payload(key: str, raw: Optional[bytes]) -> Optional[str]:
+    if raw is None:
+        return None
+    try:
+        return codec.decode(raw)
+    except Exception as e:
+        logger.error(f"Failed to decode cache entry {key}: {str(e)}")
+        return None
+
 def get_cache(key: str) -> str:
-    return redis_client.get(key)
+    started = time.perf_counter()
+    value = local_cache.get(key)
+    if value is not None:
+        cache_metrics.record_get(key, "l1", value, time.perf_counter() - started)
+        return value
+    raw = payload_client.get(key)
+    value = decode_payload(key, raw)
+    if value is not None:
+        local_cache.set(key, value)
+    cache_metrics.record_get(key, "l2" if value is not None else None, raw, time.perf_counter() - started)
+    return value
+
+def set_cache(key: str, value: str, expiry: int = 3600, tags: Iterable[str] = ()) -> bool:
+    """Set a key, optionally recording it under tags for later invalidation"""
+    started = time.perf_counter()
+    encoded = codec.encode(value)
+    if tags:
+        pipe = payload_client.pipeline(transaction=False)
+        pipe.set(key, encoded, ex=expiry)
+        for tag in tags:
+            _add_to_tag(pipe, tag, [key], expiry)
+        result = pipe.execute()[0]
+    else:
+        result = payload_client.set(key, encoded, ex=expiry)
+    local_cache.set(key, value, expiry)
+    cache_metrics.record_set(key, encoded, time.perf_counter() - started)
+    return result
 
-def set_cache(key: str, value: str, expiry: int = 3600) -> bool:
-    return redis_client.set(key, value, ex=expiry)
+def get_many_cache(keys: List[str]) -> List[Optional[str]]:
+    """Get several keys at once, going to Redis with a single MGET for L1 misses"""
+    started = time.perf_counter()
+    values = [local_cache.get(key) for key in keys]
+    tiers = ["l1" if value is not None else None for value in values]
+    sizes = list(values)
+    missing = [i for i, value in enumerate(values) if value is None]
+    if missing:
+        fetched = payload_client.mget([keys[i] for i in missing])
+        for i, raw in zip(missing, fetched):
+            value = decode_payload(keys[i], raw)
+            if value is not None:
+                values[i] = value
+                sizes[i] = raw
+                tiers[i] = "l2"
+                local_cache.set(keys[i], value)
+    # The round trip is shared, so each key is attributed an equal slice of it
+    elapsed = (time.perf_counter() - started) / max(len(keys), 1)
+    for key, tier, size in zip(keys, tiers, sizes):
+        cache_metrics.record_get(key, tier, size, elapsed)
+    return values
+
+def set_many_cache(mapping: Dict[str, str], expiry: int = 3600) -> list:
+    """Set several keys with the same expiry in one pipelined round trip"""
+    started = time.perf_counter()
+    encoded = {key: codec.encode(value) for key, value in mapping.items()}
+    pipe = payload_client.pipeline(transaction=False)
+    for key, value in mapping.items():
+        pipe.set(key, encoded[key], ex=expiry)
+        local_cache.set(key, value, expiry)
+    result = pipe.execute()
+    elapsed = (time.perf_counter() - started) / max(len(mapping), 1)
+    for key in mapping:
+        cache_metrics.record_set(key, encoded[key], elapsed)
+    return result
 
 def delete_cache(key: str) -> int:
+    local_cache.delete(key)
+    cache_metrics.record_invalidation(key)
     return redis_client.delete(key)
 
+def tag_key(tag: str) -> str:
+    """Name of the Redis set recording the keys tagged with tag"""
+    return f"tag:{tag}"
+
+def _add_to_tag(pipe, tag: str, keys: List[str], expiry: int) -> None:
+    # The tag set lives as long as the most recently tagged key
+    pipe.sadd(tag_key(tag), *keys)
+    pipe.expire(tag_key(tag), expiry)
+
+def _unlink_in_batches(keys: Iterable[str]) -> int:
+    """UNLINK keys in fixed-size batches; memory is reclaimed off the main Redis thread"""
+    removed = 0
+    batch = []
+    for key in keys:
+        cache_metrics.record_invalidation(key)
+        batch.append(key)
+        if len(batch) >= settings.CACHE_SCAN_COUNT:
+            local_cache.delete(*batch)
+            removed += redis_client.unlink(*batch)
+            batch = []
+    if batch:
+        local_cache.delete(*batch)
+        removed += redis_client.unlink(*batch)
+    return removed
+
+def tag_cache_keys(tag: str, *keys: str, expiry: int = 3600) -> None:
+    """Record keys as belonging to tag (a user, an entity...)"""
+    pipe = redis_client.pipeline(transaction=False)
+    _add_to_tag(pipe, tag, list(keys), expiry)
+    pipe.execute()
+
+def invalidate_tag(tag: str) -> int:
+    """Delete every key recorded under tag.
+
+    The tag set is first renamed atomically so keys tagged concurrently land
+    in a fresh set instead of being lost, then its members are walked with
+    SSCAN and unlinked in batches.
+
+    Returns:
+        int: The number of keys removed.
+    """
+    purge_key = f"{tag_key(tag)}:purge:{uuid.uuid4().hex}"
+    try:
+        redis_client.rename(tag_key(tag), purge_key)
+    except redis.ResponseError:
+        # No such key: nothing is tagged
+        return 0
+    removed = _unlink_in_batches(redis_client.sscan_iter(purge_key, count=settings.CACHE_SCAN_COUNT))
+    redis_client.unlink(purge_key)
+    return removed
+
 def get_cache_keys(pattern: str) -> list:
-    return redis_client.keys(pattern)
+    """List keys matching pattern with an incremental SCAN rather than KEYS"""
+    return list(redis_client.scan_iter(match=pattern, count=settings.CACHE_SCAN_COUNT))
 
 def clear_cache_by_pattern(pattern: str) -> int:
-    keys = get_cache_keys(pattern)
-    if keys:
-        return redis_client.delete(*keys)
-    return 0 
\ No newline at end of file
+    """Delete keys matching pattern without blocking Redis.
+
+    This walks the keyspace incrementally and is meant for maintenance;
+    request paths should invalidate through tags or generation counters.
+    """
+    return _unlink_in_batches(
+        redis_client.scan_iter(match=pattern, count=settings.CACHE_SCAN_COUNT)
+    )
+
+def get_cache_version(key: str) -> int:
+    """Get the current generation counter stored under key (0 if unset).
+
+    Counters are always read from Redis, never from the L1 tier: a read
+    racing with a bump could otherwise put the old generation back into L1
+    and keep serving the pages it was meant to retire.
+    """
+    value = redis_client.get(key)
+    return int(value) if value else 0
+
+def bump_cache_versions(*keys: str) -> list:
+    """Atomically increment one or more generation counters.
+
+    All counters are bumped in a single MULTI/EXEC so readers never observe
+    a partially applied write.
+    """
+    for key in keys:
+        cache_metrics.record_invalidation(key)
+    pipe = redis_client.pipeline(transaction=True)
+    for key in keys:
+        pipe.incr(key)
+    return pipe.execute()
+
+# Only delete the lock if it is still held by the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Only push back the expiry of the lock if it is still held by the caller's token
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+def acquire_lock(key: str, ttl: float) -> Optional[str]:
+    """Try to take a short-lived lock.
+
+    Returns:
+        Optional[str]: The lock token to release it with, None if it is held elsewhere.
+    """
+    token = uuid.uuid4().hex
+    if redis_client.set(key, token, nx=True, px=int(ttl * 1000)):
+        return token
+    return None
+
+def release_lock(key: str, token: str) -> bool:
+    return bool(redis_client.eval(RELEASE_LOCK_SCRIPT, 1, key, token))
+
+def extend_lock(key: str, token: str, ttl: float) -> bool:
+    """Reset the expiry of a lock the caller still holds.
+
+    Returns:
+        bool: False if the lock expired and may be held elsewhere.
+    """
+    return bool(redis_client.eval(EXTEND_LOCK_SCRIPT, 1, key, token, int(ttl * 1000)))
+
+class DistributedLock:
+    """A lock shared by every worker, for long jobs that must not run twice.
+
+    It expires after ttl seconds unless the holder keeps extending it, so a
+    worker that dies while holding it does not block the job forever.
+    """
+
+    def __init__(self, key: str, ttl: float):
+        self.key = key
+        self.ttl = ttl
+        self._token: Optional[str] = None
+
+    def acquire(self) -> bool:
+        self._token = acquire_lock(self.key, self.ttl)
+        return self._token is not None
+
+    def extend(self) -> bool:
+        return self._token is not None and extend_lock(self.key, self._token, self.ttl)
+
+    def release(self) -> None:
+        if self._token is not None:
+            release_lock(self.key, self._token)
+            self._token = None
+
+class RedisJobStore:
+    """Statuses of background jobs, kept as JSON for ttl seconds after the last update"""
+
+    def __init__(self, prefix: str, ttl: int):
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def save(self, job_id: str, status: Dict[str, Any]) -> None:
+        redis_client.set(f"{self.prefix}:{job_id}", json.dumps(status), ex=self.ttl)
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        value = redis_client.get(f"{self.prefix}:{job_id}")
+        return json.loads(value) if value is not None else None
+
+def publish_cache_invalidation(*keys: str) -> int:
+    """Evict keys from the local L1 tier and tell every other worker to do the same.
+
+    Returns:
+        int: The number of subscribers that received the message.
+    """
+    local_cache.delete(*keys)
+    return redis_client.publish(settings.CACHE_INVALIDATION_CHANNEL, build_invalidation_message(keys))
+
+def build_invalidation_message(keys: Iterable[str]) -> str:
+    return json.dumps({"origin": _instance_id, "keys": list(keys)})
+
+def _handle_invalidation_message(message: Dict[str, Any]) -> None:
+    try:
+        payload = json.loads(message["data"])
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring malformed cache invalidation message: {message!r}")
+        return
+    if payload.get("origin") != _instance_id:
+        local_cache.delete(*payload.get("keys", []))
+
+def start_cache_invalidation_listener() -> None:
+    """Subscribe to invalidation messages on a background thread"""
+    global _invalidation_thread
+    if _invalidation_thread is not None or not settings.CACHE_L1_ENABLED:
+        return
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{settings.CACHE_INVALIDATION_CHANNEL: _handle_invalidation_message})
+    _invalidation_thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+def stop_cache_invalidation_listener() -> None:
+    global _invalidation_thread
+    if _invalidation_thread is not None:
+        _invalidation_thread.stop()
+        _invalidation_thread = None
+    # Without a listener other workers' writes would go unnoticed until the L1 TTL
+    local_cache.clear()
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Tier hit ratios and per key type counters of this process"""
+    by_type = cache_metrics.snapshot()
+    l2_hits = sum(stats["l2_hits"] for stats in by_type.values())
+    l2_lookups = l2_hits + sum(stats["misses"] for stats in by_type.values())
+    return {
+        "l1": local_cache.stats(),
+        "l2": {
+            "hits": l2_hits,
+            "misses": l2_lookups - l2_hits,
+            "hit_ratio": l2_hits / l2_lookups if l2_lookups else 0.0,
+        },
+        "invalidation_listener": _invalidation_thread is not None,
+        "key_types": by_type,
+    }
+
+def get_hot_keys(limit: int = 20) -> List[Dict[str, Any]]:
+    """Estimated most accessed keys, from a sample of lookups"""
+    return cache_metrics.hot_keys.top(limit)
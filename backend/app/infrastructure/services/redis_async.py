@@ -0,0 +1,149 @@
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+import redis
+import redis.asyncio as aioredis
+from app.config import settings
+from app.infrastructure.services.redis import (
+    local_cache, cache_metrics, codec, decode_payload, tag_key,
+    build_invalidation_message, RELEASE_LOCK_SCRIPT
+)
+
+# Async counterparts of app.infrastructure.services.redis for the async
+# request path. They share the L1 tier, the metrics and the codec of the
+# sync module so both paths see the same cache.
+
+def get_async_redis_client(decode_responses: bool = True):
+    """Get asyncio Redis client with the current settings URL"""
+    return aioredis.Redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=decode_responses,
+        max_connections=settings.ASYNC_REDIS_MAX_CONNECTIONS,
+    )
+
+async_redis_client = get_async_redis_client()
+async_payload_client = get_async_redis_client(decode_responses=False)
+
+async def get_cache(key: str) -> Optional[str]:
+    started = time.perf_counter()
+    value = local_cache.get(key)
+    if value is not None:
+        cache_metrics.record_get(key, "l1", value, time.perf_counter() - started)
+        return value
+    raw = await async_payload_client.get(key)
+    value = decode_payload(key, raw)
+    if value is not None:
+        local_cache.set(key, value)
+    cache_metrics.record_get(key, "l2" if value is not None else None, raw, time.perf_counter() - started)
+    return value
+
+async def set_cache(key: str, value: str, expiry: int = 3600, tags: Iterable[str] = ()) -> bool:
+    """Set a key, optionally recording it under tags for later invalidation"""
+    started = time.perf_counter()
+    encoded = codec.encode(value)
+    pipe = async_payload_client.pipeline(transaction=False)
+    pipe.set(key, encoded, ex=expiry)
+    for tag in tags:
+        pipe.sadd(tag_key(tag), key)
+        pipe.expire(tag_key(tag), expiry)
+    result = (await pipe.execute())[0]
+    local_cache.set(key, value, expiry)
+    cache_metrics.record_set(key, encoded, time.perf_counter() - started)
+    return result
+
+async def get_many_cache(keys: List[str]) -> List[Optional[str]]:
+    """Get several keys at once, going to Redis with a single MGET for L1 misses"""
+    started = time.perf_counter()
+    values = [local_cache.get(key) for key in keys]
+    tiers = ["l1" if value is not None else None for value in values]
+    sizes = list(values)
+    missing = [i for i, value in enumerate(values) if value is None]
+    if missing:
+        fetched = await async_payload_client.mget([keys[i] for i in missing])
+        for i, raw in zip(missing, fetched):
+            value = decode_payload(keys[i], raw)
+            if value is not None:
+                values[i] = value
+                sizes[i] = raw
+                tiers[i] = "l2"
+                local_cache.set(keys[i], value)
+    elapsed = (time.perf_counter() - started) / max(len(keys), 1)
+    for key, tier, size in zip(keys, tiers, sizes):
+        cache_metrics.record_get(key, tier, size, elapsed)
+    return values
+
+async def set_many_cache(mapping: Dict[str, str], expiry: int = 3600) -> list:
+    """Set several keys with the same expiry in one pipelined round trip"""
+    started = time.perf_counter()
+    encoded = {key: codec.encode(value) for key, value in mapping.items()}
+    pipe = async_payload_client.pipeline(transaction=False)
+    for key, value in mapping.items():
+        pipe.set(key, encoded[key], ex=expiry)
+        local_cache.set(key, value, expiry)
+    result = await pipe.execute()
+    elapsed = (time.perf_counter() - started) / max(len(mapping), 1)
+    for key in mapping:
+        cache_metrics.record_set(key, encoded[key], elapsed)
+    return result
+
+async def delete_cache(key: str) -> int:
+    local_cache.delete(key)
+    cache_metrics.record_invalidation(key)
+    return await async_redis_client.delete(key)
+
+async def invalidate_tag(tag: str) -> int:
+    """Delete every key recorded under tag (see redis.invalidate_tag)"""
+    purge_key = f"{tag_key(tag)}:purge:{uuid.uuid4().hex}"
+    try:
+        await async_redis_client.rename(tag_key(tag), purge_key)
+    except redis.ResponseError:
+        return 0
+    removed = 0
+    batch = []
+    async for key in async_redis_client.sscan_iter(purge_key, count=settings.CACHE_SCAN_COUNT):
+        cache_metrics.record_invalidation(key)
+        batch.append(key)
+        if len(batch) >= settings.CACHE_SCAN_COUNT:
+            local_cache.delete(*batch)
+            removed += await async_redis_client.unlink(*batch)
+            batch = []
+    if batch:
+        local_cache.delete(*batch)
+        removed += await async_redis_client.unlink(*batch)
+    await async_redis_client.unlink(purge_key)
+    return removed
+
+async def get_cache_version(key: str) -> int:
+    """Get the current generation counter stored under key (0 if unset), bypassing L1"""
+    value = await async_redis_client.get(key)
+    return int(value) if value else 0
+
+async def bump_cache_versions(*keys: str) -> list:
+    """Atomically increment one or more generation counters"""
+    for key in keys:
+        cache_metrics.record_invalidation(key)
+    pipe = async_redis_client.pipeline(transaction=True)
+    for key in keys:
+        pipe.incr(key)
+    return await pipe.execute()
+
+async def acquire_lock(key: str, ttl: float) -> Optional[str]:
+    token = uuid.uuid4().hex
+    if await async_redis_client.set(key, token, nx=True, px=int(ttl * 1000)):
+        return token
+    return None
+
+async def release_lock(key: str, token: str) -> bool:
+    return bool(await async_redis_client.eval(RELEASE_LOCK_SCRIPT, 1, key, token))
+
+async def publish_cache_invalidation(*keys: str) -> int:
+    """Evict keys from the local L1 tier and tell every other worker to do the same"""
+    local_cache.delete(*keys)
+    return await async_redis_client.publish(
+        settings.CACHE_INVALIDATION_CHANNEL, build_invalidation_message(keys)
+    )
+
+async def close_async_redis() -> None:
+    await async_redis_client.close()
+    await async_payload_client.close()
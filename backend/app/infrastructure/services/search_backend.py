@@ -0,0 +1,277 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.application.task_stats import PRIORITIES, count_task_stats, due_date_ranges
+from app.domain.repositories.search_backend import ISearchBackend, SearchPage
+from app.infrastructure.services import elastic_async
+from app.infrastructure.services.elastic import (
+    TASK_INDEX, TASK_ROUTING_FIELD, TASK_SEARCH_SORTS, TASK_SUGGEST_FIELD, bulk_index_documents,
+    bulk_delete_documents, aggregate_documents, search_documents_page, suggest_documents, open_point_in_time, close_point_in_time,
+    get_task_write_indices, begin_task_index_build, finish_task_index_build, abort_task_index_build,
+    setup_elasticsearch
+)
+from app.infrastructure.services.embedded_search import EmbeddedSearchBackend
+from app.infrastructure.services.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_search_update_thread = None
+
+class ElasticsearchSearchBackend(ISearchBackend):
+    """Search served by the versioned task index behind the TASK_INDEX alias.
+
+    Every query is routed to the owner's shard and filtered by owner_id in
+    filter context. Live changes reach the index through the search outbox.
+    """
+
+    name = "elasticsearch"
+    indexed_by_outbox = True
+
+    # Title is more important
+    fields = ["title^3", "description"]
+
+    def _search_kwargs(
+        self, owner_id: int, sort: str, size: int, search_after: Optional[List[Any]], pit_id: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "fields": self.fields,
+            "size": size,
+            "filters": {"owner_id": owner_id},
+            "routing": str(owner_id),
+            "sort": TASK_SEARCH_SORTS[sort],
+            "search_after": search_after,
+            "pit_id": pit_id,
+            "keep_alive": settings.SEARCH_POINT_IN_TIME_KEEP_ALIVE,
+            "track_total_hits": settings.SEARCH_TRACK_TOTAL_HITS,
+        }
+
+    def search(
+        self,
+        owner_id: int,
+        query: str,
+        sort: str = "due_date",
+        size: int = 100,
+        search_after: Optional[List[Any]] = None,
+        pit_id: Optional[str] = None,
+    ) -> SearchPage:
+        return search_documents_page(
+            TASK_INDEX, query, **self._search_kwargs(owner_id, sort, size, search_after, pit_id)
+        )
+
+    async def search_async(
+        self,
+        owner_id: int,
+        query: str,
+        sort: str = "due_date",
+        size: int = 100,
+        search_after: Optional[List[Any]] = None,
+        pit_id: Optional[str] = None,
+    ) -> SearchPage:
+        return await elastic_async.search_documents_page(
+            TASK_INDEX, query, **self._search_kwargs(owner_id, sort, size, search_after, pit_id)
+        )
+
+    def suggest(self, owner_id: int, prefix: str, size: int = 5) -> List[Dict[str, Any]]:
+        return suggest_documents(
+            TASK_INDEX, prefix, TASK_SUGGEST_FIELD, size=size,
+            filters={"owner_id": owner_id}, routing=str(owner_id)
+        )
+
+    async def suggest_async(self, owner_id: int, prefix: str, size: int = 5) -> List[Dict[str, Any]]:
+        return await elastic_async.suggest_documents(
+            TASK_INDEX, prefix, TASK_SUGGEST_FIELD, size=size,
+            filters={"owner_id": owner_id}, routing=str(owner_id)
+        )
+
+    def _stats_aggregations(self, now: datetime) -> Dict[str, Any]:
+        """Counts by completion, then priority, then due-date range, in one request"""
+        ranges = []
+        for bucket, start, end in due_date_ranges(now):
+            date_range = {"key": bucket}
+            if start is not None:
+                date_range["from"] = start.isoformat()
+            if end is not None:
+                date_range["to"] = end.isoformat()
+            ranges.append(date_range)
+        return {
+            "completed": {
+                "terms": {"field": "completed", "size": 2},
+                "aggs": {
+                    "priority": {
+                        "terms": {"field": "priority", "size": len(PRIORITIES)},
+                        "aggs": {"due": {"date_range": {"field": "due_date", "ranges": ranges}}}
+                    }
+                }
+            }
+        }
+
+    def _stats_rows(self, aggregations: Dict[str, Any]) -> Iterator[Tuple[bool, str, Optional[str], int]]:
+        for completion in aggregations["completed"]["buckets"]:
+            completed = completion.get("key_as_string") == "true"
+            for priority in completion["priority"]["buckets"]:
+                if completed:
+                    yield True, priority["key"], None, priority["doc_count"]
+                    continue
+                for due in priority["due"]["buckets"]:
+                    yield False, priority["key"], due["key"], due["doc_count"]
+
+    def task_stats(self, owner_id: int, now: datetime) -> Dict[str, Any]:
+        aggregations = aggregate_documents(
+            TASK_INDEX, self._stats_aggregations(now), filters={"owner_id": owner_id}, routing=str(owner_id)
+        )
+        return count_task_stats(self._stats_rows(aggregations))
+
+    async def task_stats_async(self, owner_id: int, now: datetime) -> Dict[str, Any]:
+        aggregations = await elastic_async.aggregate_documents(
+            TASK_INDEX, self._stats_aggregations(now), filters={"owner_id": owner_id}, routing=str(owner_id)
+        )
+        return count_task_stats(self._stats_rows(aggregations))
+
+    def open_point_in_time(self, owner_id: int) -> Optional[str]:
+        return open_point_in_time(TASK_INDEX, settings.SEARCH_POINT_IN_TIME_KEEP_ALIVE, routing=str(owner_id))
+
+    async def open_point_in_time_async(self, owner_id: int) -> Optional[str]:
+        return await elastic_async.open_point_in_time(
+            TASK_INDEX, settings.SEARCH_POINT_IN_TIME_KEEP_ALIVE, routing=str(owner_id)
+        )
+
+    def close_point_in_time(self, pit_id: str) -> None:
+        close_point_in_time(pit_id)
+
+    async def close_point_in_time_async(self, pit_id: str) -> None:
+        await elastic_async.close_point_in_time(pit_id)
+
+    def index_documents(self, documents: Iterable[Dict[str, Any]]) -> None:
+        documents = list(documents)
+        for index_name in get_task_write_indices():
+            results = bulk_index_documents(
+                index_name,
+                ((str(document["id"]), document) for document in documents),
+                routing_field=TASK_ROUTING_FIELD,
+            )
+            for ok, item in results:
+                if not ok:
+                    raise RuntimeError(f"Failed to index task: {item}")
+
+    def delete_documents(self, keys: Iterable[Tuple[int, int]]) -> None:
+        failed = bulk_delete_documents(
+            get_task_write_indices(), ((str(task_id), str(owner_id)) for task_id, owner_id in keys)
+        )
+        if failed:
+            raise RuntimeError(f"Failed to delete tasks: {failed}")
+
+    def rebuild(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Backfill a new index version with documents and swap it in"""
+        index_name = begin_task_index_build()
+        try:
+            count = 0
+            results = bulk_index_documents(
+                index_name,
+                ((str(document["id"]), document) for document in documents),
+                chunk_size=settings.REINDEX_CHUNK_SIZE,
+                thread_count=settings.REINDEX_THREAD_COUNT,
+                queue_size=settings.REINDEX_QUEUE_SIZE,
+                op_type="create",
+                routing_field=TASK_ROUTING_FIELD,
+            )
+            for ok, item in results:
+                if not ok:
+                    raise RuntimeError(f"Failed to index task into {index_name}: {item}")
+                count += 1
+            finish_task_index_build(index_name)
+        except Exception:
+            abort_task_index_build(index_name)
+            raise
+        return count
+
+def create_search_backend(name: str) -> ISearchBackend:
+    """Build the search backend selected by the SEARCH_BACKEND setting.
+
+    Args:
+        name (str): "elasticsearch" or "embedded".
+
+    Raises:
+        ValueError: If the backend is unknown.
+
+    Returns:
+        ISearchBackend: The backend.
+    """
+    if name == "elasticsearch":
+        return ElasticsearchSearchBackend()
+    if name == "embedded":
+        return EmbeddedSearchBackend()
+    raise ValueError(f"Unknown search backend: {name!r}")
+
+search_backend = create_search_backend(settings.SEARCH_BACKEND)
+
+def get_search_backend() -> ISearchBackend:
+    return search_backend
+
+def setup_search_backend() -> bool:
+    """Prepare the configured backend on startup.
+
+    Returns:
+        bool: True if its index must be (re)built by a reindex job.
+    """
+    backend = get_search_backend()
+    if isinstance(backend, EmbeddedSearchBackend):
+        path = settings.SEARCH_EMBEDDED_SNAPSHOT_PATH
+        if path and backend.load_snapshot(path):
+            logger.info(f"Loaded search snapshot {path}: {backend.stats()}")
+            return False
+        return True
+    return setup_elasticsearch()
+
+def shutdown_search_backend() -> None:
+    """Persist the embedded index, if a snapshot path is configured"""
+    backend = get_search_backend()
+    path = settings.SEARCH_EMBEDDED_SNAPSHOT_PATH
+    if isinstance(backend, EmbeddedSearchBackend) and path:
+        try:
+            backend.save_snapshot(path)
+        except Exception as e:
+            logger.error(f"Failed to save search snapshot {path}: {str(e)}")
+
+def publish_search_update(documents: List[Dict[str, Any]], deleted: List[Tuple[int, int]]) -> int:
+    """Send changes of the embedded index to every worker, this one included.
+
+    Each worker holds its own embedded index. All of them apply the changes
+    in the order Redis delivers them, so they end up with the same index
+    even when two workers write the same task at once.
+
+    Args:
+        documents (List[Dict[str, Any]]): Search documents to index.
+        deleted (List[Tuple[int, int]]): (task id, owner id) of deleted tasks.
+
+    Returns:
+        int: The number of workers that received the changes.
+    """
+    message = json.dumps({"index": documents, "delete": deleted})
+    return redis_client.publish(settings.SEARCH_EMBEDDED_CHANNEL, message)
+
+def _handle_search_update_message(message: Dict[str, Any]) -> None:
+    try:
+        payload = json.loads(message["data"])
+        backend = get_search_backend()
+        backend.delete_documents([tuple(key) for key in payload.get("delete", [])])
+        backend.index_documents(payload.get("index", []))
+    except Exception as e:
+        logger.error(f"Failed to apply search index update: {str(e)}")
+
+def start_search_update_listener() -> None:
+    """Apply other workers' changes to the embedded index on a background thread"""
+    global _search_update_thread
+    if _search_update_thread is not None or get_search_backend().indexed_by_outbox:
+        return
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{settings.SEARCH_EMBEDDED_CHANNEL: _handle_search_update_message})
+    _search_update_thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+def stop_search_update_listener() -> None:
+    global _search_update_thread
+    if _search_update_thread is not None:
+        _search_update_thread.stop()
+        _search_update_thread = None
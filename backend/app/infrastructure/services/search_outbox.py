@@ -0,0 +1,247 @@
+import datetime
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from elasticsearch import helpers
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.domain.models.task import Task
+from app.domain.models.task_outbox import TaskOutbox
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.task_repository import TaskCacheMixin
+from app.infrastructure.services.elastic import es_client, get_task_write_indices
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher(TaskCacheMixin):
+    """Drain the task outbox into Elasticsearch with the _bulk API.
+
+    Each pass claims up to batch_size due rows (FOR UPDATE SKIP LOCKED, so
+    several workers can drain concurrently), collapses them per task, loads
+    the current state of those tasks and sends one bulk request: an index
+    action for tasks that exist and a delete for those that do not, for the
+    served index and for any index version being built. Rows are
+    removed once their task was applied; failed ones are retried with an
+    exponential backoff and are never dropped.
+
+    Concurrent dispatchers can claim different rows of the same task and
+    read its state at different times, so their bulk requests may arrive
+    out of order. Every action therefore carries the id of the newest row
+    it covers as an external version: the task state read after that row
+    was committed includes its change, and Elasticsearch rejects (409) any
+    write older than the one it holds instead of letting it win.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 300.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._dispatched = 0
+        self._coalesced = 0
+        self._failed = 0
+        self._last_lag_seconds = 0.0
+        self._last_run: Optional[datetime.datetime] = None
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.retry_base_delay * 2 ** (attempts - 1), self.retry_max_delay)
+
+    def _bulk_actions(
+        self, db: Session, owners: Dict[int, Optional[int]], versions: Dict[int, int]
+    ) -> List[Dict[str, Any]]:
+        index_names = get_task_write_indices()
+        if not index_names:
+            raise RuntimeError("No task index to write to")
+        tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(list(owners))).all()}
+        actions = []
+        for task_id, owner_id in owners.items():
+            task = tasks.get(task_id)
+            if task is None and owner_id is None:
+                logger.warning(f"Cannot route the delete of task {task_id}: its owner is unknown")
+                continue
+            document = self._search_document(task) if task is not None else None
+            for index_name in index_names:
+                if task is not None:
+                    actions.append({
+                        "_op_type": "index",
+                        "_index": index_name,
+                        "_id": str(task_id),
+                        "_routing": str(task.owner_id),
+                        "_source": document,
+                        "version": versions[task_id],
+                        "version_type": "external",
+                    })
+                else:
+                    actions.append({
+                        "_op_type": "delete",
+                        "_index": index_name,
+                        "_id": str(task_id),
+                        "_routing": str(owner_id),
+                        "version": versions[task_id],
+                        "version_type": "external",
+                    })
+        return actions
+
+    def _send(self, actions: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Send a bulk request and return the error of each failed task id"""
+        _, errors = helpers.bulk(
+            es_client, actions, raise_on_error=False, raise_on_exception=False
+        )
+        failed = {}
+        for error in errors:
+            op_type, result = next(iter(error.items()))
+            # Deleting a document that was never indexed is not a failure
+            if op_type == "delete" and result.get("status") == 404:
+                continue
+            # Another dispatcher already applied a newer change of the task
+            if result.get("status") == 409:
+                continue
+            failed[result.get("_id")] = str(result.get("error", result.get("status")))
+        return failed
+
+    def _claim(self, db: Session, now: datetime.datetime) -> List[TaskOutbox]:
+        """Lock up to batch_size due rows, skipping those another worker holds"""
+        return (
+            db.query(TaskOutbox)
+            .filter(TaskOutbox.available_at <= now)
+            .order_by(TaskOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def dispatch_once(self) -> int:
+        """Drain one batch of due outbox rows.
+
+        Returns:
+            int: The number of outbox rows processed.
+        """
+        db = self.session_factory()
+        try:
+            now = datetime.datetime.utcnow()
+            rows = self._claim(db, now)
+            if not rows:
+                db.commit()
+                return 0
+
+            # The latest row of a task knows its current owner and versions
+            # the state read below
+            owners = {row.task_id: row.owner_id for row in rows}
+            versions = {row.task_id: row.id for row in rows}
+            task_ids = list(owners)
+            try:
+                failed = self._send(self._bulk_actions(db, owners, versions))
+            except Exception as e:
+                failed = {str(task_id): str(e) for task_id in task_ids}
+
+            now = datetime.datetime.utcnow()
+            oldest_applied = None
+            applied_owners = set()
+            for row in rows:
+                error = failed.get(str(row.task_id))
+                if error is None:
+                    oldest_applied = min(oldest_applied or row.created_at, row.created_at)
+                    if row.owner_id is not None:
+                        applied_owners.add(row.owner_id)
+                    db.delete(row)
+                else:
+                    row.attempts += 1
+                    row.last_error = error[:1000]
+                    row.available_at = now + datetime.timedelta(seconds=self._retry_delay(row.attempts))
+            db.commit()
+
+            try:
+                # Searches cached before the index caught up would hide the change
+                self._invalidate_search_results(*sorted(applied_owners))
+            except Exception as e:
+                logger.error(f"Failed to invalidate cached searches: {str(e)}")
+
+            with self._lock:
+                self._dispatched += len(task_ids) - len(failed)
+                self._coalesced += len(rows) - len(task_ids)
+                self._failed += len(failed)
+                self._last_run = now
+                if oldest_applied is not None:
+                    self._last_lag_seconds = (now - oldest_applied).total_seconds()
+            if failed:
+                logger.warning(f"Failed to index {len(failed)} task(s) from the outbox, will retry")
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Search outbox dispatch failed: {str(e)}")
+                processed = 0
+            # Keep draining while there is a backlog
+            if processed < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="search-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Backlog size and age from the database plus this worker's counters"""
+        db = self.session_factory()
+        try:
+            pending, oldest, retrying = db.query(
+                func.count(TaskOutbox.id),
+                func.min(TaskOutbox.created_at),
+                func.count(TaskOutbox.id).filter(TaskOutbox.attempts > 0),
+            ).one()
+        finally:
+            db.close()
+        now = datetime.datetime.utcnow()
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "pending": pending,
+                "retrying": retrying,
+                "lag_seconds": (now - oldest).total_seconds() if oldest else 0.0,
+                "last_dispatch_lag_seconds": self._last_lag_seconds,
+                "dispatched": self._dispatched,
+                "coalesced": self._coalesced,
+                "failed": self._failed,
+                "last_run": self._last_run.isoformat() if self._last_run else None,
+            }
+
+
+outbox_dispatcher = OutboxDispatcher(
+    SessionLocal,
+    batch_size=settings.SEARCH_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.SEARCH_OUTBOX_POLL_INTERVAL,
+    retry_base_delay=settings.SEARCH_OUTBOX_RETRY_BASE_DELAY,
+    retry_max_delay=settings.SEARCH_OUTBOX_RETRY_MAX_DELAY,
+)
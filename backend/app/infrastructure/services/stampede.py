@@ -0,0 +1,109 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Cache entries written through read_through carry the time it took to
+# recompute them and their expiry so readers can refresh them early (XFetch)
+ENTRY_PREFIX = "xf1|"
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight for the async request path.
+
+    The function runs in a task of its own that every caller, the first one
+    included, awaits through a shield: a caller that is cancelled (say, its
+    client went away) stops waiting without cancelling the load the others
+    are waiting for.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, "asyncio.Task[Any]"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = asyncio.ensure_future(fn())
+            call.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(call)
+
+    def _finish(self, key: str, call: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved when every caller was cancelled
+        if not call.cancelled():
+            call.exception()
+
+
+def pack_cache_entry(payload: str, delta: float, ttl: float) -> str:
+    """Wrap a payload with its recompute time and absolute expiry"""
+    return f"{ENTRY_PREFIX}{delta:.6f}|{time.time() + ttl:.3f}|{payload}"
+
+
+def unpack_cache_entry(raw: str) -> Tuple[str, float, float]:
+    """Split a cache entry into (payload, delta, expiry).
+
+    Entries written before the envelope existed are returned as-is and are
+    never refreshed early.
+    """
+    if not raw.startswith(ENTRY_PREFIX):
+        return raw, 0.0, math.inf
+    delta, expiry, payload = raw[len(ENTRY_PREFIX):].split("|", 2)
+    return payload, float(delta), float(expiry)
+
+
+def should_refresh_early(delta: float, expiry: float, beta: float = 1.0) -> bool:
+    """Probabilistic early expiration (XFetch).
+
+    Returns True with a probability that grows as expiry approaches and with
+    the cost of recomputing the value, so that one caller refreshes a hot key
+    shortly before it expires instead of every caller missing at once.
+    """
+    if delta <= 0 or math.isinf(expiry):
+        return False
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expiry
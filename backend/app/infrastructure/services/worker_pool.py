@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+class WorkerPoolFull(Exception):
+    """Raised when a BoundedWorkerPool already has as much work as it may queue"""
+
+class BoundedWorkerPool:
+    """Thread pool for CPU-bound calls that rejects work instead of queueing it without limit.
+
+    At most `workers` calls run at once and at most `max_pending` more wait
+    for a worker; anything beyond that fails fast with WorkerPoolFull, so a
+    burst of requests is shed rather than piling up behind the pool.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.capacity = workers + max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Calls running or waiting for a worker"""
+        return self._in_flight
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """Schedule fn(*args) on the pool.
+
+        Raises:
+            WorkerPoolFull: If the pool and its queue are full.
+
+        Returns:
+            Future: The result of the call.
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise WorkerPoolFull(f"{self.name}: {self._in_flight} calls in flight")
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Call fn(*args) on the pool and wait for it from a synchronous caller"""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        """Call fn(*args) on the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
@@ -1,22 +1,63 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import logging
 
 from app.presentation.api import api_router
+from app.presentation.dependencies import reindex_service
 from app.config import settings
-from app.infrastructure.services.elastic import setup_elasticsearch, es_client
-from app.infrastructure.services.redis import redis_client
+from app.infrastructure.services.elastic import es_client
+from app.infrastructure.services.elastic_async import close_async_elasticsearch
+from app.infrastructure.services.search_outbox import outbox_dispatcher
+from app.infrastructure.services.search_backend import (
+    get_search_backend, setup_search_backend, shutdown_search_backend,
+    start_search_update_listener, stop_search_update_listener
+)
+from app.infrastructure.services.redis import (
+    redis_client, start_cache_invalidation_listener, stop_cache_invalidation_listener
+)
+from app.infrastructure.services.redis_async import close_async_redis
 from app.infrastructure.db.session import engine, SessionLocal
+from app.infrastructure.db.async_session import async_engine
 from app.domain.models import user, task
 
+logger = logging.getLogger(__name__)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize services on startup"""
     user.Base.metadata.create_all(bind=engine)
     task.Base.metadata.create_all(bind=engine)
-    
-    setup_elasticsearch()
+
+    # Subscribed before the rebuild, which replays the changes it receives meanwhile
+    try:
+        start_search_update_listener()
+    except Exception as e:
+        logger.error(f"Failed to subscribe to search index updates, workers' results may differ: {str(e)}")
+
+    if setup_search_backend():
+        # Fresh task index: fill it in the background, unless another worker already is
+        try:
+            reindex_service.start_job()
+        except HTTPException as e:
+            logger.info(f"Search index rebuild not started: {e.detail}")
+        except Exception as e:
+            logger.error(f"Failed to start the search index rebuild: {str(e)}")
+
+    try:
+        start_cache_invalidation_listener()
+    except Exception as e:
+        logger.error(f"Failed to subscribe to cache invalidations: {str(e)}")
+    if settings.SEARCH_OUTBOX_DISPATCHER_ENABLED and get_search_backend().indexed_by_outbox:
+        outbox_dispatcher.start()
     yield
+    outbox_dispatcher.stop()
+    stop_search_update_listener()
+    shutdown_search_backend()
+    stop_cache_invalidation_listener()
+    await close_async_redis()
+    await close_async_elasticsearch()
+    await async_engine.dispose()
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
@@ -26,6 +67,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 
-from app.presentation.routers import auth, tasks
+from app.config import settings
+from app.presentation.routers import admin, auth, tasks, tasks_async
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"]) 
\ No newline at end of file
+api_router.include_router(
+    tasks_async.router if settings.ASYNC_TASKS_API else tasks.router, prefix="/tasks", tags=["tasks"]
+)
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -1,24 +1,47 @@
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.db.async_session import AsyncSessionLocal
 from app.domain.models.user import User
 from app.application.schemas.token import TokenData
 from app import security
-from app.config import settings
-from app.domain.repositories.user_repository import IUserRepository
+from app.domain.repositories.user_repository import IAsyncUserRepository, IUserRepository
 from app.infrastructure.repositories.user_repository import UserRepository
-from app.domain.repositories.task_repository import ITaskRepository
+from app.infrastructure.repositories.async_user_repository import AsyncUserRepository
+from app.domain.repositories.task_repository import IAsyncTaskRepository, ITaskRepository
 from app.infrastructure.repositories.task_repository import TaskRepository
+from app.infrastructure.repositories.async_task_repository import AsyncTaskRepository
 from app.application.services.auth_service import AuthService
+from app.application.services.user_service import UserService
 from app.application.services.task_service import TaskService
+from app.application.services.async_task_service import AsyncTaskService
+from app.application.services.reindex_service import ReindexService
+from app.infrastructure.services.redis import DistributedLock, RedisJobStore
+from app.infrastructure.services.search_backend import get_search_backend
+from app.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# Reindex jobs outlive the request that starts them. The shared index is
+# rebuilt by one worker at a time and its job can be polled on any worker;
+# an embedded index belongs to its worker, which rebuilds it on its own
+_shared_search_index = get_search_backend().indexed_by_outbox
+reindex_service = ReindexService(
+    SessionLocal,
+    TaskRepository,
+    job_lock=(
+        DistributedLock("lock:search:reindex", settings.REINDEX_LOCK_TTL)
+        if _shared_search_index else None
+    ),
+    job_store=RedisJobStore("search:reindex:job", settings.REINDEX_JOB_TTL) if _shared_search_index else None,
+)
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
@@ -26,42 +49,83 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def get_user_repository(db: Session = Depends(get_db)) -> IUserRepository:
     return UserRepository(db)
 
 def get_task_repository(db: Session = Depends(get_db)) -> ITaskRepository:
     return TaskRepository(db)
 
+def get_async_user_repository(db: AsyncSession = Depends(get_async_db)) -> IAsyncUserRepository:
+    return AsyncUserRepository(db)
+
+def get_async_task_repository(db: AsyncSession = Depends(get_async_db)) -> IAsyncTaskRepository:
+    return AsyncTaskRepository(db)
+
 def get_auth_service(
     user_repo: IUserRepository = Depends(get_user_repository),
 ) -> AuthService:
     return AuthService(user_repo)
 
+def get_user_service(
+    user_repo: IUserRepository = Depends(get_user_repository),
+) -> UserService:
+    return UserService(user_repo)
+
 def get_task_service(
     task_repo: ITaskRepository = Depends(get_task_repository),
 ) -> TaskService:
     return TaskService(task_repo)
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+def get_async_task_service(
+    task_repo: IAsyncTaskRepository = Depends(get_async_task_repository),
+) -> AsyncTaskService:
+    return AsyncTaskService(task_repo)
+
+def get_reindex_service() -> ReindexService:
+    return reindex_service
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token_username(token: str) -> str:
+    credentials_exception = _credentials_exception()
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+        payload = security.decode_access_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
+    return token_data.username
+
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    username = _decode_token_username(token)
     user_repo = get_user_repository(db)
-    user = user_repo.get_user_by_username(username=token_data.username)
+    # Served from the principal cache: a cached read needs no database query
+    user = user_repo.get_principal(username=username)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    username = _decode_token_username(token)
+    user_repo = get_async_user_repository(db)
+    user = await user_repo.get_principal(username=username)
+    if user is None:
+        raise _credentials_exception()
     return user
 
 def get_current_active_user(
@@ -71,6 +135,13 @@ def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async),
+) -> User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
 def is_admin(
     current_user: User = Depends(get_current_active_user),
 ) -> User:
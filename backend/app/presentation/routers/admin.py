@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.domain.models.user import User
+from app.presentation.dependencies import get_task_service, get_user_service, is_admin
+from app.application.services.task_service import TaskService
+from app.application.services.user_service import UserService
+from app.application.schemas.user import UserAccessUpdate
+from app.infrastructure.services.redis import get_cache_stats, get_hot_keys, cache_metrics
+from app.infrastructure.services.search_outbox import outbox_dispatcher
+
+router = APIRouter()
+
+@router.get("/cache/stats", response_model=dict)
+def read_cache_stats(
+    current_user: User = Depends(is_admin),
+):
+    """
+    Cache statistics of this worker: L1/L2 hit ratios and, per key type,
+    hits, misses, sets, invalidations, payload bytes and latency histograms.
+    """
+    return get_cache_stats()
+
+@router.get("/cache/hot-keys", response_model=list)
+def read_hot_keys(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(is_admin),
+):
+    """
+    Estimated most accessed cache keys of this worker, from sampled lookups.
+    """
+    return get_hot_keys(limit)
+
+@router.delete("/cache/stats", response_model=dict)
+def reset_cache_stats(
+    current_user: User = Depends(is_admin),
+):
+    """
+    Reset the cache counters and hot key tracker of this worker.
+    """
+    cache_metrics.reset()
+    return {"message": "Cache statistics reset"}
+
+@router.get("/search/outbox", response_model=dict)
+def read_search_outbox_stats(
+    current_user: User = Depends(is_admin),
+):
+    """
+    Search index outbox backlog: pending and retrying rows, the age of the
+    oldest pending change (index lag) and this worker's dispatch counters.
+    """
+    return outbox_dispatcher.stats()
+
+@router.post("/tasks/counters/repair", response_model=dict)
+def repair_task_counters(
+    current_user: User = Depends(is_admin),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    Recompute every user's task counters (X-Total-Count, /tasks/summary)
+    from the tasks table in one bulk statement.
+    """
+    return {"users": task_service.repair_task_counters()}
+
+@router.patch("/users/{user_id}", response_model=dict)
+def update_user_access(
+    user_id: int,
+    access: UserAccessUpdate,
+    current_user: User = Depends(is_admin),
+    user_service: UserService = Depends(get_user_service),
+):
+    """
+    Activate or deactivate a user, or change its role. Takes effect on the
+    user's next request: its cached principal is invalidated on every worker.
+    """
+    user = user_service.update_user_access(user_id, access)
+    return {"id": user.id, "username": user.username, "is_active": user.is_active, "role": user.role}
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
 
-from app.application.schemas.task import Task, TaskCreate, TaskUpdate
+from app.application.schemas.task import Task, TaskCreate, TaskStats, TaskSuggestion, TaskSummary, TaskUpdate
 from app.domain.models.user import User
-from app.presentation.dependencies import get_current_active_user, get_task_service, is_admin
+from app.presentation.dependencies import (
+    get_current_active_user, get_reindex_service, get_task_service, is_admin
+)
+from app.application.services.reindex_service import ReindexService
 from app.application.services.task_service import TaskService
+from app.config import settings
 
 router = APIRouter()
 
@@ -20,13 +24,25 @@ def convert_task_list(tasks):
 
 @router.get("/", response_model=List[Task])
 def read_tasks(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.TASKS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     task_service: TaskService = Depends(get_task_service),
 ):
-    tasks = task_service.get_tasks(owner_id=current_user.id, skip=skip, limit=limit)
-    return convert_task_list(tasks)
+    """
+    List the current user's tasks ordered by due date.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one.
+    X-Total-Count holds the number of tasks of the user.
+    The body is served as pre-rendered JSON straight from the cache.
+    """
+    body, next_cursor, total = task_service.get_tasks_json(
+        owner_id=current_user.id, skip=skip, limit=limit, cursor=cursor
+    )
+    headers = {"X-Total-Count": str(total)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.post("/", response_model=Task)
 def create_task(
@@ -40,23 +56,101 @@ def create_task(
 @router.get("/search/", response_model=List[Task])
 def search_tasks_endpoint(
     query: str,
+    response: Response,
+    sort: str = Query("due_date", pattern="^(due_date|priority|relevance)$"),
+    limit: int = Query(settings.SEARCH_PAGE_SIZE, ge=1, le=settings.TASKS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    Search the current user's tasks, ordered by due date, priority or relevance.
+    Pass the X-Next-Cursor header of a page as `cursor`, with the same `sort`, to fetch the next one.
+    """
+    tasks, next_cursor = task_service.search_tasks_page(
+        query=query, owner_id=current_user.id, sort=sort, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return convert_task_list(tasks)
+
+@router.get("/suggest", response_model=List[TaskSuggestion])
+def suggest_tasks(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(settings.SUGGEST_SIZE, ge=1, le=settings.SUGGEST_MAX_SIZE),
+    current_user: User = Depends(get_current_active_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    Typeahead over the current user's task titles: the ids and titles of a few
+    tasks matching what has been typed so far.
+    """
+    body = task_service.suggest_tasks_json(prefix=prefix, owner_id=current_user.id, limit=limit)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/summary", response_model=TaskSummary)
+def read_task_summary(
+    current_user: User = Depends(get_current_active_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    The current user's task counts (total, completed, open and by priority),
+    read from counters kept up to date by every write rather than counted.
+    """
+    body = task_service.get_task_summary_json(owner_id=current_user.id)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/stats", response_model=TaskStats)
+def read_task_stats(
+    current_user: User = Depends(get_current_active_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """
+    Count the current user's tasks: completed and open, by priority, and open
+    tasks by due date (overdue, today, next 7 days, later).
+    """
+    body = task_service.get_task_stats_json(owner_id=current_user.id)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/batch", response_model=List[Task])
+def read_tasks_batch(
+    ids: List[str] = Query(...),
     current_user: User = Depends(get_current_active_user),
     task_service: TaskService = Depends(get_task_service),
 ):
-    tasks = task_service.search_tasks(query=query, owner_id=current_user.id)
+    """
+    Get several tasks at once, e.g. `?ids=1,2,3` or `?ids=1&ids=2`.
+    Ids that do not exist or belong to another user are left out.
+    """
+    try:
+        task_ids = [int(part) for value in ids for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be integers")
+    tasks = task_service.get_tasks_by_ids(task_ids=task_ids, owner_id=current_user.id)
     return convert_task_list(tasks)
 
-@router.get("/reindex", response_model=dict)
+@router.post("/reindex", response_model=dict, status_code=202)
 def reindex_tasks(
     current_user: User = Depends(is_admin),  # Only admins can reindex
-    task_service: TaskService = Depends(get_task_service),
+    reindex_service: ReindexService = Depends(get_reindex_service),
 ):
     """
     Reindex all tasks in Elasticsearch.
     This endpoint is admin-only and can be used to rebuild the search index.
+    The reindex runs in the background; poll /tasks/reindex/{job_id} for its progress.
     """
-    count = task_service.reindex_all_tasks()
-    return {"message": f"Successfully reindexed {count} tasks"}
+    return reindex_service.start_job()
+
+@router.get("/reindex/{job_id}", response_model=dict)
+def read_reindex_job(
+    job_id: str,
+    current_user: User = Depends(is_admin),
+    reindex_service: ReindexService = Depends(get_reindex_service),
+):
+    """
+    Status and progress of a reindex job.
+    """
+    return reindex_service.get_job(job_id)
 
 @router.get("/{task_id}", response_model=Task)
 def read_task(
@@ -64,8 +158,8 @@ def read_task(
     current_user: User = Depends(get_current_active_user),
     task_service: TaskService = Depends(get_task_service),
 ):
-    db_task = task_service.get_task(task_id=task_id, owner_id=current_user.id)
-    return convert_enum_to_string(db_task)
+    body = task_service.get_task_json(task_id=task_id, owner_id=current_user.id)
+    return Response(content=body, media_type="application/json")
 
 @router.put("/{task_id}", response_model=Task)
 def update_task_endpoint(
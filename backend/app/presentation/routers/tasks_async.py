@@ -0,0 +1,175 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
+
+from app.application.schemas.task import Task, TaskCreate, TaskStats, TaskSuggestion, TaskSummary, TaskUpdate
+from app.domain.models.user import User
+from app.presentation.dependencies import (
+    get_current_active_user_async, get_async_task_service, get_reindex_service, is_admin
+)
+from app.presentation.routers.tasks import convert_enum_to_string, convert_task_list
+from app.application.services.async_task_service import AsyncTaskService
+from app.application.services.reindex_service import ReindexService
+from app.config import settings
+
+# Same routes as app.presentation.routers.tasks served on the event loop, so
+# in-flight requests are not bounded by the threadpool size. Selected with
+# the ASYNC_TASKS_API setting.
+router = APIRouter()
+
+@router.get("/", response_model=List[Task])
+async def read_tasks(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.TASKS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    """
+    List the current user's tasks ordered by due date.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one.
+    X-Total-Count holds the number of tasks of the user.
+    The body is served as pre-rendered JSON straight from the cache.
+    """
+    body, next_cursor, total = await task_service.get_tasks_json(
+        owner_id=current_user.id, skip=skip, limit=limit, cursor=cursor
+    )
+    headers = {"X-Total-Count": str(total)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.post("/", response_model=Task)
+async def create_task(
+    task: TaskCreate,
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    db_task = await task_service.create_task(task=task, owner_id=current_user.id)
+    return convert_enum_to_string(db_task)
+
+@router.get("/search/", response_model=List[Task])
+async def search_tasks_endpoint(
+    query: str,
+    response: Response,
+    sort: str = Query("due_date", pattern="^(due_date|priority|relevance)$"),
+    limit: int = Query(settings.SEARCH_PAGE_SIZE, ge=1, le=settings.TASKS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    """
+    Search the current user's tasks, ordered by due date, priority or relevance.
+    Pass the X-Next-Cursor header of a page as `cursor`, with the same `sort`, to fetch the next one.
+    """
+    tasks, next_cursor = await task_service.search_tasks_page(
+        query=query, owner_id=current_user.id, sort=sort, limit=limit, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return convert_task_list(tasks)
+
+@router.get("/suggest", response_model=List[TaskSuggestion])
+async def suggest_tasks(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(settings.SUGGEST_SIZE, ge=1, le=settings.SUGGEST_MAX_SIZE),
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    """
+    Typeahead over the current user's task titles: the ids and titles of a few
+    tasks matching what has been typed so far.
+    """
+    body = await task_service.suggest_tasks_json(prefix=prefix, owner_id=current_user.id, limit=limit)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/summary", response_model=TaskSummary)
+async def read_task_summary(
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    """
+    The current user's task counts (total, completed, open and by priority),
+    read from counters kept up to date by every write rather than counted.
+    """
+    body = await task_service.get_task_summary_json(owner_id=current_user.id)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/stats", response_model=TaskStats)
+async def read_task_stats(
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    """
+    Count the current user's tasks: completed and open, by priority, and open
+    tasks by due date (overdue, today, next 7 days, later).
+    """
+    body = await task_service.get_task_stats_json(owner_id=current_user.id)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/batch", response_model=List[Task])
+async def read_tasks_batch(
+    ids: List[str] = Query(...),
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    """
+    Get several tasks at once, e.g. `?ids=1,2,3` or `?ids=1&ids=2`.
+    Ids that do not exist or belong to another user are left out.
+    """
+    try:
+        task_ids = [int(part) for value in ids for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be integers")
+    tasks = await task_service.get_tasks_by_ids(task_ids=task_ids, owner_id=current_user.id)
+    return convert_task_list(tasks)
+
+@router.post("/reindex", response_model=dict, status_code=202)
+def reindex_tasks(
+    current_user: User = Depends(is_admin),  # Only admins can reindex
+    reindex_service: ReindexService = Depends(get_reindex_service),
+):
+    """
+    Reindex all tasks in Elasticsearch.
+    This endpoint is admin-only and can be used to rebuild the search index.
+    The reindex runs in the background; poll /tasks/reindex/{job_id} for its progress.
+    """
+    return reindex_service.start_job()
+
+@router.get("/reindex/{job_id}", response_model=dict)
+def read_reindex_job(
+    job_id: str,
+    current_user: User = Depends(is_admin),
+    reindex_service: ReindexService = Depends(get_reindex_service),
+):
+    """
+    Status and progress of a reindex job.
+    """
+    return reindex_service.get_job(job_id)
+
+@router.get("/{task_id}", response_model=Task)
+async def read_task(
+    task_id: int,
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    body = await task_service.get_task_json(task_id=task_id, owner_id=current_user.id)
+    return Response(content=body, media_type="application/json")
+
+@router.put("/{task_id}", response_model=Task)
+async def update_task_endpoint(
+    task_id: int,
+    task: TaskUpdate,
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    db_task = await task_service.update_task(task_id=task_id, task=task, owner_id=current_user.id)
+    return convert_enum_to_string(db_task)
+
+@router.delete("/{task_id}", response_model=Task)
+async def delete_task_endpoint(
+    task_id: int,
+    current_user: User = Depends(get_current_active_user_async),
+    task_service: AsyncTaskService = Depends(get_async_task_service),
+):
+    db_task = await task_service.delete_task(task_id=task_id, owner_id=current_user.id)
+    return convert_enum_to_string(db_task)
@@ -1,15 +1,46 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union, Optional
+from typing import Any, Dict, Union, Optional, Tuple
+import hashlib
+import time
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.infrastructure.services.local_cache import LocalCache
+from app.infrastructure.services.worker_pool import BoundedWorkerPool
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def create_password_context(schemes: list, bcrypt_rounds: int) -> CryptContext:
+    """Hash with the first scheme; everything else, including bcrypt hashes of
+    another cost, verifies but is reported as needing an update.
+    """
+    options = {}
+    if "bcrypt" in schemes:
+        options = {
+            "bcrypt__default_rounds": bcrypt_rounds,
+            "bcrypt__min_rounds": bcrypt_rounds,
+            "bcrypt__max_rounds": bcrypt_rounds,
+        }
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+pwd_context = create_password_context(settings.PASSWORD_HASH_SCHEMES, settings.BCRYPT_ROUNDS)
+
+# Hashing and verifying passwords takes hundreds of milliseconds of CPU by
+# design, so it never runs on the event loop or in unbounded numbers
+password_hashing_pool = BoundedWorkerPool(
+    "password-hash", settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING
+)
 
 ALGORITHM = "HS256"
 
+# Claims of verified tokens by SHA-256 digest, so the signature of a token
+# is only checked on its first request in this process. Entries expire with
+# their token; tokens that fail verification are never stored.
+_verified_tokens = LocalCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    default_ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
@@ -23,8 +54,55 @@ def create_access_token(
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verify an access token and return its claims, memoized until it expires.
+
+    Args:
+        token (str): The encoded JWT.
+
+    Raises:
+        JWTError: If the token is malformed, forged or expired.
+
+    Returns:
+        Dict[str, Any]: The claims of the token.
+    """
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    claims = _verified_tokens.get(digest)
+    if claims is not None and claims["exp"] > time.time():
+        return claims
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    if isinstance(claims.get("exp"), (int, float)):
+        _verified_tokens.set(digest, claims, claims["exp"] - time.time())
+    return claims
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return password_hashing_pool.run(pwd_context.hash, password)
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the hashing pool, without blocking the event loop.
+
+    Args:
+        plain_password (str): The password to check.
+        hashed_password (Optional[str]): The stored hash, or None for an unknown
+            user, in which case a dummy hash is checked so that the response
+            takes as long as for a known one.
+
+    Raises:
+        WorkerPoolFull: If too many passwords are already being checked.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches and, if it
+            does but its hash uses an outdated scheme or cost, a new hash to
+            store in its place.
+    """
+    if hashed_password is None:
+        await password_hashing_pool.run_async(pwd_context.dummy_verify)
+        return False, None
+    return await password_hashing_pool.run_async(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
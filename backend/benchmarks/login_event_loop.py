@@ -0,0 +1,109 @@
+"""Measure event-loop latency while concurrent logins check passwords.
+
+A probe coroutine asks to wake up every few milliseconds and records how
+late it actually runs, which is how long any other request on the same
+worker would have waited. Logins check their password either inline on the
+event loop, as the login endpoint used to, or on the password hashing pool.
+
+Run from the backend directory:
+
+    python -m benchmarks.login_event_loop --logins 50 --concurrency 10 --rounds 12
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from app import security
+from app.infrastructure.services.worker_pool import BoundedWorkerPool, WorkerPoolFull
+
+PROBE_INTERVAL = 0.005
+
+
+async def probe(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def run_logins(
+    login: Callable[[], Awaitable[object]], logins: int, concurrency: int
+) -> Dict[str, float]:
+    lags: List[float] = []
+    latencies: List[float] = []
+    rejected = 0
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, lags))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        nonlocal rejected
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await login()
+            except WorkerPoolFull:
+                rejected += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    lags.sort()
+    latencies.sort()
+    return {
+        "logins/s": len(latencies) / elapsed,
+        "rejected": rejected,
+        "login p50 ms": statistics.median(latencies) if latencies else 0.0,
+        "loop lag p50 ms": statistics.median(lags) if lags else 0.0,
+        "loop lag p99 ms": lags[int(len(lags) * 0.99) - 1] if lags else 0.0,
+        "loop lag max ms": lags[-1] if lags else 0.0,
+    }
+
+
+def print_report(name: str, report: Dict[str, float]) -> None:
+    print(f"{name}:")
+    for label, value in report.items():
+        print(f"  {label:<16} {value:9.2f}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    context = security.create_password_context(["bcrypt"], args.rounds)
+    hashed_password = context.hash("password")
+
+    async def inline_login():
+        return context.verify("password", hashed_password)
+
+    pool = BoundedWorkerPool("password-hash", args.workers, args.max_pending)
+
+    async def pooled_login():
+        return await pool.run_async(context.verify_and_update, "password", hashed_password)
+
+    print(f"bcrypt cost {args.rounds}, {args.logins} logins, {args.concurrency} at a time")
+    print_report("inline", await run_logins(inline_login, args.logins, args.concurrency))
+    print_report(
+        f"pool ({args.workers} workers, {args.max_pending} pending)",
+        await run_logins(pooled_login, args.logins, args.concurrency),
+    )
+
+
+def main() -> None:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=settings.PASSWORD_HASH_MAX_PENDING)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
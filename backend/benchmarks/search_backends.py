@@ -0,0 +1,162 @@
+"""Compare search latency of the embedded backend and Elasticsearch.
+
+Indexes generated tasks for a few owners into each backend, then times a
+mix of queries like the ones the UI sends: exact words, several words,
+typos and typeahead prefixes. Elasticsearch is skipped if it is not
+reachable at ELASTICSEARCH_URL.
+
+Descriptions also draw on --vocabulary generated words, since the cost of a
+typo query grows with the number of distinct words an owner has written.
+
+Run from the backend directory:
+
+    python -m benchmarks.search_backends --owners 10 --tasks 5000 --queries 2000 --vocabulary 50000
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from app.infrastructure.services.embedded_search import EmbeddedSearchBackend
+
+WORDS = [
+    "buy", "milk", "call", "bank", "water", "plants", "report", "quarterly", "review", "invoice",
+    "meeting", "dentist", "groceries", "deploy", "release", "fix", "bug", "email", "client", "budget",
+    "book", "flight", "hotel", "renew", "passport", "clean", "garage", "pay", "rent", "schedule",
+]
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+
+
+def generate_vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Word-like strings standing in for names, codes and other rare words"""
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        for _ in range(size)
+    ]
+
+
+def generate_documents(owners: int, tasks: int, vocabulary: List[str], rng: random.Random) -> List[Dict]:
+    documents = []
+    start = datetime(2030, 1, 1)
+    for task_id in range(1, owners * tasks + 1):
+        priority = rng.choice(list(PRIORITIES))
+        documents.append({
+            "id": task_id,
+            "title": " ".join(rng.sample(WORDS, rng.randint(2, 5))).capitalize(),
+            "description": " ".join(
+                rng.choices(WORDS, k=rng.randint(0, 20)) + rng.sample(vocabulary, min(len(vocabulary), 5))
+            ) or None,
+            "completed": False,
+            "created_at": start.isoformat(),
+            "due_date": (start + timedelta(days=rng.randint(0, 365))).isoformat(),
+            "priority": priority,
+            "priority_rank": PRIORITIES[priority],
+            "owner_id": task_id % owners + 1,
+        })
+    return documents
+
+
+def typo(word: str, rng: random.Random) -> str:
+    position = rng.randrange(len(word) - 1)
+    return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+
+def generate_queries(count: int, rng: random.Random) -> List[tuple]:
+    """Return (kind, text) pairs in a typical mix"""
+    queries = []
+    for _ in range(count):
+        kind = rng.choices(["exact", "multi", "typo", "prefix"], weights=[40, 25, 15, 20])[0]
+        if kind == "exact":
+            text = rng.choice(WORDS)
+        elif kind == "multi":
+            text = " ".join(rng.sample(WORDS, 2))
+        elif kind == "typo":
+            text = typo(rng.choice([word for word in WORDS if len(word) > 4]), rng)
+        else:
+            word = rng.choice(WORDS)
+            text = word[:rng.randint(1, len(word))]
+        queries.append((kind, text))
+    return queries
+
+
+def measure(run: Callable[[int, str, str], object], owners: int, queries: List[tuple], rng: random.Random) -> Dict:
+    latencies: Dict[str, List[float]] = {}
+    started = time.perf_counter()
+    for kind, text in queries:
+        query_started = time.perf_counter()
+        run(rng.randint(1, owners), kind, text)
+        latencies.setdefault(kind, []).append((time.perf_counter() - query_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    report = {"qps": len(queries) / elapsed}
+    for kind, values in sorted(latencies.items()):
+        values.sort()
+        report[kind] = (statistics.median(values), values[int(len(values) * 0.95) - 1])
+    return report
+
+
+def print_report(name: str, report: Dict) -> None:
+    print(f"{name}: {report.pop('qps'):.0f} queries/s")
+    for kind, (p50, p95) in report.items():
+        print(f"  {kind:<7} p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+
+
+def run_backend(name: str, backend, documents: List[Dict], owners: int, queries: List[tuple], seed: int) -> None:
+    started = time.perf_counter()
+    count = backend.rebuild(iter(documents))
+    print(f"{name}: indexed {count} tasks in {time.perf_counter() - started:.1f} s")
+
+    def run(owner_id: int, kind: str, text: str):
+        if kind == "prefix":
+            return backend.suggest(owner_id, text, size=5)
+        return backend.search(owner_id, text, sort="relevance", size=20)
+
+    print_report(name, measure(run, owners, queries, random.Random(seed)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--owners", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=5000, help="tasks per owner")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--vocabulary", type=int, default=50000, help="generated words used in descriptions")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = generate_vocabulary(args.vocabulary, rng)
+    documents = generate_documents(args.owners, args.tasks, vocabulary, rng)
+    queries = generate_queries(args.queries, rng)
+
+    run_backend("embedded", EmbeddedSearchBackend(), documents, args.owners, queries, args.seed)
+
+    from app.infrastructure.services.elastic import es_client, setup_elasticsearch
+    try:
+        reachable = es_client.ping()
+    except Exception:
+        reachable = False
+    if not reachable:
+        print("elasticsearch: not reachable, skipped")
+        return
+
+    from app.infrastructure.services.elastic import TASK_INDEX
+    from app.infrastructure.services.search_backend import ElasticsearchSearchBackend
+
+    setup_elasticsearch()
+    backend = ElasticsearchSearchBackend()
+    original_rebuild = backend.rebuild
+
+    def rebuild(documents):
+        count = original_rebuild(documents)
+        es_client.indices.refresh(index=TASK_INDEX)
+        return count
+
+    backend.rebuild = rebuild
+    run_backend("elasticsearch", backend, documents, args.owners, queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from typing import Generator
+from unittest.mock import patch
 
 from app.infrastructure.db.session import Base
 from app.presentation.dependencies import get_db
@@ -88,4 +89,72 @@ def token_headers(client, test_user):
     }
     response = client.post("/api/v1/auth/token", data=login_data)
     token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"} 
\ No newline at end of file
+    return {"Authorization": f"Bearer {token}"} 
+
+@pytest.fixture(scope="function")
+def fake_redis():
+    """
+    Replace the task repository's Redis helpers with an in-memory dict.
+    """
+    store = {}
+
+    def get_cache(key):
+        return store.get(key)
+
+    def set_cache(key, value, expiry=3600, tags=()):
+        store[key] = value
+        for tag in tags:
+            store.setdefault(f"tag:{tag}", set()).add(key)
+        return True
+
+    def get_many_cache(keys):
+        return [store.get(key) for key in keys]
+
+    def set_many_cache(mapping, expiry=3600):
+        store.update(mapping)
+        return [True] * len(mapping)
+
+    def delete_cache(key):
+        return 1 if store.pop(key, None) is not None else 0
+
+    def invalidate_tag(tag):
+        keys = store.pop(f"tag:{tag}", set())
+        for key in keys:
+            store.pop(key, None)
+        return len(keys)
+
+    def get_cache_version(key):
+        return int(store.get(key, 0))
+
+    def bump_cache_versions(*keys):
+        for key in keys:
+            store[key] = int(store.get(key, 0)) + 1
+        return [store[key] for key in keys]
+
+    module = "app.infrastructure.repositories.task_repository"
+    with patch(f"{module}.get_cache", side_effect=get_cache), \
+         patch(f"{module}.set_cache", side_effect=set_cache), \
+         patch(f"{module}.get_many_cache", side_effect=get_many_cache), \
+         patch(f"{module}.set_many_cache", side_effect=set_many_cache), \
+         patch(f"{module}.delete_cache", side_effect=delete_cache), \
+         patch(f"{module}.get_cache_version", side_effect=get_cache_version), \
+         patch(f"{module}.bump_cache_versions", side_effect=bump_cache_versions), \
+         patch(f"{module}.publish_cache_invalidation"), \
+         patch(f"{module}.publish_search_update"), \
+         patch(f"{module}.invalidate_tag", side_effect=invalidate_tag), \
+         patch(f"{module}.acquire_lock", return_value="token"), \
+         patch(f"{module}.release_lock"):
+        yield store
+
+@pytest.fixture(scope="function")
+def owner(db):
+    """
+    Create a task owner directly in the database.
+    """
+    from app.domain.models.user import User
+
+    user = User(email="owner@example.com", username="owner", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
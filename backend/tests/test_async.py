@@ -0,0 +1,319 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.application.schemas.task import TaskCreate, TaskUpdate
+from app.application.services.async_task_service import AsyncTaskService
+from app.domain.models.user import User
+from app.infrastructure.db.async_session import get_async_database_uri
+from app.infrastructure.db.session import Base
+from app.infrastructure.repositories.async_task_repository import AsyncTaskRepository
+from app.infrastructure.repositories.async_user_repository import AsyncUserRepository
+from app.infrastructure.services.stampede import AsyncSingleFlight
+
+
+@pytest_asyncio.fixture
+async def async_db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)()
+    try:
+        yield session
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_owner(async_db):
+    user = User(email="owner@example.com", username="owner", hashed_password="x")
+    async_db.add(user)
+    await async_db.commit()
+    return user
+
+
+@pytest.fixture
+def fake_async_redis():
+    """
+    Replace the async task repository's Redis helpers with an in-memory dict.
+    """
+    store = {}
+
+    def set_cache(key, value, expiry=3600, tags=()):
+        store[key] = value
+        for tag in tags:
+            store.setdefault(f"tag:{tag}", set()).add(key)
+        return True
+
+    def set_many_cache(mapping, expiry=3600):
+        store.update(mapping)
+        return [True] * len(mapping)
+
+    def invalidate_tag(tag):
+        keys = store.pop(f"tag:{tag}", set())
+        for key in keys:
+            store.pop(key, None)
+        return len(keys)
+
+    def bump_cache_versions(*keys):
+        for key in keys:
+            store[key] = int(store.get(key, 0)) + 1
+        return [store[key] for key in keys]
+
+    module = "app.infrastructure.repositories.async_task_repository"
+    with patch(f"{module}.get_cache", AsyncMock(side_effect=store.get)), \
+         patch(f"{module}.set_cache", AsyncMock(side_effect=set_cache)), \
+         patch(f"{module}.get_many_cache", AsyncMock(side_effect=lambda keys: [store.get(k) for k in keys])), \
+         patch(f"{module}.set_many_cache", AsyncMock(side_effect=set_many_cache)), \
+         patch(f"{module}.delete_cache", AsyncMock(side_effect=lambda key: store.pop(key, None))), \
+         patch(f"{module}.get_cache_version", AsyncMock(side_effect=lambda key: int(store.get(key, 0)))), \
+         patch(f"{module}.bump_cache_versions", AsyncMock(side_effect=bump_cache_versions)), \
+         patch(f"{module}.invalidate_tag", AsyncMock(side_effect=invalidate_tag)), \
+         patch(f"{module}.publish_cache_invalidation", AsyncMock()), \
+         patch(f"{module}.acquire_lock", AsyncMock(return_value="token")), \
+         patch(f"{module}.release_lock", AsyncMock()):
+        yield store
+
+
+def test_async_database_uri():
+    assert get_async_database_uri("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert get_async_database_uri("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+
+def test_app_imports_with_sqlite_database(tmp_path):
+    """The aiosqlite engine uses a NullPool, which rejects pool sizing"""
+    import os
+    import subprocess
+    import sys
+
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'app.db'}")
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.main"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.asyncio
+async def test_async_repository_crud_and_cache(async_db, async_owner, fake_async_redis):
+    repo = AsyncTaskRepository(async_db)
+    due = datetime(2030, 1, 1)
+    created = [
+        await repo.create_task(TaskCreate(title=f"Task {i}", due_date=due + timedelta(days=i)), async_owner.id)
+        for i in range(3)
+    ]
+    assert f"task:{created[0].id}" in fake_async_redis
+
+    body, next_cursor, total = await repo.get_user_tasks_json(async_owner.id, limit=2)
+    assert [task["title"] for task in json.loads(body)] == ["Task 0", "Task 1"]
+    assert total == 3
+    body, last_cursor, _ = await repo.get_user_tasks_json(async_owner.id, limit=2, cursor=next_cursor)
+    assert [task["title"] for task in json.loads(body)] == ["Task 2"]
+    assert last_cursor is None
+
+    await repo.update_task(created[0].id, TaskUpdate(title="Renamed"), async_owner.id)
+    body, _, _ = await repo.get_user_tasks_json(async_owner.id, limit=2)
+    assert json.loads(body)[0]["title"] == "Renamed"
+    assert json.loads(await repo.get_task_json(created[0].id))["title"] == "Renamed"
+
+    tasks = await repo.get_tasks_by_ids([created[2].id, created[1].id, 999], async_owner.id)
+    assert [task.id for task in tasks] == [created[2].id, created[1].id]
+
+    assert await repo.delete_task(created[1].id, async_owner.id) is not None
+    assert await repo.delete_task(created[1].id, async_owner.id) is None
+    assert f"task:{created[1].id}" not in fake_async_redis
+
+
+@pytest.mark.asyncio
+async def test_async_service_hides_other_users_tasks(async_db, async_owner, fake_async_redis):
+    service = AsyncTaskService(AsyncTaskRepository(async_db))
+    task = await service.create_task(TaskCreate(title="Mine"), async_owner.id)
+
+    assert json.loads(await service.get_task_json(task.id, async_owner.id))["title"] == "Mine"
+    with pytest.raises(HTTPException) as excinfo:
+        await service.get_task_json(task.id, async_owner.id + 1)
+    assert excinfo.value.status_code == 404
+    with pytest.raises(HTTPException) as excinfo:
+        await service.get_tasks_json(async_owner.id, cursor="not-a-cursor")
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_async_user_repository(async_db, async_owner):
+    repo = AsyncUserRepository(async_db)
+    assert (await repo.get_user_by_username("owner")).id == async_owner.id
+    assert await repo.get_user_by_username("nobody") is None
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_coalesces_concurrent_calls():
+    flight = AsyncSingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(flight.do("key", load) for _ in range(10)))
+    assert results == ["value"] * 10
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_survives_leader_cancellation():
+    flight = AsyncSingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "value"
+
+    leader = asyncio.ensure_future(flight.do("key", load))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(flight.do("key", load))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await flight.do("key", load) == "value"
+
+
+@pytest.mark.asyncio
+async def test_async_search_uses_async_elasticsearch(async_db, async_owner, fake_async_redis):
+    document = {
+        "id": 1, "title": "Async Task", "description": None, "completed": False,
+        "created_at": datetime(2030, 1, 1).isoformat(), "due_date": None, "priority": "high",
+        "owner_id": async_owner.id,
+    }
+    module = "app.infrastructure.services.elastic_async"
+    with patch(f"{module}.search_documents_page", AsyncMock(return_value=([document], None, None))) as search:
+        results = await AsyncTaskRepository(async_db).search_tasks("Async", async_owner.id)
+
+    args, kwargs = search.call_args
+    assert args[1] == "Async"
+    assert "title^3" in kwargs["fields"]
+    assert kwargs["filters"] == {"owner_id": async_owner.id}
+    assert kwargs["routing"] == str(async_owner.id)
+    assert [task.title for task in results] == ["Async Task"]
+
+
+@pytest.mark.asyncio
+async def test_async_search_falls_back_to_database(async_db, async_owner, fake_async_redis):
+    repo = AsyncTaskRepository(async_db)
+    await repo.create_task(TaskCreate(title="Database Task"), async_owner.id)
+
+    module = "app.infrastructure.services.elastic_async"
+    with patch(f"{module}.search_documents_page", AsyncMock(side_effect=Exception("Elasticsearch error"))):
+        results = await repo.search_tasks("database", async_owner.id)
+
+    assert [task.title for task in results] == ["Database Task"]
+
+
+@pytest.mark.asyncio
+async def test_async_search_fallback_orders_by_priority(async_db, async_owner, fake_async_redis):
+    repo = AsyncTaskRepository(async_db)
+    await repo.create_task(TaskCreate(title="Report low", priority="low"), async_owner.id)
+    await repo.create_task(TaskCreate(title="Report high", priority="high"), async_owner.id)
+
+    module = "app.infrastructure.services.elastic_async"
+    with patch(f"{module}.search_documents_page", AsyncMock(side_effect=Exception("Elasticsearch error"))):
+        results = await repo.search_tasks("report", async_owner.id, sort="priority")
+
+    assert [task.title for task in results] == ["Report high", "Report low"]
+
+
+@pytest.mark.asyncio
+async def test_async_search_fallback_pages_with_cursor(async_db, async_owner, fake_async_redis):
+    repo = AsyncTaskRepository(async_db)
+    for n in range(3):
+        await repo.create_task(TaskCreate(title=f"Page {n}"), async_owner.id)
+
+    module = "app.infrastructure.services.elastic_async"
+    seen, cursor = [], None
+    with patch(f"{module}.search_documents_page", AsyncMock(side_effect=Exception("Elasticsearch error"))):
+        while True:
+            page, cursor = await repo.search_tasks_page("page", async_owner.id, limit=2, cursor=cursor)
+            seen.extend(task.title for task in page)
+            if cursor is None:
+                break
+
+    assert sorted(seen) == ["Page 0", "Page 1", "Page 2"]
+
+
+@pytest.mark.asyncio
+async def test_async_suggest_falls_back_to_database(async_db, async_owner, fake_async_redis):
+    repo = AsyncTaskRepository(async_db)
+    task = await repo.create_task(TaskCreate(title="Water plants"), async_owner.id)
+
+    module = "app.infrastructure.services.elastic_async"
+    with patch(f"{module}.suggest_documents", AsyncMock(side_effect=Exception("timeout"))):
+        body = await repo.suggest_tasks_json("wat", async_owner.id)
+
+    assert json.loads(body) == [{"id": task.id, "title": "Water plants"}]
+
+
+@pytest.mark.asyncio
+async def test_async_task_stats_fall_back_to_group_by(async_db, async_owner, fake_async_redis):
+    repo = AsyncTaskRepository(async_db)
+    await repo.create_task(TaskCreate(title="Later", due_date=datetime.utcnow() + timedelta(days=30)), async_owner.id)
+    await repo.create_task(TaskCreate(title="Late", due_date=datetime.utcnow() - timedelta(days=1)), async_owner.id)
+
+    module = "app.infrastructure.services.elastic_async"
+    with patch(f"{module}.aggregate_documents", AsyncMock(side_effect=Exception("Elasticsearch error"))):
+        stats = json.loads(await repo.get_task_stats_json(async_owner.id))
+
+    assert stats["total"] == 2
+    assert stats["open"] == 2
+    assert stats["by_priority"]["normal"] == 2
+    assert stats["due"] == {"overdue": 1, "today": 0, "next_7_days": 0, "later": 1}
+
+
+@pytest.mark.asyncio
+async def test_async_writes_maintain_counters(async_db, async_owner, fake_async_redis):
+    repo = AsyncTaskRepository(async_db)
+    task = await repo.create_task(TaskCreate(title="One"), async_owner.id)
+    await repo.create_task(TaskCreate(title="Two", priority="high"), async_owner.id)
+    await repo.update_task(task.id, TaskUpdate(completed=True), async_owner.id)
+    await repo.delete_task(task.id, async_owner.id)
+
+    assert json.loads(await repo.get_task_summary_json(async_owner.id)) == {
+        "total": 1, "completed": 0, "open": 1, "by_priority": {"low": 0, "normal": 0, "high": 1},
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_writes_update_embedded_search_off_the_event_loop(async_db, async_owner, fake_async_redis):
+    import threading
+    from app.infrastructure.services.embedded_search import EmbeddedSearchBackend
+
+    loop_thread = threading.get_ident()
+    threads = []
+    backend = EmbeddedSearchBackend()
+    with patch("app.infrastructure.services.search_backend.search_backend", backend), \
+         patch("app.infrastructure.repositories.task_repository.publish_search_update",
+               side_effect=lambda *args: threads.append(threading.get_ident())):
+        repo = AsyncTaskRepository(async_db)
+        task = await repo.create_task(TaskCreate(title="Water plants"), async_owner.id)
+        assert [document["id"] for document in backend.search(async_owner.id, "plants")[0]] == [task.id]
+        await repo.delete_task(task.id, async_owner.id)
+
+    assert backend.search(async_owner.id, "plants")[0] == []
+    assert len(threads) == 2
+    assert loop_thread not in threads
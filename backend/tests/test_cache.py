@@ -0,0 +1,368 @@
+import json
+import threading
+from unittest.mock import patch, MagicMock
+from datetime import datetime
+from typing import List
+from pydantic import TypeAdapter
+
+from app.infrastructure.repositories.task_repository import TaskRepository
+from app.infrastructure.services.local_cache import LocalCache
+from app.infrastructure.services import redis as redis_service
+from app.infrastructure.services.cache_codec import CacheCodec
+from app.infrastructure.services.cache_metrics import CacheMetrics, HotKeyTracker, key_type
+from app.infrastructure.services.stampede import (
+    SingleFlight, pack_cache_entry, unpack_cache_entry, should_refresh_early
+)
+from app.application.schemas.task import TaskCreate, TaskUpdate, Task as TaskSchema
+from app.domain.models.task import Task
+from app.presentation.routers.tasks import convert_task_list
+
+def test_user_task_list_keys_embed_generation(db, fake_redis, owner):
+    """Test that list pages are cached under the owner's current generation"""
+    repo = TaskRepository(db)
+
+    repo.get_user_tasks(owner.id)
+
+    assert f"tasks:user:{owner.id}:v0:page:0:100" in fake_redis
+
+def test_writes_bump_generation_and_refresh_lists(db, fake_redis, owner):
+    """Test that create/update/delete make cached list pages unreachable"""
+    repo = TaskRepository(db)
+    assert repo.get_user_tasks(owner.id) == []
+
+    created = repo.create_task(TaskCreate(title="First", due_date=datetime.now()), owner.id)
+    assert fake_redis[f"tasks:user:{owner.id}:version"] == 1
+    assert fake_redis["tasks:all:version"] == 1
+    assert [t.title for t in repo.get_user_tasks(owner.id)] == ["First"]
+
+    repo.update_task(created.id, TaskUpdate(title="Renamed"), owner.id)
+    assert [t.title for t in repo.get_user_tasks(owner.id)] == ["Renamed"]
+
+    repo.delete_task(created.id, owner.id)
+    assert repo.get_user_tasks(owner.id) == []
+    assert f"task:{created.id}" not in fake_redis
+
+def test_update_writes_through_single_task_key(db, fake_redis, owner):
+    """Test that updates refresh the task key instead of deleting it"""
+    repo = TaskRepository(db)
+    created = repo.create_task(TaskCreate(title="Original", due_date=datetime.now()), owner.id)
+
+    repo.update_task(created.id, TaskUpdate(title="Updated"), owner.id)
+
+    assert '"Updated"' in fake_redis[f"task:{created.id}"]
+    assert repo.get_task(created.id).title == "Updated"
+
+def test_local_cache_evicts_least_recently_used():
+    """Test that the L1 tier stays within its entry bound"""
+    cache = LocalCache(max_entries=2, default_ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+def test_local_cache_honours_ttl():
+    """Test that L1 entries expire after the shorter of their TTL and the tier TTL"""
+    from unittest.mock import patch
+    cache = LocalCache(max_entries=10, default_ttl=30)
+    with patch("app.infrastructure.services.local_cache.time.monotonic", return_value=100.0):
+        cache.set("short", "1", ttl=5)
+        cache.set("long", "2", ttl=3600)
+    with patch("app.infrastructure.services.local_cache.time.monotonic", return_value=110.0):
+        assert cache.get("short") is None
+        assert cache.get("long") == "2"
+    with patch("app.infrastructure.services.local_cache.time.monotonic", return_value=131.0):
+        assert cache.get("long") is None
+
+def test_invalidation_message_from_other_worker_evicts_l1():
+    """Test that pub/sub invalidations from other workers evict local entries"""
+    redis_service.local_cache.set("task:1", "{}")
+    redis_service._handle_invalidation_message(
+        {"data": json.dumps({"origin": "another-worker", "keys": ["task:1"]})}
+    )
+
+    assert redis_service.local_cache.get("task:1") is None
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent callers of the same key share one execution"""
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "payload"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", load)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", load))) for _ in range(4)]
+    for follower in followers:
+        follower.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["payload"] * 5
+
+def test_cache_entry_envelope_round_trip():
+    """Test that packed entries unpack to their payload and legacy entries are accepted"""
+    payload, delta, expiry = unpack_cache_entry(pack_cache_entry('{"a": "|"}', 0.25, 60))
+
+    assert payload == '{"a": "|"}'
+    assert delta == 0.25
+    assert expiry > 0
+    assert unpack_cache_entry('{"legacy": true}')[0] == '{"legacy": true}'
+
+def test_xfetch_refreshes_early_only_near_expiry():
+    """Test the probabilistic early refresh decision"""
+    with patch("app.infrastructure.services.stampede.time.time", return_value=1000.0):
+        assert not should_refresh_early(0.1, 2000.0)
+        assert should_refresh_early(0.1, 999.0)
+        assert not should_refresh_early(0, 1000.5)
+
+def test_read_through_serves_stale_while_another_process_recomputes(db, fake_redis, owner):
+    """Test that early refresh losing the Redis lock keeps serving the cached payload"""
+    repo = TaskRepository(db)
+    repo.create_task(TaskCreate(title="Cached", due_date=datetime.now()), owner.id)
+    repo.get_user_tasks(owner.id)
+    load = MagicMock(return_value="[]")
+    module = "app.infrastructure.repositories.task_repository"
+
+    with patch(f"{module}.should_refresh_early", return_value=True), \
+         patch(f"{module}.acquire_lock", return_value=None):
+        cache_key = f"tasks:user:{owner.id}:v1:page:0:100"
+        payload = repo._read_through(cache_key, load, 60)
+
+    load.assert_not_called()
+    assert "Cached" in payload
+
+def test_cached_bodies_match_response_model_rendering(db, fake_redis, owner):
+    """Test that pre-rendered bodies are byte-identical to what the response model produces"""
+    repo = TaskRepository(db)
+    for title, priority in [("Low", "low"), ("High\nmultiline", "high")]:
+        repo.create_task(
+            TaskCreate(title=title, description="desc", priority=priority, due_date=datetime.now()),
+            owner.id,
+        )
+    orm_tasks = db.query(Task).order_by(Task.due_date, Task.id).all()
+    # Mirrors how FastAPI validates and serializes a response_model=List[Task] return value
+    adapter = TypeAdapter(List[TaskSchema])
+    expected = adapter.dump_json(
+        adapter.validate_python(convert_task_list(orm_tasks), from_attributes=True)
+    ).decode()
+
+    miss_body, _, _ = repo.get_user_tasks_json(owner.id)
+    hit_body, _, _ = repo.get_user_tasks_json(owner.id)
+
+    assert miss_body == expected
+    assert hit_body == expected
+    assert repo.get_task_json(orm_tasks[0].id) == TaskSchema.model_validate(orm_tasks[0]).model_dump_json()
+
+
+def test_cached_list_page_keeps_next_cursor(db, fake_redis, owner):
+    """Test that the next cursor is served from the cache along with the body"""
+    repo = TaskRepository(db)
+    for i in range(3):
+        repo.create_task(TaskCreate(title=f"Task {i}", due_date=datetime.now()), owner.id)
+
+    _, miss_cursor, _ = repo.get_user_tasks_json(owner.id, limit=2)
+    _, hit_cursor, _ = repo.get_user_tasks_json(owner.id, limit=2)
+
+    assert miss_cursor is not None
+    assert hit_cursor == miss_cursor
+
+def test_get_tasks_by_ids_mixes_cache_hits_and_one_query(db, fake_redis, owner):
+    """Test that batch fetches reuse cached tasks, load the rest and respect ownership"""
+    repo = TaskRepository(db)
+    first = repo.create_task(TaskCreate(title="First", due_date=datetime.now()), owner.id)
+    second = repo.create_task(TaskCreate(title="Second", due_date=datetime.now()), owner.id)
+    foreign = repo.create_task(TaskCreate(title="Foreign", due_date=datetime.now()), owner.id + 1)
+    del fake_redis[f"task:{second.id}"]
+
+    tasks = repo.get_tasks_by_ids([second.id, foreign.id, first.id, 999], owner.id)
+
+    assert [task.title for task in tasks] == ["Second", "First"]
+    assert f"task:{second.id}" in fake_redis
+
+def test_writes_unlink_orphaned_list_pages_through_tags(db, fake_redis, owner):
+    """Test that a write reclaims the owner's previous generation of list pages"""
+    repo = TaskRepository(db)
+    repo.get_user_tasks(owner.id)
+    assert f"tasks:user:{owner.id}:v0:page:0:100" in fake_redis
+
+    repo.create_task(TaskCreate(title="New", due_date=datetime.now()), owner.id)
+
+    assert f"tasks:user:{owner.id}:v0:page:0:100" not in fake_redis
+
+def test_invalidate_tag_renames_and_unlinks_members():
+    """Test that tag invalidation never walks the keyspace"""
+    client = MagicMock()
+    client.sscan_iter.return_value = iter(["tasks:user:1:v0:0:100", "tasks:user:1:v0:0:10"])
+    client.unlink.return_value = 2
+
+    with patch.object(redis_service, "redis_client", client):
+        removed = redis_service.invalidate_tag("tasks:user:1")
+
+    purge_key = client.rename.call_args.args[1]
+    assert client.rename.call_args.args[0] == "tag:tasks:user:1"
+    client.unlink.assert_any_call("tasks:user:1:v0:0:100", "tasks:user:1:v0:0:10")
+    client.unlink.assert_any_call(purge_key)
+    client.keys.assert_not_called()
+    assert removed == 2
+
+def test_clear_cache_by_pattern_scans_incrementally():
+    """Test that pattern invalidation uses SCAN instead of KEYS"""
+    client = MagicMock()
+    client.scan_iter.return_value = iter(["task:1", "task:2"])
+    client.unlink.return_value = 2
+
+    with patch.object(redis_service, "redis_client", client):
+        assert redis_service.clear_cache_by_pattern("task:*") == 2
+
+    client.keys.assert_not_called()
+
+class CounterClient:
+    """Redis stand-in holding generation counters"""
+
+    def __init__(self):
+        self.values = {}
+        self.on_get = None
+
+    def get(self, key):
+        value = self.values.get(key)
+        if self.on_get:
+            on_get, self.on_get = self.on_get, None
+            on_get()
+        return value
+
+    def pipeline(self, transaction=True):
+        client = self
+        class Pipeline:
+            def __init__(self):
+                self.keys = []
+            def incr(self, key):
+                self.keys.append(key)
+            def execute(self):
+                for key in self.keys:
+                    client.values[key] = str(int(client.values.get(key, 0)) + 1)
+                return [int(client.values[key]) for key in self.keys]
+        return Pipeline()
+
+def test_version_read_racing_a_bump_is_not_kept_in_l1():
+    """Test that a version read before a bump cannot outlive it in this process"""
+    client = CounterClient()
+    client.values["tasks:user:1:version"] = "3"
+    key = "tasks:user:1:version"
+
+    with patch.object(redis_service, "redis_client", client), \
+         patch.object(redis_service, "payload_client", client), \
+         patch.object(redis_service, "local_cache", LocalCache(max_entries=10)):
+        # Another request bumps the generation while this read is in flight
+        client.on_get = lambda: redis_service.bump_cache_versions(key)
+        assert redis_service.get_cache_version(key) == 3
+        assert redis_service.get_cache_version(key) == 4
+
+def test_async_version_read_skips_l1():
+    """Test that the async path reads generations from Redis even if L1 holds one"""
+    import asyncio
+    from unittest.mock import AsyncMock
+    from app.infrastructure.services import redis_async
+
+    client = MagicMock(get=AsyncMock(return_value="4"))
+    stale = LocalCache(max_entries=10)
+    stale.set("tasks:user:1:version", "3")
+
+    with patch.object(redis_async, "async_redis_client", client), \
+         patch.object(redis_async, "local_cache", stale):
+        assert asyncio.run(redis_async.get_cache_version("tasks:user:1:version")) == 4
+
+def test_key_type_collapses_variable_segments():
+    """Test that metrics are aggregated per key type"""
+    assert key_type("task:12") == "task"
+    assert key_type("tasks:user:3:v2:0:100") == "tasks:user"
+    assert key_type("tasks:user:3:version") == "tasks:user:version"
+    assert key_type("tasks:all:version") == "tasks:all:version"
+
+def test_hot_key_tracker_ranks_most_accessed_keys():
+    """Test that the top-K tracker surfaces hot keys within its capacity"""
+    tracker = HotKeyTracker(capacity=3, sample_rate=1.0)
+    for key, count in [("task:1", 10), ("task:2", 5), ("task:3", 1), ("task:4", 2)]:
+        for _ in range(count):
+            tracker.record(key)
+
+    top = tracker.top(2)
+
+    assert [entry["key"] for entry in top] == ["task:1", "task:2"]
+    assert top[0]["estimated_accesses"] == 10
+
+def test_get_cache_records_hits_misses_and_bytes():
+    """Test that Redis service lookups are counted per key type and tier"""
+    client = MagicMock()
+    client.get.side_effect = lambda key: b"payload" if key == "task:1" else None
+    metrics = CacheMetrics(HotKeyTracker(sample_rate=1.0))
+
+    with patch.object(redis_service, "payload_client", client), \
+         patch.object(redis_service, "cache_metrics", metrics), \
+         patch.object(redis_service, "local_cache", LocalCache(max_entries=10)):
+        redis_service.get_cache("task:1")
+        redis_service.get_cache("task:1")
+        redis_service.get_cache("task:2")
+
+    stats = metrics.snapshot()["task"]
+    assert (stats["l1_hits"], stats["l2_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["bytes_read"] == 2 * len("payload")
+    assert stats["get_latency"]["count"] == 3
+
+def test_codec_compresses_large_payloads_only():
+    """Test that payloads above the threshold are compressed and round trip"""
+    codec = CacheCodec(codec="zlib", threshold=64)
+    large = json.dumps([{"title": "Task", "description": "same text again"}] * 100)
+
+    encoded = codec.encode(large)
+
+    assert encoded.startswith(b"\x00z")
+    assert len(encoded) < len(large) / 5
+    assert codec.decode(encoded) == large
+    assert codec.encode("[]") == b"[]"
+
+def test_codec_reads_entries_written_by_other_codecs():
+    """Test that mixed formats stay readable while the codec setting changes"""
+    zlib_codec = CacheCodec(codec="zlib", threshold=0)
+    json_codec = CacheCodec(codec="json")
+    payload = '{"title":"Task"}'
+
+    assert json_codec.decode(zlib_codec.encode(payload)) == payload
+    assert zlib_codec.decode(json_codec.encode(payload)) == payload
+    assert zlib_codec.decode(payload.encode()) == payload
+
+def test_columnar_codec_round_trips_task_pages():
+    """Test that task lists are stored by column and read back byte for byte"""
+    codec = CacheCodec(codec="columnar", threshold=0)
+    rows = [{"id": i, "title": f"Tâche {i}", "description": None, "completed": i % 2 == 0} for i in range(50)]
+    body = json.dumps(rows, separators=(",", ":"), ensure_ascii=False)
+    page = f"cursor 50\n{body}"
+
+    for payload in (body, page):
+        encoded = codec.encode(payload)
+        assert encoded.startswith(b"\x00c")
+        assert codec.decode(encoded) == payload
+        assert CacheCodec(codec="zlib").decode(encoded) == payload
+
+def test_columnar_codec_falls_back_for_other_payloads():
+    """Test that payloads it cannot reproduce exactly are compressed as they are"""
+    codec = CacheCodec(codec="columnar", threshold=0)
+    spaced = json.dumps([{"title": "Task"}, {"title": "Other"}])
+    mixed = '[{"title":"Task"},{"done":true}]'
+
+    for payload in ('{"title":"Task"}', spaced, mixed, "[1,2]", "42 3\n[]"):
+        encoded = codec.encode(payload)
+        assert encoded.startswith(b"\x00z")
+        assert codec.decode(encoded) == payload
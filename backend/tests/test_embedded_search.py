@@ -0,0 +1,230 @@
+import os
+import random
+import pytest
+from unittest.mock import patch
+
+from app.infrastructure.services.embedded_search import EmbeddedSearchBackend, _OwnerIndex, max_edits, within_edits
+
+
+def make_document(task_id, title, description=None, owner_id=1, due_date=None, priority="normal"):
+    ranks = {"low": 0, "normal": 1, "high": 2}
+    return {
+        "id": task_id, "title": title, "description": description, "completed": False,
+        "created_at": "2030-01-01T00:00:00", "due_date": due_date, "priority": priority,
+        "priority_rank": ranks[priority], "owner_id": owner_id,
+    }
+
+
+@pytest.fixture
+def backend():
+    backend = EmbeddedSearchBackend()
+    backend.index_documents([
+        make_document(1, "Buy milk", "From the corner shop", due_date="2030-01-03T00:00:00"),
+        make_document(2, "Call the bank", "Ask about milk money", due_date="2030-01-01T00:00:00", priority="high"),
+        make_document(3, "Water plants", due_date="2030-01-02T00:00:00", priority="low"),
+        make_document(4, "Buy milk", owner_id=2),
+    ])
+    return backend
+
+
+def test_within_edits():
+    assert within_edits("milk", "milk", 0)
+    assert within_edits("mlik", "milk", 2)
+    assert not within_edits("mlik", "milk", 1)
+    assert not within_edits("water", "milk", 2)
+
+
+def test_search_ranks_title_matches_first(backend):
+    documents, _, pit_id = backend.search(1, "milk", sort="relevance")
+
+    assert [document["id"] for document in documents] == [1, 2]
+    assert pit_id is None
+
+
+def test_search_is_scoped_to_owner(backend):
+    documents, _, _ = backend.search(2, "milk")
+
+    assert [document["id"] for document in documents] == [4]
+    assert backend.search(3, "milk")[0] == []
+
+
+def test_search_matches_typos(backend):
+    documents, _, _ = backend.search(1, "plnats")
+
+    assert [document["id"] for document in documents] == [3]
+
+
+def test_fuzzy_candidates_keep_every_match():
+    rng = random.Random(7)
+    words = sorted({"".join(rng.choices("abcdefgh", k=rng.randint(1, 9))) for _ in range(2000)})
+    index = _OwnerIndex()
+    index.add(make_document(1, " ".join(words)))
+
+    compared = 0
+    terms = [term for term in words[::10] + ["aaaaaa", "abcabc"] if max_edits(term)]
+    for term in terms:
+        candidates = set(index.fuzzy_candidates(term, max_edits(term)))
+        compared += len(candidates)
+        assert {word for word in words if within_edits(term, word, max_edits(term))} <= candidates
+    # Most of the vocabulary is never compared with the term
+    assert compared < len(terms) * len(words) / 10
+
+
+def test_search_sorts(backend):
+    by_due_date, _, _ = backend.search(1, "milk")
+    by_priority, _, _ = backend.search(1, "milk", sort="priority")
+
+    assert [document["id"] for document in by_due_date] == [2, 1]
+    assert [document["id"] for document in by_priority] == [2, 1]
+
+
+def test_search_pages_with_search_after(backend):
+    first, search_after, _ = backend.search(1, "milk", size=1)
+    second, search_after, _ = backend.search(1, "milk", size=1, search_after=search_after)
+    third, _, _ = backend.search(1, "milk", size=1, search_after=search_after)
+
+    assert [document["id"] for document in first + second] == [2, 1]
+    assert third == []
+
+
+def test_suggest_matches_title_prefixes(backend):
+    assert backend.suggest(1, "buy mi") == [{"id": 1, "title": "Buy milk"}]
+    assert backend.suggest(1, "wat") == [{"id": 3, "title": "Water plants"}]
+    # Descriptions are not suggested
+    assert backend.suggest(1, "corn") == []
+
+
+def test_update_and_delete(backend):
+    backend.index_documents([make_document(1, "Buy bread")])
+    assert [document["id"] for document in backend.search(1, "milk")[0]] == [2]
+    assert [document["id"] for document in backend.search(1, "bread")[0]] == [1]
+
+    backend.delete_documents([(1, 1)])
+    assert backend.search(1, "bread")[0] == []
+
+
+def test_rebuild_replays_writes_made_meanwhile(backend):
+    def documents():
+        yield make_document(1, "Buy milk")
+        # A task created while the rebuild streams the table
+        backend.index_documents([make_document(5, "Milk the cow")])
+        yield make_document(2, "Call the bank")
+
+    assert backend.rebuild(documents()) == 2
+
+    assert sorted(document["id"] for document in backend.search(1, "milk")[0]) == [1, 5]
+    assert backend.search(2, "milk")[0] == []
+    assert backend.stats() == {"owners": 1, "documents": 3}
+
+
+def test_task_stats(backend):
+    from datetime import datetime
+
+    backend.index_documents([dict(make_document(5, "Done", priority="high"), completed=True)])
+
+    stats = backend.task_stats(1, datetime(2030, 1, 1, 12))
+
+    assert stats == {
+        "total": 4, "completed": 1, "open": 3,
+        "by_priority": {"low": 1, "normal": 1, "high": 2},
+        "due": {"overdue": 1, "today": 0, "next_7_days": 2, "later": 0},
+    }
+
+
+def test_snapshot_roundtrip(backend, tmp_path):
+    path = str(tmp_path / "tasks.idx")
+    backend.save_snapshot(path)
+
+    restored = EmbeddedSearchBackend()
+    assert restored.load_snapshot(path)
+    assert restored.stats() == backend.stats()
+    assert restored.search(1, "milk", sort="relevance")[0] == backend.search(1, "milk", sort="relevance")[0]
+    assert not EmbeddedSearchBackend().load_snapshot(str(tmp_path / "missing.idx"))
+
+
+def test_snapshot_never_unpickles(tmp_path):
+    import pickle
+
+    class Exploit:
+        def __reduce__(self):
+            return (os.remove, (str(tmp_path / "canary"),))
+
+    (tmp_path / "canary").write_text("alive")
+    path = tmp_path / "tasks.idx"
+    path.write_bytes(b"TASKIDX1" + pickle.dumps(Exploit()))
+
+    assert not EmbeddedSearchBackend().load_snapshot(str(path))
+    assert (tmp_path / "canary").exists()
+
+
+def test_repository_updates_embedded_backend_without_outbox(db, owner, fake_redis):
+    """Test that writes reach an in-process backend directly instead of through the outbox"""
+    from app.application.schemas.task import TaskCreate, TaskUpdate
+    from app.domain.models.task_outbox import TaskOutbox
+    from app.infrastructure.repositories.task_repository import TaskRepository
+
+    backend = EmbeddedSearchBackend()
+    with patch("app.infrastructure.services.search_backend.search_backend", backend):
+        repo = TaskRepository(db)
+        task = repo.create_task(TaskCreate(title="Buy milk"), owner.id)
+        assert [result.id for result in repo.search_tasks("milk", owner.id)] == [task.id]
+
+        repo.update_task(task.id, TaskUpdate(title="Buy bread"), owner.id)
+        assert [result.title for result in repo.search_tasks("bread", owner.id)] == ["Buy bread"]
+
+        repo.delete_task(task.id, owner.id)
+        assert backend.search(owner.id, "bread")[0] == []
+        assert db.query(TaskOutbox).count() == 0
+
+
+def test_other_workers_apply_broadcast_changes(db, owner, fake_redis):
+    """Test that another worker's index follows this worker's writes through the broadcast"""
+    import json
+    from app.application.schemas.task import TaskCreate, TaskUpdate
+    from app.infrastructure.repositories.task_repository import TaskRepository
+    from app.infrastructure.services.search_backend import _handle_search_update_message
+
+    module = "app.infrastructure.services.search_backend"
+    published = []
+    writer, other = EmbeddedSearchBackend(), EmbeddedSearchBackend()
+    with patch(f"{module}.search_backend", writer), \
+         patch("app.infrastructure.repositories.task_repository.publish_search_update",
+               side_effect=lambda documents, deleted: published.append(json.dumps({"index": documents, "delete": deleted}))):
+        repo = TaskRepository(db)
+        kept = repo.create_task(TaskCreate(title="Buy milk"), owner.id)
+        repo.update_task(kept.id, TaskUpdate(title="Buy bread"), owner.id)
+        removed = repo.create_task(TaskCreate(title="Bake bread"), owner.id)
+        repo.delete_task(removed.id, owner.id)
+
+    with patch(f"{module}.search_backend", other):
+        for data in published:
+            _handle_search_update_message({"data": data})
+        _handle_search_update_message({"data": "not json"})
+
+    assert [document["id"] for document in other.search(owner.id, "bread")[0]] == [kept.id]
+    assert other.search(owner.id, "milk")[0] == []
+    assert other.stats() == writer.stats()
+
+
+def test_repository_rebuilds_embedded_backend(db, owner, fake_redis):
+    from app.domain.models.task import Task
+    from app.infrastructure.repositories.task_repository import TaskRepository
+
+    db.add_all([Task(title="Buy milk", owner_id=owner.id), Task(title="Milk the cow", owner_id=owner.id)])
+    db.commit()
+
+    backend = EmbeddedSearchBackend()
+    progress = []
+    with patch("app.infrastructure.services.search_backend.search_backend", backend):
+        name = TaskRepository(db).rebuild_search_index(progress=lambda *args: progress.append(args))
+
+    assert name == "embedded"
+    assert progress[-1] == (2, 0, 2)
+    assert len(backend.search(owner.id, "milk")[0]) == 2
+
+
+def test_create_search_backend_rejects_unknown_name():
+    from app.infrastructure.services.search_backend import create_search_backend
+
+    with pytest.raises(ValueError):
+        create_search_backend("solr")
@@ -0,0 +1,180 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.application.schemas.task import TaskCreate, TaskUpdate
+from app.domain.models.task_outbox import TaskOutbox
+from app.infrastructure.repositories.task_repository import TaskRepository
+from app.infrastructure.services.search_outbox import OutboxDispatcher
+
+
+@pytest.fixture
+def dispatcher(db):
+    return OutboxDispatcher(sessionmaker(bind=db.get_bind()), batch_size=100, retry_base_delay=30)
+
+
+@pytest.fixture
+def mock_bulk():
+    module = "app.infrastructure.services.search_outbox"
+    with patch(f"{module}.helpers.bulk", return_value=(0, [])) as mock, \
+         patch(f"{module}.get_task_write_indices", return_value=["todolist_tasks_v1"]):
+        yield mock
+
+
+def test_writes_enqueue_outbox_rows_instead_of_indexing(db, owner, fake_redis):
+    repo = TaskRepository(db)
+    with patch("app.infrastructure.services.elastic.es_client") as es_client:
+        task = repo.create_task(TaskCreate(title="Outbox"), owner.id)
+        repo.update_task(task.id, TaskUpdate(title="Renamed"), owner.id)
+        repo.delete_task(task.id, owner.id)
+
+    assert es_client.mock_calls == []
+    assert [row.task_id for row in db.query(TaskOutbox).order_by(TaskOutbox.id)] == [task.id] * 3
+
+
+def test_dispatch_coalesces_updates_into_one_bulk_action(db, owner, fake_redis, dispatcher, mock_bulk):
+    repo = TaskRepository(db)
+    task = repo.create_task(TaskCreate(title="First"), owner.id)
+    repo.update_task(task.id, TaskUpdate(title="Second"), owner.id)
+    repo.update_task(task.id, TaskUpdate(title="Third"), owner.id)
+
+    assert dispatcher.dispatch_once() == 3
+
+    actions = mock_bulk.call_args[0][1]
+    assert len(actions) == 1
+    assert actions[0]["_op_type"] == "index"
+    assert actions[0]["_source"]["title"] == "Third"
+    assert actions[0]["_routing"] == str(owner.id)
+    assert db.query(TaskOutbox).count() == 0
+    stats = dispatcher.stats()
+    assert stats["dispatched"] == 1
+    assert stats["coalesced"] == 2
+    assert stats["pending"] == 0
+
+
+def test_dispatch_deletes_documents_of_removed_tasks(db, owner, fake_redis, dispatcher, mock_bulk):
+    repo = TaskRepository(db)
+    task = repo.create_task(TaskCreate(title="Gone"), owner.id)
+    repo.delete_task(task.id, owner.id)
+    mock_bulk.return_value = (0, [{"delete": {"_id": str(task.id), "status": 404}}])
+
+    dispatcher.dispatch_once()
+
+    actions = mock_bulk.call_args[0][1]
+    assert [(action["_op_type"], action["_id"]) for action in actions] == [("delete", str(task.id))]
+    # The task is gone, its owner is taken from the outbox row
+    assert actions[0]["_routing"] == str(owner.id)
+    assert db.query(TaskOutbox).count() == 0
+
+
+def test_dispatch_retries_failed_items_with_backoff(db, owner, fake_redis, dispatcher, mock_bulk):
+    repo = TaskRepository(db)
+    ok = repo.create_task(TaskCreate(title="Ok"), owner.id)
+    bad = repo.create_task(TaskCreate(title="Bad"), owner.id)
+    mock_bulk.return_value = (1, [{"index": {"_id": str(bad.id), "status": 429, "error": "rejected"}}])
+
+    dispatcher.dispatch_once()
+
+    db.expire_all()
+    rows = db.query(TaskOutbox).all()
+    assert [row.task_id for row in rows] == [bad.id]
+    assert rows[0].attempts == 1
+    assert rows[0].last_error == "rejected"
+    assert rows[0].available_at > datetime.datetime.utcnow()
+    # Not due again until the backoff has elapsed
+    assert dispatcher.dispatch_once() == 0
+    assert dispatcher.stats()["retrying"] == 1
+    assert ok.id not in [row.task_id for row in rows]
+
+
+def test_dispatch_keeps_rows_when_elasticsearch_is_down(db, owner, fake_redis, dispatcher, mock_bulk):
+    repo = TaskRepository(db)
+    repo.create_task(TaskCreate(title="A"), owner.id)
+    repo.create_task(TaskCreate(title="B"), owner.id)
+    mock_bulk.side_effect = ConnectionError("connection refused")
+
+    assert dispatcher.dispatch_once() == 2
+
+    db.expire_all()
+    assert [row.attempts for row in db.query(TaskOutbox)] == [1, 1]
+    assert dispatcher.stats()["failed"] == 2
+
+
+def test_dispatch_dual_writes_while_a_new_version_is_built(db, owner, fake_redis, dispatcher, mock_bulk):
+    task = TaskRepository(db).create_task(TaskCreate(title="Both"), owner.id)
+    with patch("app.infrastructure.services.search_outbox.get_task_write_indices",
+               return_value=["todolist_tasks_v1", "todolist_tasks_v2"]):
+        dispatcher.dispatch_once()
+
+    actions = mock_bulk.call_args[0][1]
+    assert [(action["_index"], action["_id"]) for action in actions] == [
+        ("todolist_tasks_v1", str(task.id)), ("todolist_tasks_v2", str(task.id))
+    ]
+
+
+def test_dispatch_invalidates_cached_searches_of_applied_owners(db, owner, fake_redis, dispatcher, mock_bulk):
+    TaskRepository(db).create_task(TaskCreate(title="Fresh"), owner.id)
+    version_key = f"tasks:user:{owner.id}:search:version"
+    before = fake_redis.get(version_key, 0)
+
+    dispatcher.dispatch_once()
+
+    assert fake_redis[version_key] == before + 1
+
+
+class VersionedIndex:
+    """The part of Elasticsearch's external versioning that the dispatcher relies on"""
+
+    def __init__(self):
+        self.documents = {}
+
+    def bulk(self, client, actions, **kwargs):
+        errors = []
+        for action in actions:
+            current = self.documents.get(action["_id"])
+            if current is not None and action["version"] <= current[0]:
+                errors.append({action["_op_type"]: {"_id": action["_id"], "status": 409}})
+            else:
+                self.documents[action["_id"]] = (action["version"], action.get("_source"))
+        return len(actions) - len(errors), errors
+
+
+def test_interleaved_dispatchers_keep_the_newest_state(db, owner, fake_redis):
+    """A dispatcher that read a task before another one must not overwrite its newer write"""
+    session_factory = sessionmaker(bind=db.get_bind())
+    first = OutboxDispatcher(session_factory, batch_size=100)
+    second = OutboxDispatcher(session_factory, batch_size=100)
+    repo = TaskRepository(db)
+    task = repo.create_task(TaskCreate(title="Old"), owner.id)
+    created_row = db.query(TaskOutbox).one()
+    index = VersionedIndex()
+
+    def claim(dispatcher, row_ids):
+        # SQLite has no SKIP LOCKED: hand each dispatcher the rows it would have locked
+        def rows(db, now):
+            return db.query(TaskOutbox).filter(TaskOutbox.id.in_(row_ids())).all()
+        return patch.object(dispatcher, "_claim", side_effect=rows)
+
+    def slow_bulk(client, actions, **kwargs):
+        # The first dispatcher has read "Old"; meanwhile the task changes and
+        # the second dispatcher applies that change before the first one sends
+        with patch(f"{module}.helpers.bulk", side_effect=index.bulk):
+            repo.update_task(task.id, TaskUpdate(title="New"), owner.id)
+            assert second.dispatch_once() == 1
+        return index.bulk(client, actions, **kwargs)
+
+    module = "app.infrastructure.services.search_outbox"
+    newer_rows = lambda: [row.id for row in db.query(TaskOutbox).filter(TaskOutbox.id != created_row.id)]
+    with patch(f"{module}.get_task_write_indices", return_value=["todolist_tasks_v1"]), \
+         claim(first, lambda: [created_row.id]), claim(second, newer_rows), \
+         patch(f"{module}.helpers.bulk", side_effect=slow_bulk):
+        assert first.dispatch_once() == 1
+
+    version, document = index.documents[str(task.id)]
+    assert document["title"] == "New"
+    assert version > created_row.id
+    # The rejected stale write is not retried
+    assert db.query(TaskOutbox).count() == 0
+    assert first.stats()["failed"] == 0
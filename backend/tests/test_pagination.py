@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app.infrastructure.repositories.task_repository import TaskRepository
+from app.application.pagination import encode_task_cursor, decode_task_cursor, next_task_cursor
+from app.domain.models.task import Task
+
+def create_tasks(db, owner, count, due_date):
+    tasks = [Task(title=f"Task {i}", owner_id=owner.id, due_date=due_date) for i in range(count)]
+    db.add_all(tasks)
+    db.commit()
+    return tasks
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes back to the task's keyset position"""
+    task = Task(id=42, due_date=datetime(2024, 3, 25, 10, 29, 7))
+
+    assert decode_task_cursor(encode_task_cursor(task)) == (task.due_date, 42)
+
+def test_invalid_cursor_raises_value_error():
+    """Test that malformed cursors are rejected"""
+    with pytest.raises(ValueError):
+        decode_task_cursor("not-a-cursor")
+
+def test_keyset_pages_are_stable_with_tied_due_dates(db, fake_redis, owner):
+    """Test that walking cursors visits every task once even when due dates tie"""
+    due_date = datetime.now() + timedelta(days=1)
+    create_tasks(db, owner, 7, due_date)
+    repo = TaskRepository(db)
+
+    seen, cursor = [], None
+    while True:
+        page = repo.get_user_tasks(owner.id, limit=3, cursor=cursor)
+        seen.extend(task.id for task in page)
+        cursor = next_task_cursor(page, 3)
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert seen == sorted(seen)
+
+def test_page_size_is_capped(db, fake_redis, owner):
+    """Test that the repository never returns more than the max page size"""
+    from app.config import settings
+
+    create_tasks(db, owner, settings.TASKS_MAX_PAGE_SIZE + 5, datetime.now())
+    repo = TaskRepository(db)
+
+    assert len(repo.get_user_tasks(owner.id, limit=1000000)) == settings.TASKS_MAX_PAGE_SIZE
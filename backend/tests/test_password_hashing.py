@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from app import security
+from app.application.services.auth_service import AuthService
+from app.infrastructure.services.worker_pool import BoundedWorkerPool, WorkerPoolFull
+
+
+@pytest.fixture
+def fast_hashing():
+    """Hash at the lowest bcrypt cost so that tests stay quick"""
+    with patch("app.security.pwd_context", security.create_password_context(["bcrypt"], 4)):
+        yield
+
+
+@pytest.fixture
+def blocked_pool():
+    """A pool with one worker and no queue, kept busy until the test ends"""
+    pool = BoundedWorkerPool("test", workers=1, max_pending=0)
+    release = threading.Event()
+    busy = pool.submit(release.wait)
+    yield pool
+    release.set()
+    busy.result()
+
+
+def test_pool_rejects_work_beyond_its_queue():
+    pool = BoundedWorkerPool("test", workers=1, max_pending=1)
+    release = threading.Event()
+    running = pool.submit(release.wait)
+    queued = pool.submit(lambda: "done")
+
+    with pytest.raises(WorkerPoolFull):
+        pool.submit(lambda: "rejected")
+    assert pool.in_flight == 2
+
+    release.set()
+    assert queued.result() == "done"
+    running.result()
+    assert pool.in_flight == 0
+    assert pool.run(lambda x: x * 2, 21) == 42
+
+
+@pytest.mark.asyncio
+async def test_pool_keeps_event_loop_free(blocked_pool):
+    other = BoundedWorkerPool("test", workers=1, max_pending=0)
+    started = threading.Event()
+
+    def work():
+        started.set()
+        return "hashed"
+
+    result = asyncio.ensure_future(other.run_async(work))
+    # The loop keeps running other coroutines while the call is on the pool
+    while not started.is_set():
+        await asyncio.sleep(0.001)
+
+    assert await result == "hashed"
+    with pytest.raises(WorkerPoolFull):
+        await blocked_pool.run_async(work)
+
+
+@pytest.mark.asyncio
+async def test_verify_and_update_rehashes_outdated_cost(fast_hashing):
+    current = security.get_password_hash("secret")
+    outdated = bcrypt.using(rounds=5).hash("secret")
+
+    assert await security.verify_and_update_password("secret", current) == (True, None)
+    assert await security.verify_and_update_password("wrong", outdated) == (False, None)
+
+    verified, new_hash = await security.verify_and_update_password("secret", outdated)
+    assert verified
+    assert new_hash.startswith("$2b$04$")
+    assert security.verify_password("secret", new_hash)
+
+
+@pytest.mark.asyncio
+async def test_verify_and_update_checks_dummy_hash_for_unknown_user(fast_hashing):
+    assert await security.verify_and_update_password("secret", None) == (False, None)
+
+
+def test_context_without_bcrypt():
+    context = security.create_password_context(["sha256_crypt"], 12)
+
+    assert context.identify(context.hash("secret")) == "sha256_crypt"
+
+
+@pytest.mark.asyncio
+async def test_login_stores_rehashed_password(fast_hashing):
+    user = MagicMock(id=7, hashed_password=bcrypt.using(rounds=5).hash("secret"))
+    repo = MagicMock()
+    repo.get_user_by_username.return_value = user
+
+    assert await AuthService(repo).login_user("alice", "secret") is user
+
+    user_id, new_hash = repo.update_password_hash.call_args.args
+    assert user_id == 7
+    assert new_hash.startswith("$2b$04$")
+
+
+@pytest.mark.asyncio
+async def test_login_queries_repository_off_the_event_loop(fast_hashing):
+    loop_thread = threading.get_ident()
+    threads = []
+    user = MagicMock(id=7, hashed_password=bcrypt.using(rounds=5).hash("secret"))
+
+    def record(result):
+        def call(*args):
+            threads.append(threading.get_ident())
+            return result
+        return call
+
+    repo = MagicMock()
+    repo.get_user_by_username.side_effect = record(user)
+    repo.update_password_hash.side_effect = record(None)
+
+    await AuthService(repo).login_user("alice", "secret")
+
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+@pytest.mark.asyncio
+async def test_login_unknown_user_is_unauthorized(fast_hashing):
+    repo = MagicMock()
+    repo.get_user_by_username.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await AuthService(repo).login_user("nobody", "secret")
+
+    assert exc_info.value.status_code == 401
+    repo.update_password_hash.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_login_sheds_load_when_pool_is_full(blocked_pool):
+    repo = MagicMock()
+    repo.get_user_by_username.return_value = MagicMock(hashed_password=bcrypt.using(rounds=4).hash("secret"))
+
+    with patch("app.security.password_hashing_pool", blocked_pool):
+        with pytest.raises(HTTPException) as exc_info:
+            await AuthService(repo).login_user("alice", "secret")
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+
+def test_register_sheds_load_when_pool_is_full(blocked_pool):
+    from app.application.schemas.user import UserCreate
+    from app.infrastructure.repositories.user_repository import UserRepository
+
+    repo = MagicMock()
+    repo.get_user_by_email.return_value = None
+    repo.get_user_by_username.return_value = None
+    repo.create_user.side_effect = lambda user: UserRepository.create_user(MagicMock(), user)
+
+    with patch("app.security.password_hashing_pool", blocked_pool):
+        with pytest.raises(HTTPException) as exc_info:
+            AuthService(repo).register_user(UserCreate(email="a@example.com", username="alice", password="secret"))
+
+    assert exc_info.value.status_code == 503
@@ -0,0 +1,107 @@
+import time
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from jose import JWTError, jwt
+
+from app import security
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.presentation.dependencies import get_current_active_user, get_current_user
+
+
+@pytest.fixture
+def principal_cache():
+    """Replace the user repository's Redis helpers with an in-memory dict"""
+    store = {}
+    module = "app.infrastructure.repositories.user_repository"
+
+    def bump_cache_versions(*keys):
+        for key in keys:
+            store[key] = store.get(key, 0) + 1
+
+    with patch(f"{module}.get_cache", side_effect=store.get), \
+         patch(f"{module}.set_cache", side_effect=lambda key, value, expiry=3600: store.__setitem__(key, value)), \
+         patch(f"{module}.get_cache_version", side_effect=lambda key: store.get(key, 0)), \
+         patch(f"{module}.bump_cache_versions", side_effect=bump_cache_versions):
+        yield store
+
+
+@pytest.fixture
+def token_cache():
+    with patch.object(security, "_verified_tokens", security.LocalCache(max_entries=10, default_ttl=3600)) as cache:
+        yield cache
+
+
+def test_principal_is_cached(db, owner, principal_cache):
+    repo = UserRepository(db)
+    with patch.object(repo, "get_user_by_username", wraps=repo.get_user_by_username) as load:
+        first = repo.get_principal(owner.username)
+        second = repo.get_principal(owner.username)
+
+    assert load.call_count == 1
+    assert (second.id, second.username, second.is_active, second.role) == (owner.id, "owner", True, "user")
+    assert first.id == second.id
+
+
+def test_cached_request_needs_no_database(db, owner, principal_cache, token_cache):
+    token = security.create_access_token(owner.username)
+    UserRepository(db).get_principal(owner.username)
+
+    session = MagicMock()
+    user = get_current_active_user(get_current_user(db=session, token=token))
+
+    assert user.id == owner.id
+    assert session.mock_calls == []
+
+
+def test_access_changes_invalidate_the_principal(db, owner, principal_cache):
+    from fastapi import HTTPException
+
+    repo = UserRepository(db)
+    repo.get_principal(owner.username)
+
+    repo.update_user_access(owner.id, is_active=False, role="admin")
+
+    assert principal_cache[f"user:principal:{owner.username}:version"] == 1
+    principal = repo.get_principal(owner.username)
+    assert (principal.is_active, principal.role) == (False, "admin")
+    with pytest.raises(HTTPException):
+        get_current_active_user(principal)
+
+
+def test_principal_loaded_before_an_access_change_is_not_served_after_it(db, owner, principal_cache):
+    """Test that a read racing with a deactivation cannot cache the old principal"""
+    from app.domain.models.user import User
+
+    repo = UserRepository(db)
+    stale = User(id=owner.id, username=owner.username, is_active=True, role="user")
+
+    def load_then_change(username):
+        # The user is read, then deactivated before the read fills the cache
+        repo.update_user_access(owner.id, is_active=False)
+        return stale
+
+    with patch.object(repo, "get_user_by_username", side_effect=load_then_change):
+        assert repo.get_principal(owner.username).is_active
+
+    assert repo.get_principal(owner.username).is_active is False
+
+
+def test_token_verification_is_memoized(token_cache):
+    token = security.create_access_token("owner")
+    with patch.object(security.jwt, "decode", wraps=jwt.decode) as decode:
+        assert security.decode_access_token(token)["sub"] == "owner"
+        assert security.decode_access_token(token)["sub"] == "owner"
+
+    assert decode.call_count == 1
+
+
+def test_invalid_and_expired_tokens_are_rejected(token_cache):
+    expired = security.create_access_token("owner", expires_delta=timedelta(seconds=-1))
+    forged = jwt.encode({"sub": "owner", "exp": time.time() + 60}, "not-the-secret", algorithm=security.ALGORITHM)
+
+    for token in (expired, forged):
+        with pytest.raises(JWTError):
+            security.decode_access_token(token)
+    assert token_cache.stats()["entries"] == 0
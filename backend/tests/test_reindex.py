@@ -0,0 +1,222 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from app.application.schemas.task import TaskCreate
+from app.application.services.reindex_service import ReindexService
+from app.infrastructure.repositories.task_repository import TaskRepository
+from app.infrastructure.services.elastic import bulk_index_documents
+
+
+def fake_bulk_index(index_name, documents, **kwargs):
+    for document_id, document in documents:
+        yield (document["title"] != "Broken", {"index": {"_id": document_id}})
+
+
+@pytest.fixture
+def tasks(db, owner, fake_redis):
+    repo = TaskRepository(db)
+    return [repo.create_task(TaskCreate(title=title), owner.id) for title in ("One", "Two", "Broken")]
+
+
+def test_reindex_streams_and_reports_progress(db, tasks):
+    progress = []
+    with patch("app.infrastructure.repositories.task_repository.bulk_index_documents",
+               side_effect=fake_bulk_index), \
+         patch("app.infrastructure.repositories.task_repository.settings.REINDEX_CHUNK_SIZE", 2):
+        count = TaskRepository(db).reindex_all_tasks(progress=lambda *state: progress.append(state))
+
+    assert count == 2
+    assert progress == [(2, 0, 3), (2, 1, 3)]
+
+
+def test_bulk_index_documents_picks_parallel_or_streaming_bulk():
+    documents = [("1", {"title": "One"})]
+    with patch("app.infrastructure.services.elastic.helpers") as helpers:
+        bulk_index_documents("tasks", documents, chunk_size=10, thread_count=4)
+        bulk_index_documents("tasks", documents, chunk_size=10, thread_count=1)
+
+    assert helpers.parallel_bulk.call_args.kwargs["thread_count"] == 4
+    assert helpers.streaming_bulk.call_args.kwargs["chunk_size"] == 10
+    actions = list(helpers.parallel_bulk.call_args[0][1])
+    assert actions == [{"_op_type": "index", "_index": "tasks", "_id": "1", "_source": {"title": "One"}}]
+
+
+def test_bulk_index_documents_routes_by_field():
+    with patch("app.infrastructure.services.elastic.helpers") as helpers:
+        bulk_index_documents("tasks", [("1", {"owner_id": 7})], routing_field="owner_id")
+
+    assert list(helpers.streaming_bulk.call_args[0][1])[0]["_routing"] == "7"
+
+
+def test_bulk_create_treats_existing_documents_as_done():
+    results = [(False, {"create": {"_id": "1", "status": 409}}), (False, {"create": {"_id": "2", "status": 500}})]
+    with patch("app.infrastructure.services.elastic.helpers") as helpers:
+        helpers.streaming_bulk.return_value = iter(results)
+        outcome = list(bulk_index_documents("tasks_v2", [], op_type="create"))
+
+    assert [ok for ok, _ in outcome] == [True, False]
+
+
+@pytest.fixture
+def index_build():
+    module = "app.infrastructure.repositories.task_repository"
+    with patch(f"{module}.begin_task_index_build", return_value="todolist_tasks_v2") as begin, \
+         patch(f"{module}.finish_task_index_build") as finish, \
+         patch(f"{module}.abort_task_index_build") as abort:
+        yield begin, finish, abort
+
+
+def wait_for(service, job_id):
+    deadline = time.monotonic() + 5
+    while service.get_job(job_id)["status"] == "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return service.get_job(job_id)
+
+
+def test_rebuild_backfills_new_version_then_swaps(db, tasks, index_build):
+    begin, finish, abort = index_build
+    with patch("app.infrastructure.repositories.task_repository.bulk_index_documents",
+               side_effect=lambda index_name, documents, **kwargs: ((True, {}) for _ in documents)) as bulk:
+        assert TaskRepository(db).rebuild_search_index() == "todolist_tasks_v2"
+
+    assert bulk.call_args[0][0] == "todolist_tasks_v2"
+    assert bulk.call_args.kwargs["op_type"] == "create"
+    assert bulk.call_args.kwargs["routing_field"] == "owner_id"
+    finish.assert_called_once_with("todolist_tasks_v2")
+    abort.assert_not_called()
+
+
+def test_reindex_job_runs_in_background(db, tasks, index_build):
+    _, finish, abort = index_build
+    service = ReindexService(sessionmaker(bind=db.get_bind()), TaskRepository)
+    with patch("app.infrastructure.repositories.task_repository.bulk_index_documents",
+               side_effect=fake_bulk_index):
+        status = wait_for(service, service.start_job()["job_id"])
+
+    # One task failed to index: the new version is dropped, the old one keeps serving
+    assert status["status"] == "failed"
+    assert (status["indexed"], status["failed"], status["total"]) == (2, 1, 3)
+    abort.assert_called_once_with("todolist_tasks_v2")
+    finish.assert_not_called()
+
+    with pytest.raises(HTTPException) as excinfo:
+        service.get_job("unknown")
+    assert excinfo.value.status_code == 404
+
+
+class FakeLock:
+    def __init__(self, held_elsewhere=False):
+        self.held_elsewhere = held_elsewhere
+        self.held = False
+        self.extended = 0
+
+    def acquire(self):
+        self.held = not self.held_elsewhere
+        return self.held
+
+    def extend(self):
+        self.extended += 1
+        return self.held
+
+    def release(self):
+        self.held = False
+
+
+def test_reindex_job_holds_the_cluster_lock_while_it_runs(db, tasks, index_build):
+    lock = FakeLock()
+    service = ReindexService(sessionmaker(bind=db.get_bind()), TaskRepository, job_lock=lock)
+    with patch("app.infrastructure.repositories.task_repository.bulk_index_documents",
+               side_effect=lambda index_name, documents, **kwargs: ((True, {}) for _ in documents)):
+        status = wait_for(service, service.start_job()["job_id"])
+
+    assert status["status"] == "completed"
+    # Renewed with every progress report, released at the end
+    assert lock.extended >= 1
+    assert not lock.held
+
+
+def test_reindex_job_is_refused_while_another_worker_runs_one(db, index_build):
+    begin, _, _ = index_build
+    service = ReindexService(sessionmaker(bind=db.get_bind()), TaskRepository, job_lock=FakeLock(held_elsewhere=True))
+
+    with pytest.raises(HTTPException) as excinfo:
+        service.start_job()
+
+    assert excinfo.value.status_code == 409
+    begin.assert_not_called()
+
+
+class FakeJobStore:
+    def __init__(self):
+        self.statuses = {}
+        self.saves = 0
+
+    def save(self, job_id, status):
+        self.saves += 1
+        self.statuses[job_id] = status
+
+    def load(self, job_id):
+        return self.statuses.get(job_id)
+
+
+def test_reindex_job_can_be_polled_on_another_worker(db, tasks, index_build):
+    store = FakeJobStore()
+    session_factory = sessionmaker(bind=db.get_bind())
+    worker = ReindexService(session_factory, TaskRepository, job_store=store)
+    other_worker = ReindexService(session_factory, TaskRepository, job_store=store)
+    with patch("app.infrastructure.repositories.task_repository.bulk_index_documents",
+               side_effect=fake_bulk_index):
+        job_id = worker.start_job()["job_id"]
+        wait_for(worker, job_id)
+
+    status = other_worker.get_job(job_id)
+    assert status["status"] == "failed"
+    assert (status["indexed"], status["failed"], status["total"]) == (2, 1, 3)
+    assert status["started_at"] == worker.get_job(job_id)["started_at"]
+    # Saved on start, with every progress report and at the end
+    assert store.saves >= 3
+    with pytest.raises(HTTPException) as excinfo:
+        other_worker.get_job("unknown")
+    assert excinfo.value.status_code == 404
+
+
+def test_redis_job_store_expires_statuses():
+    from app.infrastructure.services.redis import RedisJobStore
+
+    store = RedisJobStore("search:reindex:job", ttl=60)
+    with patch("app.infrastructure.services.redis.redis_client") as client:
+        store.save("abc", {"status": "running"})
+        key, value = client.set.call_args.args
+        assert key == "search:reindex:job:abc"
+        assert client.set.call_args.kwargs == {"ex": 60}
+
+        client.get.return_value = value
+        assert store.load("abc") == {"status": "running"}
+        client.get.return_value = None
+        assert store.load("abc") is None
+
+
+@pytest.mark.parametrize("module", ["tasks", "tasks_async"])
+def test_reindex_route_only_accepts_post(module):
+    """A crawler or a link prefetch must not start a rebuild"""
+    import importlib
+
+    router = importlib.import_module(f"app.presentation.routers.{module}").router
+    assert [route.methods for route in router.routes if route.path == "/reindex"] == [{"POST"}]
+
+
+def test_begin_build_drops_its_index_when_the_alias_update_fails():
+    from app.infrastructure.services import elastic
+
+    with patch.object(elastic, "es_client") as es_client, \
+         patch.object(elastic, "get_task_index_versions", return_value={1: "todolist_tasks_v1"}), \
+         patch.object(elastic, "get_alias_indices", return_value=[]):
+        es_client.indices.update_aliases.side_effect = ConnectionError("timeout")
+        with pytest.raises(ConnectionError):
+            elastic.begin_task_index_build()
+
+    es_client.indices.delete.assert_called_once_with(index="todolist_tasks_v2", ignore_unavailable=True)
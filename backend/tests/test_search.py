@@ -3,18 +3,22 @@ from unittest.mock import patch, MagicMock
 from datetime import datetime
 
 from app.infrastructure.repositories.task_repository import TaskRepository
+from app.infrastructure.services.elastic import TASK_INDEX
 from app.domain.models.task import Task, PriorityEnum
 
 @pytest.fixture
 def mock_es_search():
     """Mock the Elasticsearch search function"""
-    with patch('app.infrastructure.repositories.task_repository.search_documents') as mock:
+    with patch('app.infrastructure.services.search_backend.search_documents_page') as mock:
         yield mock
 
 @pytest.fixture
-def mock_index_document():
-    """Mock the Elasticsearch index_document function"""
-    with patch('app.infrastructure.repositories.task_repository.index_document') as mock:
+def mock_bulk_index():
+    """Mock the Elasticsearch bulk indexing helper, acknowledging every document"""
+    def bulk_index(index_name, documents, **kwargs):
+        return ((True, {"index": {"_id": document_id}}) for document_id, _ in documents)
+
+    with patch('app.infrastructure.repositories.task_repository.bulk_index_documents', side_effect=bulk_index) as mock:
         yield mock
 
 @pytest.fixture
@@ -23,7 +27,7 @@ def mock_task_db():
     mock_db = MagicMock()
     return mock_db
 
-def test_search_tasks_with_elasticsearch(mock_es_search, mock_task_db):
+def test_search_tasks_with_elasticsearch(mock_es_search, mock_task_db, fake_redis):
     """Test that search uses Elasticsearch properly"""
     # Set up mock Elasticsearch response
     mock_es_search.return_value = [
@@ -37,7 +41,7 @@ def test_search_tasks_with_elasticsearch(mock_es_search, mock_task_db):
             "priority": "high",
             "owner_id": 1
         }
-    ]
+    ], None, None
     
     # Create task repository
     repo = TaskRepository(mock_task_db)
@@ -48,16 +52,20 @@ def test_search_tasks_with_elasticsearch(mock_es_search, mock_task_db):
     # Verify Elasticsearch was called correctly
     mock_es_search.assert_called_once()
     args, kwargs = mock_es_search.call_args
-    assert args[0] == "tasks"  # index name
+    assert args[0] == TASK_INDEX  # read alias
     assert args[1] == "Test Task"  # query
     assert "title^3" in kwargs["fields"]  # title field should have boosted relevance
+    assert kwargs["filters"] == {"owner_id": 1}  # filtered by ES, not in Python
+    assert kwargs["routing"] == "1"  # only the owner's shard is searched
+    assert kwargs["sort"][:2] == [{"owner_id": "asc"}, {"due_date": "asc"}]  # follows the index sort
+    assert kwargs["track_total_hits"] is False  # shards may stop early on the index sort
     
     # Check results
     assert len(results) == 1
     assert results[0].title == "Test Task"
     assert results[0].owner_id == 1
     
-def test_search_tasks_with_fallback(mock_es_search, mock_task_db):
+def test_search_tasks_with_fallback(mock_es_search, mock_task_db, fake_redis):
     """Test that search falls back to database when Elasticsearch fails"""
     # Make Elasticsearch search raise an exception
     mock_es_search.side_effect = Exception("Elasticsearch error")
@@ -73,7 +81,7 @@ def test_search_tasks_with_fallback(mock_es_search, mock_task_db):
         due_date=datetime.now(),
         priority=PriorityEnum.normal
     )
-    mock_task_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [mock_task]
+    mock_task_db.scalars.return_value.all.return_value = [mock_task]
     
     # Create task repository
     repo = TaskRepository(mock_task_db)
@@ -88,7 +96,7 @@ def test_search_tasks_with_fallback(mock_es_search, mock_task_db):
     assert len(results) == 1
     assert results[0].title == "Database Task"
     
-def test_reindex_all_tasks(mock_index_document, mock_task_db):
+def test_reindex_all_tasks(mock_bulk_index, mock_task_db):
     """Test that reindex_all_tasks indexes all tasks in Elasticsearch"""
     # Set up mock database response
     mock_tasks = [
@@ -113,7 +121,7 @@ def test_reindex_all_tasks(mock_index_document, mock_task_db):
             priority=PriorityEnum.high
         )
     ]
-    mock_task_db.query.return_value.all.return_value = mock_tasks
+    mock_task_db.query.return_value.order_by.return_value.yield_per.return_value = iter(mock_tasks)
     
     # Create task repository
     repo = TaskRepository(mock_task_db)
@@ -121,6 +129,397 @@ def test_reindex_all_tasks(mock_index_document, mock_task_db):
     # Reindex all tasks
     count = repo.reindex_all_tasks()
     
-    # Verify index_document was called for each task
-    assert mock_index_document.call_count == 2
-    assert count == 2 
\ No newline at end of file
+    # Verify the tasks were streamed to a single bulk pipeline
+    mock_bulk_index.assert_called_once()
+    assert mock_bulk_index.call_args[0][0] == TASK_INDEX
+    assert count == 2 
+
+
+@pytest.fixture
+def mock_es_client():
+    """Mock the Elasticsearch client used for index management"""
+    with patch('app.infrastructure.services.elastic.es_client') as mock:
+        yield mock
+
+def test_setup_elasticsearch_creates_first_version_behind_alias(mock_es_client):
+    """Test that a missing alias gets a fresh versioned index"""
+    from elasticsearch import NotFoundError
+    from app.infrastructure.services.elastic import setup_elasticsearch
+
+    mock_es_client.indices.get_alias.side_effect = NotFoundError("missing", MagicMock(), {})
+    mock_es_client.indices.get.return_value = {}
+
+    assert setup_elasticsearch() is True
+
+    create_kwargs = mock_es_client.indices.create.call_args.kwargs
+    assert create_kwargs["index"] == f"{TASK_INDEX}_v1"
+    assert create_kwargs["settings"]["sort.field"] == ["owner_id", "due_date"]
+    mock_es_client.indices.update_aliases.assert_called_once_with(
+        actions=[{"add": {"index": f"{TASK_INDEX}_v1", "alias": TASK_INDEX}}]
+    )
+
+def test_finish_index_build_swaps_alias_atomically(mock_es_client):
+    """Test that the read alias moves in one call and old versions are collected"""
+    from app.infrastructure.services.elastic import finish_task_index_build
+
+    aliases = {TASK_INDEX: {f"{TASK_INDEX}_v2": {}}, f"{TASK_INDEX}_building": {f"{TASK_INDEX}_v3": {}}}
+    mock_es_client.indices.get_alias.side_effect = lambda name: aliases[name]
+    mock_es_client.indices.get.return_value = {f"{TASK_INDEX}_v{n}": {} for n in (1, 2, 3)}
+
+    finish_task_index_build(f"{TASK_INDEX}_v3")
+
+    mock_es_client.indices.update_aliases.assert_called_once_with(actions=[
+        {"remove": {"index": f"{TASK_INDEX}_v2", "alias": TASK_INDEX}},
+        {"remove": {"index": f"{TASK_INDEX}_v3", "alias": f"{TASK_INDEX}_building"}},
+        {"add": {"index": f"{TASK_INDEX}_v3", "alias": TASK_INDEX}},
+    ])
+    # v2 is kept for rollback, v1 is deleted
+    mock_es_client.indices.delete.assert_called_once_with(index=f"{TASK_INDEX}_v1")
+    assert mock_es_client.indices.put_settings.call_args.kwargs["settings"]["refresh_interval"] == "1s"
+
+def test_build_search_query_filters_in_filter_context():
+    """Test that structured filters become cached term filters"""
+    from app.infrastructure.services.elastic import build_search_query
+
+    body = build_search_query("milk", ["title"], size=10, filters={"owner_id": 7})
+
+    assert body["query"]["bool"]["must"]["multi_match"]["query"] == "milk"
+    assert body["query"]["bool"]["filter"] == [{"term": {"owner_id": 7}}]
+    assert body["size"] == 10
+
+def test_build_search_query_sorts_without_counting_hits():
+    """Test that a sort is sent to ES and total hits are not tracked by default"""
+    from app.infrastructure.services.elastic import build_search_query, TASK_SEARCH_SORTS
+
+    body = build_search_query("milk", ["title"], sort=TASK_SEARCH_SORTS["priority"])
+
+    assert body["sort"][:2] == [{"priority_rank": "desc"}, {"due_date": "asc"}]
+    assert body["track_total_hits"] is False
+    assert build_search_query("milk", sort=TASK_SEARCH_SORTS["relevance"])["sort"][0] == {"_score": "desc"}
+    assert build_search_query("milk", track_total_hits=10000)["track_total_hits"] == 10000
+
+def test_search_keeps_elasticsearch_order(mock_es_search, mock_task_db, fake_redis):
+    """Test that hits are returned in ES order, not re-sorted in Python"""
+    mock_es_search.return_value = [
+        {"id": n, "title": f"Task {n}", "owner_id": 1, "priority": "normal", "priority_rank": 1,
+         "due_date": datetime(2030, 1, 3 - n).isoformat()}
+        for n in (1, 2)
+    ], None, None
+
+    results = TaskRepository(mock_task_db).search_tasks("Task", 1, sort="relevance")
+
+    assert mock_es_search.call_args.kwargs["sort"][0] == {"_score": "desc"}
+    assert [task.id for task in results] == [1, 2]
+
+def test_search_document_has_priority_rank(mock_task_db):
+    """Test that indexed documents carry a sortable priority rank"""
+    task = Task(id=1, title="Rank", owner_id=1, priority=PriorityEnum.high)
+
+    document = TaskRepository(mock_task_db)._search_document(task)
+
+    assert document["priority"] == "high"
+    assert document["priority_rank"] == 2
+
+def test_search_pages_resume_with_search_after(mock_es_search, mock_task_db, fake_redis):
+    """Test that a full page returns a cursor that resumes after its last hit"""
+    documents = [{"id": n, "title": f"Task {n}", "owner_id": 1} for n in (1, 2)]
+    mock_es_search.return_value = documents, ["1", 1700000000000, 2], None
+    repo = TaskRepository(mock_task_db)
+
+    page, cursor = repo.search_tasks_page("Task", 1, limit=2)
+    assert [task.id for task in page] == [1, 2]
+    assert cursor is not None
+
+    mock_es_search.return_value = [{"id": 3, "title": "Task 3", "owner_id": 1}], ["1", 1700000000001, 3], None
+    page, next_cursor = repo.search_tasks_page("Task", 1, limit=2, cursor=cursor)
+
+    assert mock_es_search.call_args.kwargs["search_after"] == ["1", 1700000000000, 2]
+    assert [task.id for task in page] == [3]
+    assert next_cursor is None
+
+def test_search_page_falls_back_to_database_at_cursor_offset(mock_es_search, mock_task_db, fake_redis):
+    """Test that a walk continues from the database when ES fails mid-way"""
+    from app.application.pagination import encode_search_cursor
+
+    mock_es_search.side_effect = Exception("Elasticsearch error")
+    mock_task_db.scalars.return_value.all.return_value = []
+
+    TaskRepository(mock_task_db).search_tasks_page(
+        "Task", 1, limit=10, cursor=encode_search_cursor("due_date", 10, ["1", 0, 10])
+    )
+
+    statement = mock_task_db.scalars.call_args.args[0]
+    assert statement.compile(compile_kwargs={"literal_binds": True}).string.endswith("OFFSET 10")
+
+def test_search_cursor_must_match_sort(mock_es_search, mock_task_db):
+    """Test that a cursor cannot be replayed with another sort"""
+    from app.application.pagination import encode_search_cursor
+
+    with pytest.raises(ValueError):
+        TaskRepository(mock_task_db).search_tasks_page(
+            "Task", 1, sort="priority", cursor=encode_search_cursor("due_date", 10, [1])
+        )
+
+def test_search_page_uses_point_in_time(mock_es_search, mock_task_db, fake_redis):
+    """Test that the first page opens a PIT and the last page closes it"""
+    from app.config import settings
+
+    module = 'app.infrastructure.services.search_backend'
+    mock_es_search.return_value = [{"id": 1, "title": "Task", "owner_id": 1}], [1], "pit-2"
+    with patch.object(settings, "SEARCH_USE_POINT_IN_TIME", True), \
+         patch(f"{module}.open_point_in_time", return_value="pit-1") as open_pit, \
+         patch(f"{module}.close_point_in_time") as close_pit:
+        TaskRepository(mock_task_db).search_tasks_page("Task", 1, limit=5)
+
+    open_pit.assert_called_once_with(TASK_INDEX, settings.SEARCH_POINT_IN_TIME_KEEP_ALIVE, routing="1")
+    assert mock_es_search.call_args.kwargs["pit_id"] == "pit-1"
+    close_pit.assert_called_once_with("pit-2")
+
+def test_search_passes_configured_total_hit_tracking(mock_es_search, mock_task_db, fake_redis):
+    """Test that SEARCH_TRACK_TOTAL_HITS reaches the search request"""
+    from app.config import settings
+
+    mock_es_search.return_value = [], None, None
+    with patch.object(settings, "SEARCH_TRACK_TOTAL_HITS", 10000):
+        TaskRepository(mock_task_db).search_tasks_page("Task", 1, limit=5)
+
+    assert mock_es_search.call_args.kwargs["track_total_hits"] == 10000
+
+def test_search_documents_page_with_pit_omits_index_and_routing():
+    """Test that PIT searches address the snapshot, not the index"""
+    from app.infrastructure.services.elastic import search_documents_page
+
+    with patch('app.infrastructure.services.elastic.es_client') as mock_client:
+        search = mock_client.options.return_value.search
+        search.return_value = {"pit_id": "pit-2", "hits": {"hits": [
+            {"_source": {"id": 1}, "sort": [1, 1]}
+        ]}}
+        documents, search_after, pit_id = search_documents_page(
+            TASK_INDEX, "milk", size=1, routing="1", sort=[{"id": "asc"}],
+            search_after=[0, 0], pit_id="pit-1", keep_alive="1m"
+        )
+
+    body = search.call_args.kwargs["body"]
+    assert "index" not in search.call_args.kwargs
+    assert body["pit"] == {"id": "pit-1", "keep_alive": "1m"}
+    assert body["search_after"] == [0, 0]
+    assert (documents, search_after, pit_id) == ([{"id": 1}], [1, 1], "pit-2")
+
+def test_database_fallback_uses_fts5_index(db, owner, fake_redis, mock_es_search):
+    """Test that the SQLite fallback matches through FTS5, kept in sync by triggers"""
+    from app.application.schemas.task import TaskCreate, TaskUpdate
+
+    mock_es_search.side_effect = Exception("Elasticsearch error")
+    repo = TaskRepository(db)
+    milk = repo.create_task(TaskCreate(title="Buy milk", description="Semi-skimmed"), owner.id)
+    bread = repo.create_task(TaskCreate(title="Bake bread"), owner.id)
+    repo.create_task(TaskCreate(title="Call mum"), owner.id)
+
+    assert [task.id for task in repo.search_tasks("milk", owner.id)] == [milk.id]
+    assert [task.id for task in repo.search_tasks("skim", owner.id)] == [milk.id]  # prefix match
+    assert repo.search_tasks('milk" OR "mum', owner.id) == []  # input is not FTS5 syntax
+
+    repo.update_task(bread.id, TaskUpdate(title="Buy bread"), owner.id)
+    repo.delete_task(milk.id, owner.id)
+
+    assert [task.id for task in repo.search_tasks("buy", owner.id)] == [bread.id]
+
+def test_postgres_fallback_matches_search_vector():
+    """Test that the PostgreSQL fallback queries the GIN-indexed tsvector column"""
+    from sqlalchemy.dialects import postgresql
+    from app.infrastructure.db.task_search import task_text_match
+
+    condition, rank = task_text_match("postgresql", "buy milk")
+
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+    assert "tasks.search_vector @@ to_tsquery" in sql
+    assert rank is not None
+
+def test_repeated_search_is_served_from_cache(db, owner, fake_redis, mock_es_search):
+    """Test that the same normalized search skips ES until the user writes"""
+    from app.application.schemas.task import TaskCreate
+
+    repo = TaskRepository(db)
+    task = repo.create_task(TaskCreate(title="Buy milk"), owner.id)
+    mock_es_search.return_value = [repo._search_document(task)], None, None
+
+    assert [t.id for t in repo.search_tasks("Milk", owner.id)] == [task.id]
+    assert [t.id for t in repo.search_tasks("  milk ", owner.id)] == [task.id]
+    assert mock_es_search.call_count == 1
+
+    repo.search_tasks("milk", owner.id, sort="priority")  # another sort is another entry
+    assert mock_es_search.call_count == 2
+
+    repo.create_task(TaskCreate(title="Oat milk"), owner.id)
+    repo.search_tasks("milk", owner.id)
+    assert mock_es_search.call_count == 3
+
+def test_oversized_search_pages_are_not_cached(db, owner, fake_redis, mock_es_search):
+    """Test that pages above SEARCH_CACHE_MAX_BYTES always go to ES"""
+    from app.config import settings
+
+    mock_es_search.return_value = [{"id": 1, "title": "x" * 100, "owner_id": owner.id}], None, None
+    repo = TaskRepository(db)
+    with patch.object(settings, "SEARCH_CACHE_MAX_BYTES", 50):
+        assert [t.id for t in repo.search_tasks("x", owner.id)] == [1]
+        repo.search_tasks("x", owner.id)
+
+    assert mock_es_search.call_count == 2
+
+def test_build_suggest_query_matches_prefix_ngrams():
+    """Test that typeahead queries the search_as_you_type subfields and fetches little"""
+    from app.infrastructure.services.elastic import build_suggest_query
+
+    body = build_suggest_query("buy mi", "title.suggest", size=5, filters={"owner_id": 7}, timeout="300ms")
+
+    multi_match = body["query"]["bool"]["must"]["multi_match"]
+    assert multi_match["type"] == "bool_prefix"
+    assert multi_match["fields"] == ["title.suggest", "title.suggest._2gram", "title.suggest._3gram"]
+    assert body["query"]["bool"]["filter"] == [{"term": {"owner_id": 7}}]
+    assert body["_source"] == ["id", "title"]
+    assert body["timeout"] == "300ms"
+
+def test_suggest_is_cached_until_the_user_writes(db, owner, fake_redis):
+    """Test that repeated keystrokes are answered from the cache"""
+    import json
+    from app.application.schemas.task import TaskCreate
+
+    repo = TaskRepository(db)
+    with patch('app.infrastructure.services.search_backend.suggest_documents',
+               return_value=[{"id": 1, "title": "Buy milk"}]) as suggest:
+        assert json.loads(repo.suggest_tasks_json("bu", owner.id)) == [{"id": 1, "title": "Buy milk"}]
+        repo.suggest_tasks_json("bu", owner.id)
+        assert suggest.call_count == 1
+        assert suggest.call_args.kwargs["routing"] == str(owner.id)
+
+        repo.create_task(TaskCreate(title="Bury treasure"), owner.id)
+        repo.suggest_tasks_json("bu", owner.id)
+        assert suggest.call_count == 2
+
+def test_suggest_falls_back_to_database(db, owner, fake_redis):
+    """Test that typeahead matches title prefixes in the database when ES fails"""
+    import json
+    from app.application.schemas.task import TaskCreate
+
+    repo = TaskRepository(db)
+    task = repo.create_task(TaskCreate(title="Buy milk"), owner.id)
+    repo.create_task(TaskCreate(title="Call mum"), owner.id)
+    with patch('app.infrastructure.services.search_backend.suggest_documents',
+               side_effect=Exception("timeout")):
+        assert json.loads(repo.suggest_tasks_json("buy mi", owner.id)) == [{"id": task.id, "title": "Buy milk"}]
+
+def test_task_stats_from_one_aggregation(db, owner, fake_redis):
+    """Test that stats are read from a single owner-routed aggregation and cached until a write"""
+    import json
+    from app.application.schemas.task import TaskCreate
+
+    aggregations = {"completed": {"buckets": [
+        {"key": 1, "key_as_string": "true", "doc_count": 2, "priority": {"buckets": [
+            {"key": "high", "doc_count": 2, "due": {"buckets": []}},
+        ]}},
+        {"key": 0, "key_as_string": "false", "doc_count": 3, "priority": {"buckets": [
+            {"key": "normal", "doc_count": 3, "due": {"buckets": [
+                {"key": "overdue", "doc_count": 1},
+                {"key": "today", "doc_count": 0},
+                {"key": "next_7_days", "doc_count": 2},
+                {"key": "later", "doc_count": 0},
+            ]}},
+        ]}},
+    ]}}
+    repo = TaskRepository(db)
+    with patch('app.infrastructure.services.search_backend.aggregate_documents',
+               return_value=aggregations) as aggregate:
+        stats = json.loads(repo.get_task_stats_json(owner.id))
+        repo.get_task_stats_json(owner.id)
+        assert aggregate.call_count == 1
+
+        repo.create_task(TaskCreate(title="New"), owner.id)
+        repo.get_task_stats_json(owner.id)
+        assert aggregate.call_count == 2
+
+    args, kwargs = aggregate.call_args
+    assert args[0] == TASK_INDEX
+    assert kwargs == {"filters": {"owner_id": owner.id}, "routing": str(owner.id)}
+    due_ranges = args[1]["completed"]["aggs"]["priority"]["aggs"]["due"]["date_range"]["ranges"]
+    assert [date_range["key"] for date_range in due_ranges] == ["overdue", "today", "next_7_days", "later"]
+    assert stats == {
+        "total": 5, "completed": 2, "open": 3,
+        "by_priority": {"low": 0, "normal": 3, "high": 2},
+        "due": {"overdue": 1, "today": 0, "next_7_days": 2, "later": 0},
+    }
+
+def test_task_stats_fall_back_to_group_by(db, owner, fake_redis):
+    """Test that stats are counted by the database when ES fails"""
+    import json
+    from datetime import timedelta
+
+    now = datetime.utcnow()
+    db.add_all([
+        Task(title="Late", due_date=now - timedelta(days=2), priority=PriorityEnum.high, owner_id=owner.id),
+        Task(title="Soon", due_date=now + timedelta(days=3), owner_id=owner.id),
+        Task(title="Someday", due_date=now + timedelta(days=30), priority=PriorityEnum.low, owner_id=owner.id),
+        Task(title="Done", due_date=now - timedelta(days=2), completed=True, owner_id=owner.id),
+    ])
+    db.commit()
+
+    with patch('app.infrastructure.services.search_backend.aggregate_documents',
+               side_effect=Exception("Elasticsearch error")):
+        stats = json.loads(TaskRepository(db).get_task_stats_json(owner.id))
+
+    assert stats == {
+        "total": 4, "completed": 1, "open": 3,
+        "by_priority": {"low": 1, "normal": 2, "high": 1},
+        "due": {"overdue": 1, "today": 0, "next_7_days": 1, "later": 1},
+    }
+
+def test_setup_elasticsearch_rebuilds_outdated_mapping(mock_es_client):
+    """Test that an outdated served mapping asks for a reindex unless one is running"""
+    from app.infrastructure.services.elastic import setup_elasticsearch
+
+    aliases = {TASK_INDEX: [f"{TASK_INDEX}_v1"], f"{TASK_INDEX}_building": []}
+    mock_es_client.indices.get_mapping.return_value = {
+        f"{TASK_INDEX}_v1": {"mappings": {"_meta": {"mapping_version": 1}}}
+    }
+    with patch('app.infrastructure.services.elastic.get_alias_indices', side_effect=lambda alias: aliases[alias]):
+        assert setup_elasticsearch() is True
+        aliases[f"{TASK_INDEX}_building"] = [f"{TASK_INDEX}_v2"]
+        assert setup_elasticsearch() is False
+
+def test_delete_documents_sends_one_routed_bulk_request():
+    """Test that deletes are batched across write indices and a 404 is not a failure"""
+    from app.infrastructure.services.search_backend import ElasticsearchSearchBackend
+
+    indices = [f"{TASK_INDEX}_v1", f"{TASK_INDEX}_v2"]
+    with patch('app.infrastructure.services.search_backend.get_task_write_indices', return_value=indices), \
+         patch('app.infrastructure.services.elastic.helpers.bulk',
+               return_value=(3, [{"delete": {"_id": "2", "status": 404}}])) as bulk:
+        ElasticsearchSearchBackend().delete_documents([(1, 7), (2, 8)])
+
+    bulk.assert_called_once()
+    actions = bulk.call_args[0][1]
+    assert [(action["_index"], action["_id"], action["_routing"]) for action in actions] == [
+        (indices[0], "1", "7"), (indices[0], "2", "8"), (indices[1], "1", "7"), (indices[1], "2", "8"),
+    ]
+    assert {action["_op_type"] for action in actions} == {"delete"}
+
+def test_delete_documents_raises_on_failed_items():
+    """Test that a failed delete raises so that it is retried"""
+    from app.infrastructure.services.search_backend import ElasticsearchSearchBackend
+
+    with patch('app.infrastructure.services.search_backend.get_task_write_indices', return_value=[TASK_INDEX]), \
+         patch('app.infrastructure.services.elastic.helpers.bulk',
+               return_value=(0, [{"delete": {"_id": "1", "status": 429, "error": "rejected"}}])):
+        with pytest.raises(RuntimeError):
+            ElasticsearchSearchBackend().delete_documents([(1, 7)])
+
+def test_delete_document_only_swallows_not_found(mock_es_client):
+    """Test that a missing document is reported, not any error"""
+    from elasticsearch import ConnectionError, NotFoundError
+    from app.infrastructure.services.elastic import delete_document
+
+    mock_es_client.delete.side_effect = NotFoundError("missing", MagicMock(), {})
+    assert delete_document(TASK_INDEX, "1", routing="7") is False
+
+    mock_es_client.delete.side_effect = ConnectionError("connection refused")
+    with pytest.raises(ConnectionError):
+        delete_document(TASK_INDEX, "1", routing="7")
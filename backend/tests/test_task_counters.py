@@ -0,0 +1,90 @@
+import json
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.application.schemas.task import TaskCreate, TaskUpdate
+from app.domain.models.task import Task
+from app.domain.models.task_counter import TaskCounter
+from app.infrastructure.db.task_counters import task_counter_upsert
+from app.infrastructure.repositories.task_repository import TaskRepository
+
+
+def counters(db, user_id):
+    counter = db.get(TaskCounter, user_id)
+    db.refresh(counter)
+    return (counter.total, counter.completed, counter.priority_low, counter.priority_normal, counter.priority_high)
+
+
+def test_writes_maintain_counters(db, owner, fake_redis):
+    repo = TaskRepository(db)
+    task = repo.create_task(TaskCreate(title="One"), owner.id)
+    repo.create_task(TaskCreate(title="Two", priority="high"), owner.id)
+    assert counters(db, owner.id) == (2, 0, 0, 1, 1)
+
+    repo.update_task(task.id, TaskUpdate(completed=True, priority="low"), owner.id)
+    assert counters(db, owner.id) == (2, 1, 1, 0, 1)
+
+    repo.update_task(task.id, TaskUpdate(title="Renamed"), owner.id)
+    assert counters(db, owner.id) == (2, 1, 1, 0, 1)
+
+    repo.delete_task(task.id, owner.id)
+    assert counters(db, owner.id) == (1, 0, 0, 0, 1)
+
+
+def test_summary_is_cached_until_a_write(db, owner, fake_redis):
+    repo = TaskRepository(db)
+    assert json.loads(repo.get_task_summary_json(owner.id)) == {
+        "total": 0, "completed": 0, "open": 0, "by_priority": {"low": 0, "normal": 0, "high": 0},
+    }
+
+    task = repo.create_task(TaskCreate(title="One"), owner.id)
+    repo.update_task(task.id, TaskUpdate(completed=True), owner.id)
+    repo.create_task(TaskCreate(title="Two"), owner.id)
+
+    assert json.loads(repo.get_task_summary_json(owner.id)) == {
+        "total": 2, "completed": 1, "open": 1, "by_priority": {"low": 0, "normal": 2, "high": 0},
+    }
+
+
+def test_list_page_carries_the_total_in_its_cache_entry(db, owner, fake_redis):
+    """X-Total-Count must not cost a second cache or database round-trip"""
+    repo = TaskRepository(db)
+    for title in ("One", "Two", "Three"):
+        repo.create_task(TaskCreate(title=title), owner.id)
+
+    _, next_cursor, total = repo.get_user_tasks_json(owner.id, limit=2)
+    assert total == 3
+    assert next_cursor is not None
+
+    with patch.object(repo, "get_task_summary_json") as summary, patch.object(repo.db, "get") as get:
+        assert repo.get_user_tasks_json(owner.id, limit=2)[2] == 3
+    summary.assert_not_called()
+    get.assert_not_called()
+
+    repo.create_task(TaskCreate(title="Four"), owner.id)
+    assert repo.get_user_tasks_json(owner.id, limit=2)[2] == 4
+
+
+def test_repair_recomputes_counters(db, owner, fake_redis):
+    repo = TaskRepository(db)
+    repo.create_task(TaskCreate(title="One"), owner.id)
+    # Tasks written behind the repository's back, and a drifted counter
+    db.add_all([Task(title="Two", owner_id=owner.id, completed=True), Task(title="Three", owner_id=owner.id)])
+    db.get(TaskCounter, owner.id).total = 42
+    db.commit()
+    stale = repo.get_task_summary_json(owner.id)
+
+    assert repo.repair_task_counters() == 1
+
+    assert counters(db, owner.id) == (3, 1, 0, 3, 0)
+    assert repo.get_task_summary_json(owner.id) != stale
+    assert json.loads(repo.get_task_summary_json(owner.id))["total"] == 3
+
+
+def test_postgres_counter_upsert_is_a_single_statement():
+    statement = task_counter_upsert("postgresql", 7, {"total": 1, "priority_high": 1})
+
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO task_counters")
+    assert "ON CONFLICT (user_id) DO UPDATE SET total = (task_counters.total +" in sql